@@ -0,0 +1,138 @@
+"""
+Redis-backed response cache shared by the Sentinel AI APIs.
+
+Caching is enabled by setting ``REDIS_URL``. When it is unset, when the
+``redis`` package is missing, or when Redis errors, every call falls through
+to the loader so the APIs keep serving from the database.
+"""
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ResponseCache:
+    """Cache of serialized Pydantic responses with per-key stampede protection."""
+
+    def __init__(self, url: Optional[str] = None):
+        """Initialize the cache; ``url`` defaults to the ``REDIS_URL`` variable."""
+        self.url = url if url is not None else os.getenv("REDIS_URL")
+        self._client = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a Redis backend is configured and available."""
+        return bool(self.url) and redis is not None
+
+    @property
+    def client(self):
+        """Get or create the Redis client."""
+        if self._client is None:
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def get_or_load(
+        self,
+        key: str,
+        ttl_seconds: int,
+        model: Type[ModelT],
+        loader: Callable[[], Awaitable[ModelT]]
+    ) -> ModelT:
+        """
+        Return the cached response for ``key`` or load and cache it.
+
+        Concurrent misses for the same key within this process wait for a
+        single loader call instead of all hitting the database.
+        """
+        if not self.enabled:
+            return await loader()
+
+        cached = await self._get(key, model)
+        if cached is not None:
+            return cached
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have filled the key while we waited
+                cached = await self._get(key, model)
+                if cached is not None:
+                    return cached
+
+                response = await loader()
+                try:
+                    await self.client.setex(
+                        key, ttl_seconds, response.model_dump_json(by_alias=True)
+                    )
+                except Exception as e:
+                    logger.warning(f"Cache write failed for {key}: {e}")
+                return response
+        finally:
+            if self._locks.get(key) is lock:
+                del self._locks[key]
+
+    async def warm_up(self) -> None:
+        """Open the Redis connection ahead of the first request."""
+        if not self.enabled:
+            return
+
+        try:
+            await self.client.ping()
+        except Exception as e:
+            logger.warning(f"Cache warm-up failed: {e}")
+
+    async def invalidate(self, *keys: str) -> None:
+        """Delete cached responses; errors are logged and ignored."""
+        if not self.enabled or not keys:
+            return
+
+        try:
+            await self.client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        """Read and deserialize a cached response, treating errors as misses."""
+        try:
+            payload = await self.client.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+
+        return model.model_validate_json(payload) if payload else None
+
+
+# Global response cache instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the global response cache instance."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+
+def agent_cache_key(agent_id: str) -> str:
+    """Cache key for a single agent's details."""
+    return f"agent:{agent_id}"
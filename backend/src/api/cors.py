@@ -0,0 +1,37 @@
+"""
+CORS settings shared by the Sentinel AI APIs.
+
+Allowed origins come from ``CORS_ORIGINS`` (comma-separated) and default to
+the local dashboard. The dashboard does not send cookies or credentials, so
+credentials are not allowed; a wildcard origin combined with credentials is
+rejected by browsers anyway.
+"""
+import os
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+
+DEFAULT_CORS_ORIGINS = "http://localhost:3000"
+
+# Browsers may reuse a preflight response for this long
+CORS_MAX_AGE_SECONDS = 600
+
+
+def get_cors_origins() -> List[str]:
+    """Parse the allowed origins from the ``CORS_ORIGINS`` variable."""
+    origins = os.getenv("CORS_ORIGINS", DEFAULT_CORS_ORIGINS)
+    return sorted({origin.strip().rstrip("/") for origin in origins.split(",") if origin.strip()})
+
+
+def add_cors_middleware(app: FastAPI) -> None:
+    """Add CORS middleware for the configured origins to ``app``."""
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=get_cors_origins(),
+        allow_credentials=False,
+        allow_methods=["GET", "POST"],
+        allow_headers=["*"],
+        max_age=CORS_MAX_AGE_SECONDS,
+    )
@@ -1,37 +1,77 @@
 """
 FastAPI application for Data Retrieval API.
 """
+import asyncio
 import csv
 import io
+import time
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import AsyncIterator, Optional, Tuple
 import logging
+from contextlib import asynccontextmanager, suppress
 
+import orjson
 from fastapi import FastAPI, HTTPException, Depends, Query, Response, status
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, Text, cast, desc, func, null, select, text, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 
-from ...database import get_db_session
+from ...database import close_database_async, get_async_db_session, get_database_manager
 from ...models import AIAgent, PerformanceMetric, AgentStatus
 from .models import (
     Agent, AgentListResponse, Metric, MetricsResponse, TimeRange,
     DataHealthResponse, ErrorResponse, AgentStatusFilter, 
     AggregationLevel, ExportFormat
 )
+from .pagination import encode_cursor, decode_cursor
+from ..cors import add_cors_middleware
+from ..cache import agent_cache_key, get_response_cache
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up connections on startup and release them on shutdown."""
+    logger.info("Data Retrieval API starting up...")
+    
+    try:
+        # Open pooled connections now rather than on the first requests
+        db_manager = get_database_manager()
+        if await db_manager.warm_up():
+            logger.info("Database connection successful")
+        else:
+            logger.warning("Database connection failed during startup")
+        db_manager.start_keepalive()
+        
+        await get_response_cache().warm_up()
+    except Exception as e:
+        logger.error(f"Error during startup: {e}")
+    
+    yield
+    
+    logger.info("Data Retrieval API shutting down...")
+    
+    try:
+        await close_database_async()
+        await get_response_cache().close()
+        logger.info("Database connections closed")
+    except Exception as e:
+        logger.error(f"Error during shutdown: {e}")
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Sentinel AI Data Retrieval API",
     description="API for retrieving metrics data for dashboard and analysis",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {
             "name": "agents",
@@ -52,15 +92,89 @@ app = FastAPI(
     ]
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Columns projected by the agent endpoints; mapped 1:1 onto ``Agent`` fields
+AGENT_COLUMNS = (
+    AIAgent.agent_id,
+    AIAgent.name,
+    AIAgent.description,
+    AIAgent.status,
+    AIAgent.created_at,
+    AIAgent.last_seen,
+    AIAgent.agent_metadata,
 )
 
+# Numeric metric columns; averaged per bucket for aggregated responses
+NUMERIC_METRIC_COLUMNS = (
+    PerformanceMetric.latency_ms,
+    PerformanceMetric.throughput_req_per_min,
+    PerformanceMetric.cost_per_request,
+    PerformanceMetric.cpu_usage_percent,
+    PerformanceMetric.gpu_usage_percent,
+    PerformanceMetric.memory_usage_mb,
+)
+
+# Columns projected by the metrics endpoints; mapped 1:1 onto ``Metric`` fields
+METRIC_COLUMNS = (
+    PerformanceMetric.metric_id,
+    PerformanceMetric.agent_id,
+    PerformanceMetric.timestamp,
+    *NUMERIC_METRIC_COLUMNS,
+    # Read as stored JSON text and spliced into responses via ``orjson.Fragment``
+    cast(PerformanceMetric.custom_metrics, Text).label("custom_metrics"),
+)
+
+# Fields selectable through ``/metrics?fields=``; identity fields are always returned
+METRIC_FIELDS = {column.key: column for column in METRIC_COLUMNS}
+METRIC_KEY_FIELDS = ("metric_id", "agent_id", "timestamp")
+
+# custom_metrics is opt-in because its JSON dominates wide responses
+DEFAULT_METRIC_FIELDS = tuple(field for field in METRIC_FIELDS if field != "custom_metrics")
+
+# Agent metadata changes rarely, so dashboard refreshes are served from cache
+AGENT_LIST_CACHE_TTL_SECONDS = 300
+AGENT_CACHE_TTL_SECONDS = 60
+
+# Rows fetched per server-side cursor round trip when streaming exports
+EXPORT_BATCH_SIZE = 1000
+
+# Header row of CSV exports, in ``METRIC_COLUMNS`` order
+CSV_HEADER = tuple(column.key for column in METRIC_COLUMNS)
+
+# Server-side CSV export of one agent's metrics over a time range
+EXPORT_COPY_QUERY = (
+    f"SELECT {', '.join(CSV_HEADER)} FROM performance_metrics "
+    "WHERE agent_id = $1 AND timestamp >= $2 AND timestamp <= $3 "
+    "ORDER BY timestamp"
+)
+
+# Approximate table sizes from the planner statistics, keyed by table name
+APPROXIMATE_COUNT_TTL_SECONDS = 60
+_approximate_counts = {}
+
+# Planner row estimate of a table. Partitioned parents are never analyzed by
+# autovacuum, so their own reltuples goes stale; their estimate is the sum over
+# the partitions, ignoring never-analyzed (-1) ones unless all of them are
+ESTIMATED_ROWS_QUERY = text("""
+    SELECT CASE parent.relkind
+        WHEN 'p' THEN (
+            SELECT CASE WHEN max(child.reltuples) < 0 THEN -1
+                        ELSE sum(greatest(child.reltuples, 0)) END
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = parent.oid
+        )
+        ELSE parent.reltuples
+    END::bigint
+    FROM pg_class parent
+    WHERE parent.relname = :table_name
+""")
+
+# Compress larger responses; numeric JSON compresses very well
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# Add CORS middleware
+add_cors_middleware(app)
+
 
 @app.get(
     "/agents",
@@ -72,46 +186,69 @@ app.add_middleware(
 async def list_agents(
     status: Optional[AgentStatusFilter] = Query(None, description="Filter agents by status"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of agents to return"),
-    offset: int = Query(0, ge=0, description="Number of agents to skip for pagination"),
-    db: Session = Depends(get_db_session)
+    offset: int = Query(0, ge=0, description="Number of agents to skip (ignored when cursor is set)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(False, description="Include the total number of matching agents"),
+    db: AsyncSession = Depends(get_async_db_session)
 ) -> AgentListResponse:
-    """List all monitored AI agents with optional filtering and pagination."""
+    """List all monitored AI agents with optional filtering and keyset pagination."""
     
-    try:
-        # Build query
-        query = db.query(AIAgent)
+    cache_key = (
+        f"agents:{status.value if status else None}:{limit}:{offset}:"
+        f"{cursor}:{include_total}"
+    )
+    
+    async def load_agents() -> AgentListResponse:
+        # Build query; plain rows avoid hydrating ORM instances
+        stmt = select(*AGENT_COLUMNS)
+        count_stmt = select(func.count(AIAgent.agent_id))
         
         # Apply status filter if provided
         if status:
-            query = query.filter(AIAgent.status == AgentStatus(status.value))
+            stmt = stmt.where(AIAgent.status == AgentStatus(status.value))
+            count_stmt = count_stmt.where(AIAgent.status == AgentStatus(status.value))
         
-        # Get total count for pagination
-        total = query.count()
+        # Counting is opt-in; it is the expensive part of a page fetch
+        total = None
+        if include_total:
+            total = await _count_rows(
+                db, count_stmt, AIAgent.__tablename__, filtered=status is not None
+            )
         
-        # Apply pagination
-        agents_db = query.order_by(desc(AIAgent.created_at)).offset(offset).limit(limit).all()
+        # Seek past the last agent of the previous page instead of using OFFSET
+        stmt = stmt.order_by(desc(AIAgent.created_at), desc(AIAgent.agent_id))
+        if cursor:
+            stmt = stmt.where(
+                tuple_(AIAgent.created_at, AIAgent.agent_id) < _decode_cursor_or_400(cursor)
+            )
+        elif offset:
+            stmt = stmt.offset(offset)
+        
+        # Fetch one extra row to learn whether another page exists
+        rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["agent_id"])
         
         # Convert to response model
-        agents = [
-            Agent(
-                agent_id=agent.agent_id,
-                name=agent.name,
-                description=agent.description,
-                status=agent.status.value,
-                created_at=agent.created_at,
-                last_seen=agent.last_seen,
-                metadata=agent.agent_metadata or {}
-            )
-            for agent in agents_db
-        ]
+        agents = [_agent_from_row(row) for row in rows]
         
         return AgentListResponse(
             agents=agents,
             total=total,
             limit=limit,
-            offset=offset
+            offset=0 if cursor else offset,
+            next_cursor=next_cursor
+        )
+    
+    try:
+        return await get_response_cache().get_or_load(
+            cache_key, AGENT_LIST_CACHE_TTL_SECONDS, AgentListResponse, load_agents
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing agents: {e}")
         raise HTTPException(
@@ -133,14 +270,16 @@ async def list_agents(
 )
 async def get_agent(
     agent_id: str,
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ) -> Agent:
     """Get detailed information about a specific agent."""
     
-    try:
-        agent = db.query(AIAgent).filter(AIAgent.agent_id == agent_id).first()
+    async def load_agent() -> Agent:
+        row = (
+            await db.execute(select(*AGENT_COLUMNS).where(AIAgent.agent_id == agent_id))
+        ).mappings().first()
         
-        if not agent:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail={
@@ -150,14 +289,11 @@ async def get_agent(
                 }
             )
         
-        return Agent(
-            agent_id=agent.agent_id,
-            name=agent.name,
-            description=agent.description,
-            status=agent.status.value,
-            created_at=agent.created_at,
-            last_seen=agent.last_seen,
-            metadata=agent.agent_metadata or {}
+        return _agent_from_row(row)
+    
+    try:
+        return await get_response_cache().get_or_load(
+            agent_cache_key(agent_id), AGENT_CACHE_TTL_SECONDS, Agent, load_agent
         )
         
     except HTTPException:
@@ -186,53 +322,77 @@ async def get_metrics(
     start_date: Optional[datetime] = Query(None, description="Start date for time range filter"),
     end_date: Optional[datetime] = Query(None, description="End date for time range filter"),
     metric_types: Optional[str] = Query(None, description="Comma-separated list of metric types to include"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated metric fields to return (custom_metrics is only returned when listed)"
+    ),
     aggregation: AggregationLevel = Query(AggregationLevel.RAW, description="Data aggregation level"),
     limit: int = Query(1000, ge=1, le=10000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db_session)
-) -> MetricsResponse:
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(False, description="Include the total number of matching metrics"),
+    db: AsyncSession = Depends(get_async_db_session)
+) -> ORJSONResponse:
     """Retrieve metrics data with filtering and aggregation options."""
     
     try:
-        # Build query
-        query = db.query(PerformanceMetric)
-        
-        # Apply filters
-        filters = []
+        filtered = bool(agent_id or start_date or end_date)
+        selected_fields = _parse_metric_fields(fields)
         
-        if agent_id:
-            filters.append(PerformanceMetric.agent_id == agent_id)
-        
-        if start_date:
-            filters.append(PerformanceMetric.timestamp >= start_date)
+        if aggregation == AggregationLevel.RAW:
+            # Select only the requested columns so no ORM instances are hydrated
+            stmt = _filter_metrics(
+                select(*(METRIC_FIELDS[field] for field in selected_fields)),
+                agent_id, start_date, end_date
+            )
+            count_stmt = _filter_metrics(
+                select(func.count(PerformanceMetric.metric_id)), agent_id, start_date, end_date
+            )
+            
+            # Rows are keyed by (timestamp, metric_id) for ordering and cursors
+            sort_key = (PerformanceMetric.timestamp, PerformanceMetric.metric_id)
+            cursor_id_field = "metric_id"
+        else:
+            # Let the database average each agent's metrics per time bucket
+            bucket = func.date_trunc(aggregation.value, PerformanceMetric.timestamp)
+            stmt = _filter_metrics(
+                _aggregated_metrics_select(bucket, selected_fields),
+                agent_id, start_date, end_date
+            ).group_by(PerformanceMetric.agent_id, bucket)
+            count_stmt = select(func.count()).select_from(
+                stmt.with_only_columns(PerformanceMetric.agent_id, bucket).subquery()
+            )
+            
+            # Buckets are keyed by (bucket, agent_id) for ordering and cursors
+            sort_key = (bucket, PerformanceMetric.agent_id)
+            cursor_id_field = "agent_id"
         
-        if end_date:
-            filters.append(PerformanceMetric.timestamp <= end_date)
+        # Counting is opt-in; it is the expensive part of a page fetch
+        total = None
+        if include_total:
+            total = await _count_rows(
+                db,
+                count_stmt,
+                PerformanceMetric.__tablename__,
+                filtered=filtered or aggregation != AggregationLevel.RAW
+            )
         
-        if filters:
-            query = query.filter(and_(*filters))
+        # Seek past the last row of the previous page instead of using OFFSET
+        if cursor:
+            seek = tuple_(*sort_key) < _decode_cursor_or_400(cursor)
+            stmt = stmt.where(seek) if aggregation == AggregationLevel.RAW else stmt.having(seek)
         
-        # Get total count
-        total = query.count()
+        stmt = stmt.order_by(*(desc(column) for column in sort_key)).limit(limit + 1)
         
-        # Apply ordering and limit
-        metrics_db = query.order_by(desc(PerformanceMetric.timestamp)).limit(limit).all()
+        # Rows come straight from the database, so they are serialized as-is
+        metrics = [_metric_row(row) for row in (await db.execute(stmt)).mappings()]
         
-        # Convert to response model
-        metrics = [
-            Metric(
-                metric_id=metric.metric_id,
-                agent_id=metric.agent_id,
-                timestamp=metric.timestamp,
-                latency_ms=metric.latency_ms,
-                throughput_req_per_min=metric.throughput_req_per_min,
-                cost_per_request=metric.cost_per_request,
-                cpu_usage_percent=metric.cpu_usage_percent,
-                gpu_usage_percent=metric.gpu_usage_percent,
-                memory_usage_mb=metric.memory_usage_mb,
-                custom_metrics=metric.custom_metrics
+        # The extra row only signals that another page exists
+        next_cursor = None
+        if len(metrics) > limit:
+            metrics = metrics[:limit]
+            next_cursor = encode_cursor(
+                metrics[-1]["timestamp"], metrics[-1][cursor_id_field]
             )
-            for metric in metrics_db
-        ]
         
         # Build time range info
         time_range = None
@@ -242,13 +402,17 @@ async def get_metrics(
                 end=end_date or datetime.now(timezone.utc)
             )
         
-        return MetricsResponse(
-            metrics=metrics,
-            total=total,
-            aggregation=aggregation.value,
-            time_range=time_range
-        )
+        # Skip the response_model validation pass; the shape matches MetricsResponse
+        return ORJSONResponse({
+            "metrics": metrics,
+            "total": total,
+            "aggregation": aggregation.value,
+            "time_range": time_range.model_dump() if time_range else None,
+            "next_cursor": next_cursor,
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving metrics: {e}")
         raise HTTPException(
@@ -272,13 +436,13 @@ async def export_metrics(
     start_date: datetime = Query(..., description="Start date for export"),
     end_date: datetime = Query(..., description="End date for export"),
     format: ExportFormat = Query(ExportFormat.CSV, description="Export format"),
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """Export metrics data for a specific agent and time range."""
     
     try:
         # Verify agent exists
-        agent = db.query(AIAgent).filter(AIAgent.agent_id == agent_id).first()
+        agent = await db.get(AIAgent, agent_id)
         if not agent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -290,40 +454,16 @@ async def export_metrics(
             )
         
         # Query metrics
-        metrics = db.query(PerformanceMetric).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_date,
-                PerformanceMetric.timestamp <= end_date
-            )
-        ).order_by(PerformanceMetric.timestamp).all()
+        stmt = _filter_metrics(
+            select(*METRIC_COLUMNS), agent_id, start_date, end_date
+        ).order_by(PerformanceMetric.timestamp)
         
         if format == ExportFormat.CSV:
-            return _export_csv(metrics, agent.name)
-        else:
-            # JSON format
-            metrics_data = [
-                Metric(
-                    metric_id=metric.metric_id,
-                    agent_id=metric.agent_id,
-                    timestamp=metric.timestamp,
-                    latency_ms=metric.latency_ms,
-                    throughput_req_per_min=metric.throughput_req_per_min,
-                    cost_per_request=metric.cost_per_request,
-                    cpu_usage_percent=metric.cpu_usage_percent,
-                    gpu_usage_percent=metric.gpu_usage_percent,
-                    memory_usage_mb=metric.memory_usage_mb,
-                    custom_metrics=metric.custom_metrics
-                ).dict()
-                for metric in metrics
-            ]
-            
-            return MetricsResponse(
-                metrics=metrics_data,
-                total=len(metrics),
-                aggregation="raw",
-                time_range=TimeRange(start=start_date, end=end_date)
+            return _export_csv(
+                stmt, agent.name, (agent_id, _as_utc(start_date), _as_utc(end_date))
             )
+        else:
+            return _export_json(stmt, TimeRange(start=start_date, end=end_date))
         
     except HTTPException:
         raise
@@ -339,39 +479,133 @@ async def export_metrics(
         )
 
 
-def _export_csv(metrics: List[PerformanceMetric], agent_name: str) -> StreamingResponse:
-    """Generate CSV export response."""
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive query datetimes as UTC, as the database columns do."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _filter_metrics(
+    stmt: Select,
+    agent_id: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> Select:
+    """Apply the optional agent and time range filters to a metrics statement."""
+    if agent_id:
+        stmt = stmt.where(PerformanceMetric.agent_id == agent_id)
+    if start_date:
+        stmt = stmt.where(PerformanceMetric.timestamp >= start_date)
+    if end_date:
+        stmt = stmt.where(PerformanceMetric.timestamp <= end_date)
+    return stmt
+
+
+def _parse_metric_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Resolve a ``fields`` parameter to known metric fields in column order."""
+    if not fields:
+        return DEFAULT_METRIC_FIELDS
     
-    def generate_csv():
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'metric_id', 'agent_id', 'timestamp', 'latency_ms', 
-            'throughput_req_per_min', 'cost_per_request', 'cpu_usage_percent',
-            'gpu_usage_percent', 'memory_usage_mb', 'custom_metrics'
-        ])
-        
-        # Write data rows
-        for metric in metrics:
-            writer.writerow([
-                metric.metric_id,
-                metric.agent_id,
-                metric.timestamp.isoformat(),
-                metric.latency_ms,
-                metric.throughput_req_per_min,
-                metric.cost_per_request,
-                metric.cpu_usage_percent,
-                metric.gpu_usage_percent,
-                metric.memory_usage_mb,
-                str(metric.custom_metrics) if metric.custom_metrics else ""
-            ])
+    requested = {field.strip() for field in fields.split(",")}
+    return tuple(
+        field for field in METRIC_FIELDS
+        if field in requested or field in METRIC_KEY_FIELDS
+    )
+
+
+def _aggregated_metrics_select(bucket, selected_fields: Tuple[str, ...]) -> Select:
+    """Select per-agent bucket averages shaped like the selected metric fields."""
+    columns = [
+        null().label("metric_id"),
+        PerformanceMetric.agent_id,
+        bucket.label("timestamp"),
+    ]
+    columns.extend(
+        func.avg(column).label(column.key)
+        for column in NUMERIC_METRIC_COLUMNS
+        if column.key in selected_fields
+    )
+    if "custom_metrics" in selected_fields:
+        columns.append(null().label("custom_metrics"))
+    return select(*columns)
+
+
+def _agent_from_row(row) -> Agent:
+    """Build an ``Agent`` from an ``AGENT_COLUMNS`` row, skipping validation of trusted data."""
+    agent = dict(row)
+    agent["status"] = agent["status"].value
+    agent["agent_metadata"] = agent["agent_metadata"] or {}
+    return Agent.model_construct(**agent)
+
+
+def _metric_row(row) -> dict:
+    """Convert a metrics row to a dict whose custom_metrics JSON text is emitted verbatim."""
+    metric = dict(row)
+    custom_metrics = metric.get("custom_metrics")
+    if custom_metrics is not None:
+        metric["custom_metrics"] = orjson.Fragment(custom_metrics)
+    return metric
+
+
+def _decode_cursor_or_400(cursor: str):
+    """Decode a pagination cursor, mapping malformed input to a 400 response."""
+    try:
+        return tuple_(*decode_cursor(cursor))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "success": False,
+                "error": "Invalid pagination cursor",
+                "code": "INVALID_CURSOR"
+            }
+        )
+
+
+async def _count_rows(db: AsyncSession, count_stmt, table_name: str, filtered: bool) -> int:
+    """
+    Count rows for a page response.
+    
+    Unfiltered counts on PostgreSQL use the planner's ``reltuples`` estimate,
+    summed over the partitions of a partitioned table and cached briefly,
+    instead of scanning the table. Filtered counts, other dialects and
+    never-analyzed tables fall back to the exact ``count_stmt``.
+    """
+    if filtered or db.get_bind().dialect.name != "postgresql":
+        return (await db.execute(count_stmt)).scalar_one()
+    
+    cached = _approximate_counts.get(table_name)
+    now = time.monotonic()
+    if cached and now - cached[0] < APPROXIMATE_COUNT_TTL_SECONDS:
+        return cached[1]
+    
+    estimate = (await db.execute(ESTIMATED_ROWS_QUERY, {"table_name": table_name})).scalar()
+    if estimate is None or estimate < 0:
+        return (await db.execute(count_stmt)).scalar_one()
+    
+    _approximate_counts[table_name] = (now, int(estimate))
+    return int(estimate)
+
+
+def _export_csv(stmt: Select, agent_name: str, copy_args: Tuple) -> StreamingResponse:
+    """
+    Generate CSV export response.
+    
+    On PostgreSQL (asyncpg) the CSV is produced by the server with
+    ``COPY ... TO STDOUT`` and piped straight through; other databases fall
+    back to writing rows streamed from a server-side cursor. Either way memory
+    stays flat regardless of export size. The generator owns its session
+    because it outlives the request handler.
+    """
+    
+    async def generate_csv():
+        async with get_database_manager().get_async_session() as session:
+            if session.get_bind().dialect.driver == "asyncpg":
+                chunks = _copy_csv(session, copy_args)
+            else:
+                chunks = _write_csv(session, stmt)
             
-            # Yield the buffer content and reset
-            yield output.getvalue()
-            output.seek(0)
-            output.truncate(0)
+            async for chunk in chunks:
+                yield chunk
     
     filename = f"metrics_{agent_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
@@ -382,6 +616,103 @@ def _export_csv(metrics: List[PerformanceMetric], agent_name: str) -> StreamingR
     )
 
 
+async def _copy_csv(session: AsyncSession, copy_args: Tuple) -> AsyncIterator[bytes]:
+    """Stream ``EXPORT_COPY_QUERY`` output from PostgreSQL's native CSV writer."""
+    connection = await session.connection()
+    driver_connection = (await connection.get_raw_connection()).driver_connection
+    
+    # asyncpg pushes COPY data to a callback; a bounded queue turns that into
+    # an iterator while applying backpressure to the database
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=16)
+    
+    async def copy_to_queue():
+        try:
+            await driver_connection.copy_from_query(
+                EXPORT_COPY_QUERY, *copy_args,
+                output=chunks.put, format="csv", header=True
+            )
+        except asyncio.CancelledError:
+            # Cancelled by the consumer, which no longer reads the queue
+            raise
+        except Exception:
+            # Wake the consumer so it awaits the task and sees the error
+            await chunks.put(None)
+            raise
+        await chunks.put(None)
+    
+    copy_task = asyncio.create_task(copy_to_queue())
+    try:
+        while (chunk := await chunks.get()) is not None:
+            yield chunk
+        await copy_task
+    finally:
+        if not copy_task.done():
+            # Client went away; abort the COPY before the session releases the connection
+            copy_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await copy_task
+
+
+async def _write_csv(session: AsyncSession, stmt: Select) -> AsyncIterator[str]:
+    """Write CSV rows streamed from a server-side cursor in fetched batches."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    
+    # Write header
+    writer.writerow(CSV_HEADER)
+    
+    result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    
+    # Write data rows one fetched batch at a time
+    async for batch in result.partitions():
+        writer.writerows(
+            (
+                metric_id, agent_id, timestamp.isoformat(), *values,
+                custom_metrics or ""
+            )
+            for metric_id, agent_id, timestamp, *values, custom_metrics in batch
+        )
+        
+        # Yield the buffer content and reset
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate(0)
+    
+    # Header-only exports still need the header flushed
+    if output.tell():
+        yield output.getvalue()
+
+
+def _export_json(stmt: Select, time_range: TimeRange) -> StreamingResponse:
+    """
+    Generate JSON export response in the ``MetricsResponse`` shape.
+    
+    Like the CSV export, rows are streamed from a server-side cursor and each
+    fetched batch is encoded with orjson in one call, so no per-row Pydantic
+    models or full result list are ever built.
+    """
+    
+    async def generate_json():
+        total = 0
+        yield b'{"metrics":['
+        
+        async with get_database_manager().get_async_session() as session:
+            result = await session.stream(
+                stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            
+            async for batch in result.mappings().partitions():
+                # Encode the batch as an array and splice its items into ours
+                encoded = orjson.dumps([_metric_row(row) for row in batch])[1:-1]
+                yield (b"," + encoded) if total else encoded
+                total += len(batch)
+        
+        yield b'],"total":' + orjson.dumps(total) + b',"aggregation":"raw","time_range":'
+        yield orjson.dumps(time_range.model_dump()) + b',"next_cursor":null}'
+    
+    return StreamingResponse(generate_json(), media_type="application/json")
+
+
 @app.get(
     "/health",
     response_model=DataHealthResponse,
@@ -389,58 +720,32 @@ def _export_csv(metrics: List[PerformanceMetric], agent_name: str) -> StreamingR
     summary="Health check endpoint",
     description="Check if the data retrieval service is healthy"
 )
-async def health_check(db: Session = Depends(get_db_session)) -> DataHealthResponse:
+async def health_check() -> DataHealthResponse:
     """Health check endpoint to verify service and database status."""
     
-    try:
-        # Test database connection
-        db.execute("SELECT 1")
-        database_status = "connected"
-        
+    db_manager = get_database_manager()
+    
+    # Test database connection (cached briefly across probes)
+    if await db_manager.check_health():
         return DataHealthResponse(
             status="healthy",
-            database_status=database_status,
-            timestamp=datetime.now(timezone.utc)
+            database_status="connected",
+            timestamp=datetime.now(timezone.utc),
+            **db_manager.pool_status()
         )
-        
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={
-                "success": False,
-                "error": "Service unhealthy - database connection failed",
-                "code": "SERVICE_UNHEALTHY"
-            }
-        )
-
-
-# Add startup and shutdown events
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the application on startup."""
-    logger.info("Data Retrieval API starting up...")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Clean up on application shutdown."""
-    logger.info("Data Retrieval API shutting down...")
     
-    try:
-        from ...database import close_database
-        close_database()
-        logger.info("Database connections closed")
-    except Exception as e:
-        logger.error(f"Error during shutdown: {e}")
+    logger.error("Health check failed: database connection test failed")
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "success": False,
+            "error": "Service unhealthy - database connection failed",
+            "code": "SERVICE_UNHEALTHY"
+        }
+    )
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "backend.src.api.data_retrieval.app:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    import os
+    from ..server import run
+    run("src.api.data_retrieval.app:app", port=int(os.getenv("DATA_API_PORT", "8000")))
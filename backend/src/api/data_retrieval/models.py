@@ -81,9 +81,9 @@ class AgentListResponse(BaseModel):
         ...,
         description="List of agents"
     )
-    total: int = Field(
-        ...,
-        description="Total number of agents (for pagination)",
+    total: Optional[int] = Field(
+        None,
+        description="Total number of agents (only when include_total=true)",
         example=25
     )
     limit: int = Field(
@@ -96,14 +96,18 @@ class AgentListResponse(BaseModel):
         description="Applied offset",
         example=0
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor for the next page, or null on the last page"
+    )
 
 
 class Metric(BaseModel):
     """Model for metric data."""
     
-    metric_id: str = Field(
+    metric_id: Optional[str] = Field(
         ...,
-        description="Unique identifier for the metric"
+        description="Unique identifier for the metric (null for aggregated rows)"
     )
     agent_id: str = Field(
         ...,
@@ -139,7 +143,7 @@ class Metric(BaseModel):
     )
     custom_metrics: Optional[Dict[str, Any]] = Field(
         None,
-        description="Custom metrics data"
+        description="Custom metrics data (on /metrics, only when requested via fields)"
     )
 
 
@@ -163,9 +167,9 @@ class MetricsResponse(BaseModel):
         ...,
         description="List of metrics"
     )
-    total: int = Field(
-        ...,
-        description="Total number of metrics matching query"
+    total: Optional[int] = Field(
+        None,
+        description="Total number of metrics matching query (only when include_total=true)"
     )
     aggregation: str = Field(
         ...,
@@ -176,6 +180,10 @@ class MetricsResponse(BaseModel):
         None,
         description="Applied time range filter"
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor for the next page, or null on the last page"
+    )
 
 
 class DataHealthResponse(BaseModel):
@@ -194,6 +202,21 @@ class DataHealthResponse(BaseModel):
         ...,
         description="Current timestamp"
     )
+    pool_size: Optional[int] = Field(
+        None,
+        description="Configured database connection pool size",
+        example=20
+    )
+    pool_checked_out: Optional[int] = Field(
+        None,
+        description="Database connections currently checked out",
+        example=3
+    )
+    pool_overflow: Optional[int] = Field(
+        None,
+        description="Overflow connections currently open beyond the pool size",
+        example=0
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,32 @@
+"""
+Keyset pagination helpers for the Data Retrieval API.
+
+Cursors are opaque, URL-safe tokens encoding the sort key of the last row
+returned, so the next page can be fetched with a range predicate instead of
+an OFFSET scan.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(position: datetime, row_id: str) -> str:
+    """Encode the (sort timestamp, row id) of the last returned row."""
+    payload = json.dumps([position.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        position, row_id = json.loads(payload)
+        return datetime.fromisoformat(position), str(row_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
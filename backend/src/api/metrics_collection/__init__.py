@@ -6,12 +6,15 @@ from AI agents in the Sentinel AI system.
 """
 
 from .app import app
-from .models import MetricsSubmission, SuccessResponse, ErrorResponse, HealthResponse
+from .models import (
+    MetricsSubmission, SuccessResponse, BatchSuccessResponse, ErrorResponse, HealthResponse
+)
 
 __all__ = [
     "app",
     "MetricsSubmission",
     "SuccessResponse", 
+    "BatchSuccessResponse",
     "ErrorResponse",
     "HealthResponse",
 ]
\ No newline at end of file
@@ -1,29 +1,129 @@
 """
 FastAPI application for Metrics Collection API.
 """
+import asyncio
+import os
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import logging
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, HTTPException, Depends, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from pydantic import TypeAdapter, ValidationError
 
-from ...database import get_db_session
+from ...database import close_database_async, get_async_db_session, get_database_manager
 from ...models import AIAgent, PerformanceMetric, AgentStatus
-from .models import MetricsSubmission, SuccessResponse, ErrorResponse, HealthResponse
+from .models import (
+    MetricsSubmission, SuccessResponse, BatchSuccessResponse, ErrorResponse, HealthResponse
+)
+from .ingest_buffer import IngestBuffer
+from .known_agents import KNOWN_AGENTS_MAX_SIZE, get_known_agents
+from .partitions import PARTITION_MAINTENANCE_SECONDS, get_metric_partitions
+from ...services.rollups import refresh_metric_rollups
+from ..cors import add_cors_middleware
+from ..cache import agent_cache_key, get_response_cache
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How often new metrics are added to the rollup tables; 0 leaves it to another process
+ROLLUP_INTERVAL_SECONDS = float(os.getenv("METRICS_ROLLUP_INTERVAL_SECONDS", "60"))
+
+
+async def refresh_rollups_periodically(interval: float) -> None:
+    """Refresh the metric rollups every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            written = await asyncio.to_thread(refresh_metric_rollups)
+            logger.debug(f"Metric rollups refreshed: {written} rows written")
+        except Exception as e:
+            logger.error(f"Error refreshing metric rollups: {e}")
+
+
+async def maintain_partitions_periodically(interval: float) -> None:
+    """Create upcoming metric partitions every ``interval`` seconds."""
+    while True:
+        try:
+            async with get_database_manager().get_async_session() as session:
+                created = await get_metric_partitions().maintain(session)
+            if created:
+                logger.info(f"Metric partitions maintained: {created} created")
+        except Exception as e:
+            logger.error(f"Error maintaining metric partitions: {e}")
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up connections on startup and release them on shutdown."""
+    logger.info("Metrics Collection API starting up...")
+    background_tasks = []
+    
+    try:
+        # Open pooled connections now rather than on the first requests
+        db_manager = get_database_manager()
+        if await db_manager.warm_up():
+            logger.info("Database connection successful")
+        else:
+            logger.warning("Database connection failed during startup")
+        db_manager.start_keepalive()
+        
+        # Remember registered agents so their first submissions skip the lookup
+        async with db_manager.get_async_session() as session:
+            result = await session.execute(
+                select(AIAgent.agent_id)
+                .order_by(AIAgent.last_seen.desc())
+                .limit(KNOWN_AGENTS_MAX_SIZE)
+            )
+            get_known_agents().update(result.scalars())
+        logger.info(f"Preloaded {len(get_known_agents())} known agents")
+        
+        await get_response_cache().warm_up()
+        
+        # Workers skip a refresh another worker is already running
+        if ROLLUP_INTERVAL_SECONDS > 0:
+            background_tasks.append(
+                asyncio.create_task(refresh_rollups_periodically(ROLLUP_INTERVAL_SECONDS))
+            )
+        if db_manager.async_engine.dialect.name == "postgresql":
+            background_tasks.append(
+                asyncio.create_task(maintain_partitions_periodically(PARTITION_MAINTENANCE_SECONDS))
+            )
+    except Exception as e:
+        logger.error(f"Error during startup: {e}")
+    
+    yield
+    
+    logger.info("Metrics Collection API shutting down...")
+    
+    try:
+        for task in background_tasks:
+            task.cancel()
+        await ingest_buffer.close()
+        await close_database_async()
+        await get_response_cache().close()
+        logger.info("Database connections closed")
+    except Exception as e:
+        logger.error(f"Error during shutdown: {e}")
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Sentinel AI Metrics Collection API",
     description="API for collecting performance metrics from AI agents",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {
             "name": "metrics",
@@ -36,14 +136,52 @@ app = FastAPI(
     ]
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Largest number of metrics accepted by a single batch submission
+MAX_BATCH_SIZE = 1000
+
+# How long single submissions wait to be written together; 0 writes each at once
+INGEST_BATCH_WINDOW_SECONDS = float(os.getenv("METRICS_INGEST_BATCH_WINDOW_MS", "0")) / 1000
+
+# Built once so every submission reuses the same compiled SQL
+TOUCH_AGENT_STMT = (
+    update(AIAgent)
+    .where(AIAgent.agent_id == bindparam("touch_agent_id"))
+    .values(last_seen=bindparam("touch_last_seen"), status=AgentStatus.RUNNING)
 )
+INSERT_METRIC_STMT = insert(PerformanceMetric)
+
+# Submission bodies are validated straight from the raw JSON bytes
+SUBMISSION_LIST_ADAPTER = TypeAdapter(List[MetricsSubmission])
+SUBMISSION_SCHEMA = MetricsSubmission.model_json_schema()
+
+# Add CORS middleware
+add_cors_middleware(app)
+
+
+def _validate_body(validate_json, body: bytes):
+    """Run a pydantic JSON validator, reporting errors the way FastAPI does for bodies."""
+    try:
+        return validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+            body=body
+        )
+
+
+async def parse_metrics_submission(request: Request) -> MetricsSubmission:
+    """
+    Parse a single submission from the request body.
+    
+    pydantic-core parses and validates the JSON bytes in one pass, instead of
+    FastAPI decoding them into a dict first and validating that.
+    """
+    return _validate_body(MetricsSubmission.model_validate_json, await request.body())
+
+
+async def parse_metrics_batch(request: Request) -> List[MetricsSubmission]:
+    """Parse a list of submissions from the request body in one pass."""
+    return _validate_body(SUBMISSION_LIST_ADAPTER.validate_json, await request.body())
 
 
 @app.post(
@@ -52,12 +190,17 @@ app.add_middleware(
     status_code=status.HTTP_201_CREATED,
     tags=["metrics"],
     summary="Submit metrics data from AI agent",
-    description="Endpoint for AI agents to submit their performance metrics"
+    description="Endpoint for AI agents to submit their performance metrics",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": SUBMISSION_SCHEMA}},
+        }
+    }
 )
 async def submit_metrics(
-    metrics: MetricsSubmission,
-    db: Session = Depends(get_db_session)
-) -> SuccessResponse:
+    metrics: MetricsSubmission = Depends(parse_metrics_submission)
+) -> ORJSONResponse:
     """Submit performance metrics from an AI agent."""
     
     try:
@@ -72,52 +215,52 @@ async def submit_metrics(
                 }
             )
         
-        # Check if agent exists, create if it doesn't
-        agent = db.query(AIAgent).filter(AIAgent.agent_id == metrics.agent_id).first()
-        if not agent:
-            # Create new agent with minimal information
-            agent = AIAgent(
-                agent_id=metrics.agent_id,
-                name=f"Agent-{metrics.agent_id[:8]}",  # Use first 8 chars of UUID
-                description="Auto-created from metrics submission",
-                status=AgentStatus.RUNNING
+        # Coalesce with concurrent submissions when ingest batching is enabled
+        if ingest_buffer.enabled:
+            metric_id = await ingest_buffer.submit(metrics)
+            return ORJSONResponse(
+                {
+                    "success": True,
+                    "message": "Metrics recorded successfully",
+                    "metric_id": metric_id,
+                },
+                status_code=status.HTTP_201_CREATED
             )
-            db.add(agent)
-            db.flush()  # Get the agent ID without committing
-            logger.info(f"Created new agent: {agent.agent_id}")
         
-        # Update agent's last_seen timestamp
-        agent.last_seen = metrics.timestamp
-        agent.status = AgentStatus.RUNNING  # Agent is submitting metrics, so it's running
+        known_agents = get_known_agents()
         
-        # Create performance metric record
-        performance_metric = PerformanceMetric(
-            agent_id=metrics.agent_id,
-            timestamp=metrics.timestamp,
-            latency_ms=metrics.latency_ms,
-            throughput_req_per_min=metrics.throughput_req_per_min,
-            cost_per_request=metrics.cost_per_request,
-            cpu_usage_percent=metrics.cpu_usage_percent,
-            gpu_usage_percent=metrics.gpu_usage_percent,
-            memory_usage_mb=metrics.memory_usage_mb,
-            custom_metrics=metrics.custom_metrics or {}
-        )
+        # Known agents are written on a bare connection without an existence lookup
+        metric_id = None
+        if metrics.agent_id in known_agents:
+            metric_id = await _record_for_known_agent(metrics)
         
-        db.add(performance_metric)
-        db.commit()
+        if metric_id is None:
+            # Agent is new or was deleted since it was remembered
+            known_agents.discard(metrics.agent_id)
+            async with get_database_manager().get_async_session() as db:
+                metric_id = await _record_with_agent_lookup(db, metrics)
         
-        logger.info(f"Recorded metrics for agent {metrics.agent_id}, metric_id: {performance_metric.metric_id}")
+        known_agents.add(metrics.agent_id)
         
-        return SuccessResponse(
-            message="Metrics recorded successfully",
-            metric_id=performance_metric.metric_id
+        # last_seen/status changed, so drop the cached agent details
+        await get_response_cache().invalidate(agent_cache_key(metrics.agent_id))
+        
+        logger.info(f"Recorded metrics for agent {metrics.agent_id}, metric_id: {metric_id}")
+        
+        # Skip the response_model validation pass; the shape matches SuccessResponse
+        return ORJSONResponse(
+            {
+                "success": True,
+                "message": "Metrics recorded successfully",
+                "metric_id": metric_id,
+            },
+            status_code=status.HTTP_201_CREATED
         )
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
     except SQLAlchemyError as e:
-        db.rollback()
         logger.error(f"Database error while recording metrics: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -128,7 +271,6 @@ async def submit_metrics(
             }
         )
     except Exception as e:
-        db.rollback()
         logger.error(f"Unexpected error while recording metrics: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -140,38 +282,121 @@ async def submit_metrics(
         )
 
 
-@app.get(
-    "/health",
-    response_model=HealthResponse,
-    tags=["health"],
-    summary="Health check endpoint",
-    description="Check if the metrics collection service is healthy"
+@app.post(
+    "/metrics/batch",
+    response_model=BatchSuccessResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["metrics"],
+    summary="Submit a batch of metrics",
+    description="Endpoint for AI agents to submit many performance metrics in one request",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": SUBMISSION_SCHEMA}}
+            },
+        }
+    }
 )
-async def health_check(db: Session = Depends(get_db_session)) -> HealthResponse:
-    """Health check endpoint to verify service status."""
+async def submit_metrics_batch(
+    submissions: List[MetricsSubmission] = Depends(parse_metrics_batch),
+    db: AsyncSession = Depends(get_async_db_session)
+) -> ORJSONResponse:
+    """Submit performance metrics for one or more agents in a single transaction."""
+    
+    if not submissions or len(submissions) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "success": False,
+                "error": f"Batch must contain between 1 and {MAX_BATCH_SIZE} metrics",
+                "code": "INVALID_BATCH_SIZE"
+            }
+        )
+    
+    empty = [index for index, metrics in enumerate(submissions) if not metrics.has_metrics()]
+    if empty:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "success": False,
+                "error": f"At least one metric value must be provided (items {empty})",
+                "code": "NO_METRICS_PROVIDED"
+            }
+        )
     
     try:
-        # Test database connection
-        db.execute("SELECT 1")
+        metric_ids = await _write_submissions(db, submissions)
+        await db.commit()
+        await _after_submissions_written(submissions)
+        
+        logger.info(f"Recorded {len(metric_ids)} metrics in batch")
         
-        return HealthResponse(
-            status="healthy",
-            timestamp=datetime.now(timezone.utc),
-            version="1.0.0"
+        # Skip the response_model validation pass; the shape matches BatchSuccessResponse
+        return ORJSONResponse(
+            {
+                "success": True,
+                "message": "Metrics recorded successfully",
+                "count": len(metric_ids),
+                "metric_ids": metric_ids,
+            },
+            status_code=status.HTTP_201_CREATED
         )
         
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error while recording metrics batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "success": False,
+                "error": "Database error occurred",
+                "code": "DATABASE_ERROR"
+            }
+        )
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        await db.rollback()
+        logger.error(f"Unexpected error while recording metrics batch: {e}")
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
                 "success": False,
-                "error": "Service unhealthy - database connection failed",
-                "code": "SERVICE_UNHEALTHY"
+                "error": "Internal server error",
+                "code": "INTERNAL_ERROR"
             }
         )
 
 
+@app.get(
+    "/health",
+    response_model=HealthResponse,
+    tags=["health"],
+    summary="Health check endpoint",
+    description="Check if the metrics collection service is healthy"
+)
+async def health_check() -> ORJSONResponse:
+    """Health check endpoint to verify service status."""
+    
+    # Test database connection (cached briefly across probes)
+    if await get_database_manager().check_health():
+        # Skip the response_model validation pass; the shape matches HealthResponse
+        return ORJSONResponse({
+            "status": "healthy",
+            "timestamp": datetime.now(timezone.utc),
+            "version": "1.0.0",
+        })
+    
+    logger.error("Health check failed: database connection test failed")
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "success": False,
+            "error": "Service unhealthy - database connection failed",
+            "code": "SERVICE_UNHEALTHY"
+        }
+    )
+
+
 @app.exception_handler(422)
 async def validation_exception_handler(request, exc):
     """Custom handler for validation errors."""
@@ -186,43 +411,142 @@ async def validation_exception_handler(request, exc):
     )
 
 
-# Add startup event to initialize database if needed
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the application on startup."""
-    logger.info("Metrics Collection API starting up...")
+def _metric_values(metrics: MetricsSubmission) -> Dict[str, Any]:
+    """Column values for a new performance_metrics row, with a fresh metric ID."""
+    return {
+        "metric_id": PerformanceMetric.generate_uuid(),
+        "agent_id": metrics.agent_id,
+        "timestamp": metrics.timestamp,
+        "latency_ms": metrics.latency_ms,
+        "throughput_req_per_min": metrics.throughput_req_per_min,
+        "cost_per_request": metrics.cost_per_request,
+        "cpu_usage_percent": metrics.cpu_usage_percent,
+        "gpu_usage_percent": metrics.gpu_usage_percent,
+        "memory_usage_mb": metrics.memory_usage_mb,
+        "custom_metrics": metrics.custom_metrics or {},
+    }
+
+
+async def _record_for_known_agent(metrics: MetricsSubmission) -> Optional[str]:
+    """
+    Touch the agent and insert the metric with prebuilt Core statements.
     
-    try:
-        # Test database connection
-        from ...database import get_database_manager
-        db_manager = get_database_manager()
-        if db_manager.test_connection():
-            logger.info("Database connection successful")
-        else:
-            logger.warning("Database connection failed during startup")
-    except Exception as e:
-        logger.error(f"Error during startup: {e}")
+    Runs on a bare pooled connection, skipping session setup and the unit of
+    work. Returns None, writing nothing, if the agent no longer exists.
+    """
+    async with get_database_manager().get_async_connection() as conn:
+        result = await conn.execute(
+            TOUCH_AGENT_STMT,
+            {"touch_agent_id": metrics.agent_id, "touch_last_seen": metrics.timestamp}
+        )
+        if result.rowcount == 0:
+            return None
+        
+        values = _metric_values(metrics)
+        await conn.execute(INSERT_METRIC_STMT, values)
+        return values["metric_id"]
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Clean up on application shutdown."""
-    logger.info("Metrics Collection API shutting down...")
+async def _record_with_agent_lookup(db: AsyncSession, metrics: MetricsSubmission) -> str:
+    """Create the agent if it does not exist, then record the metric."""
+    # Check if agent exists, create if it doesn't
+    agent = await db.get(AIAgent, metrics.agent_id)
+    if not agent:
+        # Create new agent with minimal information
+        agent = AIAgent(
+            agent_id=metrics.agent_id,
+            name=f"Agent-{metrics.agent_id[:8]}",  # Use first 8 chars of UUID
+            description="Auto-created from metrics submission",
+            status=AgentStatus.RUNNING
+        )
+        db.add(agent)
+        await db.flush()  # Insert the agent before its metric references it
+        logger.info(f"Created new agent: {agent.agent_id}")
     
-    try:
-        from ...database import close_database
-        close_database()
-        logger.info("Database connections closed")
-    except Exception as e:
-        logger.error(f"Error during shutdown: {e}")
+    # Update agent's last_seen timestamp
+    agent.last_seen = metrics.timestamp
+    agent.status = AgentStatus.RUNNING  # Agent is submitting metrics, so it's running
+    
+    values = _metric_values(metrics)
+    await db.execute(INSERT_METRIC_STMT, values)
+    return values["metric_id"]
+
+
+async def _write_submissions(db: AsyncSession, submissions: List[MetricsSubmission]) -> List[str]:
+    """
+    Write submissions with one agent upsert and a multi-row metrics insert per partition.
+    
+    The caller commits. Returns the new metric IDs in submission order.
+    """
+    # Latest submission per agent drives its last_seen
+    last_seen: Dict[str, datetime] = {}
+    for metrics in submissions:
+        if metrics.agent_id not in last_seen or metrics.timestamp > last_seen[metrics.agent_id]:
+            last_seen[metrics.agent_id] = metrics.timestamp
+    
+    # Upsert every agent in one statement instead of a SELECT + UPDATE each.
+    # Rows are locked in VALUES order, so agents go in ID order: concurrent
+    # batches touching the same agents then lock them in the same order
+    # instead of deadlocking
+    dialect_name = db.get_bind().dialect.name
+    dialect_insert = sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+    agent_stmt = dialect_insert(AIAgent).values([
+        {
+            "agent_id": agent_id,
+            "name": f"Agent-{agent_id[:8]}",
+            "description": "Auto-created from metrics submission",
+            "status": AgentStatus.RUNNING,
+            "last_seen": timestamp,
+        }
+        for agent_id, timestamp in sorted(last_seen.items())
+    ])
+    await db.execute(agent_stmt.on_conflict_do_update(
+        index_elements=[AIAgent.agent_id],
+        set_={"last_seen": agent_stmt.excluded.last_seen, "status": AgentStatus.RUNNING}
+    ))
+    
+    # Insert metrics with one executemany per target partition (or the parent)
+    partitions = get_metric_partitions()
+    if dialect_name == "postgresql":
+        await partitions.refresh_if_stale(db)
+    
+    rows = [_metric_values(metrics) for metrics in submissions]
+    rows_by_stmt: Dict[Any, List[Dict[str, Any]]] = {}
+    for row in rows:
+        stmt = partitions.insert_for(row["timestamp"])
+        rows_by_stmt.setdefault(INSERT_METRIC_STMT if stmt is None else stmt, []).append(row)
+    for stmt, stmt_rows in rows_by_stmt.items():
+        await db.execute(stmt, stmt_rows)
+    
+    return [row["metric_id"] for row in rows]
+
+
+async def _after_submissions_written(submissions: List[MetricsSubmission]) -> None:
+    """Remember the submitting agents and drop their cached details."""
+    agent_ids = {metrics.agent_id for metrics in submissions}
+    get_known_agents().update(agent_ids)
+    await get_response_cache().invalidate(*(agent_cache_key(a) for a in agent_ids))
+
+
+async def _write_buffered_submissions(submissions: List[MetricsSubmission]) -> List[str]:
+    """Write a batch coalesced by the ingest buffer in its own transaction."""
+    async with get_database_manager().get_async_session() as session:
+        metric_ids = await _write_submissions(session, submissions)
+    
+    await _after_submissions_written(submissions)
+    logger.info(f"Recorded {len(metric_ids)} buffered metrics")
+    return metric_ids
+
+
+# Coalesces POST /metrics submissions when METRICS_INGEST_BATCH_WINDOW_MS is set
+ingest_buffer = IngestBuffer(
+    _write_buffered_submissions,
+    window_seconds=INGEST_BATCH_WINDOW_SECONDS,
+    max_batch_size=MAX_BATCH_SIZE
+)
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "backend.src.api.metrics_collection.app:app",
-        host="0.0.0.0",
-        port=5000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    import os
+    from ..server import run
+    run("src.api.metrics_collection.app:app", port=int(os.getenv("METRICS_API_PORT", "5000")))
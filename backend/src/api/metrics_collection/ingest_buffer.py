@@ -0,0 +1,90 @@
+"""
+Coalescing of single metric submissions into batched database writes.
+
+Each ``POST /metrics`` otherwise costs its own transaction. When a batching
+window is configured, submissions arriving within it are written together
+with one agent upsert and one multi-row insert, and every caller gets its own
+metric ID once the shared transaction commits.
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from .models import MetricsSubmission
+
+
+# Writes a batch in one transaction, returning metric IDs in submission order
+BatchWriter = Callable[[List[MetricsSubmission]], Awaitable[List[str]]]
+
+
+class IngestBuffer:
+    """
+    Buffer flushed when it holds ``max_batch_size`` submissions or when
+    ``window_seconds`` have passed since the first one arrived.
+
+    A failed flush fails every submission in that batch.
+    """
+
+    def __init__(self, writer: BatchWriter, window_seconds: float, max_batch_size: int):
+        """Initialize the buffer; a zero window disables batching."""
+        self.writer = writer
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[MetricsSubmission, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether submissions should be routed through the buffer."""
+        return self.window_seconds > 0
+
+    async def submit(self, metrics: MetricsSubmission) -> str:
+        """Queue a submission and return its metric ID once it is committed."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((metrics, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+
+        return await future
+
+    async def close(self) -> None:
+        """Write any buffered submissions and wait for in-flight flushes."""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self) -> None:
+        """Hand the pending submissions to a flush task and reset the window."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        # Keep a reference so the task is not garbage collected mid-write
+        task = asyncio.create_task(self._flush(pending))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, pending: List[Tuple[MetricsSubmission, asyncio.Future]]) -> None:
+        try:
+            metric_ids = await self.writer([metrics for metrics, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), metric_id in zip(pending, metric_ids):
+            if not future.done():
+                future.set_result(metric_id)
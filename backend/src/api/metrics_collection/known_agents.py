@@ -0,0 +1,70 @@
+"""
+In-process memo of agent IDs known to exist in ``ai_agents``.
+
+In steady state the same agents submit metrics over and over, so remembering
+which ones are registered lets ``submit_metrics`` update them directly
+instead of looking each one up first.
+"""
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+
+# Upper bound on remembered agent IDs; least recently seen are evicted first
+KNOWN_AGENTS_MAX_SIZE = 10000
+
+
+class KnownAgents:
+    """
+    Bounded LRU set of agent IDs.
+
+    Operations never await, so they are atomic on the event loop and need no
+    lock. Membership is a hint only: callers must still cope with an agent
+    that was deleted after it was remembered.
+    """
+
+    def __init__(self, max_size: int = KNOWN_AGENTS_MAX_SIZE):
+        """Initialize an empty set holding at most ``max_size`` IDs."""
+        self.max_size = max_size
+        self._agent_ids: "OrderedDict[str, None]" = OrderedDict()
+
+    def __contains__(self, agent_id: str) -> bool:
+        """Check membership, marking the agent as recently seen."""
+        if agent_id not in self._agent_ids:
+            return False
+        self._agent_ids.move_to_end(agent_id)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._agent_ids)
+
+    def add(self, agent_id: str) -> None:
+        """Remember an agent, evicting the least recently seen when full."""
+        self._agent_ids[agent_id] = None
+        self._agent_ids.move_to_end(agent_id)
+        if len(self._agent_ids) > self.max_size:
+            self._agent_ids.popitem(last=False)
+
+    def update(self, agent_ids: Iterable[str]) -> None:
+        """Remember several agents."""
+        for agent_id in agent_ids:
+            self.add(agent_id)
+
+    def discard(self, agent_id: str) -> None:
+        """Forget an agent, e.g. after finding it no longer exists."""
+        self._agent_ids.pop(agent_id, None)
+
+    def clear(self) -> None:
+        """Forget all agents."""
+        self._agent_ids.clear()
+
+
+# Global known agents instance
+_known_agents: Optional[KnownAgents] = None
+
+
+def get_known_agents() -> KnownAgents:
+    """Get the global known agents instance."""
+    global _known_agents
+    if _known_agents is None:
+        _known_agents = KnownAgents()
+    return _known_agents
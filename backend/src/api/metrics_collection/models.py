@@ -2,9 +2,16 @@
 Pydantic models for Metrics Collection API requests and responses.
 """
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, Union
-from pydantic import BaseModel, Field, validator
-import uuid
+from typing import Dict, Any, List, Optional, Union
+from pydantic import BaseModel, Field, field_validator
+import re
+import time
+
+
+# Canonical 8-4-4-4-12 hex form, the same form agent IDs are stored and cached in
+UUID_PATTERN = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
 
 
 class MetricsSubmission(BaseModel):
@@ -64,34 +71,35 @@ class MetricsSubmission(BaseModel):
         example={"model_tokens": 1500, "cache_hit_rate": 0.85}
     )
     
-    @validator('agent_id')
-    def validate_agent_id(cls, v):
+    @field_validator('agent_id')
+    @classmethod
+    def validate_agent_id(cls, v: str) -> str:
         """Validate agent_id is a valid UUID string."""
-        try:
-            uuid.UUID(v)
-            return v
-        except ValueError:
+        if len(v) != 36 or UUID_PATTERN.fullmatch(v) is None:
             raise ValueError('agent_id must be a valid UUID string')
+        return v
     
-    @validator('timestamp')
-    def validate_timestamp_not_future(cls, v):
-        """Validate timestamp is not in the future."""
-        now = datetime.now(timezone.utc)
-        if v.replace(tzinfo=timezone.utc) > now:
+    @field_validator('timestamp')
+    @classmethod
+    def validate_timestamp_not_future(cls, v: datetime) -> datetime:
+        """Validate timestamp is not in the future (naive timestamps are UTC)."""
+        # Compare epoch seconds rather than building a datetime for "now"
+        aware = v if v.tzinfo else v.replace(tzinfo=timezone.utc)
+        if aware.timestamp() > time.time():
             raise ValueError('timestamp cannot be in the future')
         return v
     
     def has_metrics(self) -> bool:
         """Check if submission has any actual metric data."""
-        return any([
-            self.latency_ms is not None,
-            self.throughput_req_per_min is not None,
-            self.cost_per_request is not None,
-            self.cpu_usage_percent is not None,
-            self.gpu_usage_percent is not None,
-            self.memory_usage_mb is not None,
-            self.custom_metrics and len(self.custom_metrics) > 0
-        ])
+        return (
+            self.latency_ms is not None
+            or self.throughput_req_per_min is not None
+            or self.cost_per_request is not None
+            or self.cpu_usage_percent is not None
+            or self.gpu_usage_percent is not None
+            or self.memory_usage_mb is not None
+            or bool(self.custom_metrics)
+        )
 
 
 class SuccessResponse(BaseModel):
@@ -110,6 +118,27 @@ class SuccessResponse(BaseModel):
     )
 
 
+class BatchSuccessResponse(BaseModel):
+    """Model for successful batch submission responses."""
+    
+    success: bool = Field(True, description="Operation success status")
+    message: str = Field(
+        ...,
+        description="Success message",
+        example="Metrics recorded successfully"
+    )
+    count: int = Field(
+        ...,
+        description="Number of metrics recorded",
+        example=2
+    )
+    metric_ids: List[str] = Field(
+        ...,
+        description="Identifiers of the recorded metrics, in submission order",
+        example=["123e4567-e89b-12d3-a456-426614174000"]
+    )
+
+
 class ErrorResponse(BaseModel):
     """Model for error API responses."""
     
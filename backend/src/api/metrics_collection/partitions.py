@@ -0,0 +1,131 @@
+"""
+Routing of metric inserts to the monthly partitions of ``performance_metrics``.
+
+Inserting through the partitioned parent makes PostgreSQL route every row to
+its partition. When the month partition for a row exists (they are created by
+``create_monthly_partition`` from the initial schema), batched writes insert
+into it directly instead. Rows near a month boundary, months without their own
+partition (those rows live in the default partition) and databases other than
+PostgreSQL keep going through the parent.
+
+Upcoming month partitions are created by ``MetricPartitions.maintain``, which
+the Metrics Collection API runs periodically.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import column, insert, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import Insert
+
+from ...models import PerformanceMetric
+
+
+# Partition bounds are dates in the server's time zone, so rows this close to a
+# UTC month boundary are left to PostgreSQL's own routing
+BOUNDARY_MARGIN = timedelta(days=1)
+
+# How long the list of existing partitions is trusted before it is re-read
+PARTITION_REFRESH_SECONDS = 300.0
+
+# How often upcoming partitions are created
+PARTITION_MAINTENANCE_SECONDS = 3600.0
+
+# Months after the current one that get their partition ahead of time
+PARTITION_MONTHS_AHEAD = 2
+
+MAINTAIN_PARTITIONS_QUERY = text("""
+    SELECT ensure_metric_partitions(:months_ahead)
+""")
+
+PARTITIONS_QUERY = text("""
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = 'performance_metrics'::regclass
+""")
+
+
+def partition_name(timestamp: datetime) -> str:
+    """Name ``create_monthly_partition`` gives the partition holding ``timestamp``."""
+    return f"{PerformanceMetric.__tablename__}_{timestamp:%Y_%m}"
+
+
+class MetricPartitions:
+    """
+    Known monthly partitions and a prebuilt INSERT for each.
+
+    Knowledge of a partition is refreshed every ``refresh_seconds``; until a
+    new partition is seen, its rows are simply routed through the parent.
+    """
+
+    def __init__(self, refresh_seconds: float = PARTITION_REFRESH_SECONDS):
+        """Initialize with no known partitions."""
+        self.refresh_seconds = refresh_seconds
+        self._names: Set[str] = set()
+        self._inserts: Dict[str, Insert] = {}
+        self._refreshed_at: Optional[float] = None
+
+    async def refresh_if_stale(self, db: AsyncSession) -> None:
+        """Re-read the existing partitions if the list is older than ``refresh_seconds``."""
+        now = time.monotonic()
+        if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return
+
+        result = await db.execute(PARTITIONS_QUERY)
+        self.update(result.scalars())
+        self._refreshed_at = now
+
+    async def maintain(self, db: AsyncSession, months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+        """
+        Create partitions for upcoming months.
+
+        The caller commits. The partition list is re-read on the next
+        ``refresh_if_stale``. Returns the number created.
+        """
+        result = await db.execute(MAINTAIN_PARTITIONS_QUERY, {"months_ahead": months_ahead})
+        created = result.scalar_one()
+        self._refreshed_at = None
+        return created
+
+    def update(self, names: Iterable[str]) -> None:
+        """Replace the known partition names."""
+        self._names = set(names)
+
+    def insert_for(self, timestamp: datetime) -> Optional[Insert]:
+        """INSERT into the partition for ``timestamp``, or None to use the parent table."""
+        if not self._names:
+            return None
+
+        # Naive timestamps are UTC, as in submission validation
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc)
+        month_start = timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+        if timestamp - month_start < BOUNDARY_MARGIN or next_month_start - timestamp < BOUNDARY_MARGIN:
+            return None
+
+        name = partition_name(timestamp)
+        if name not in self._names:
+            return None
+
+        stmt = self._inserts.get(name)
+        if stmt is None:
+            partition = table(
+                name, *(column(c.name, c.type) for c in PerformanceMetric.__table__.columns)
+            )
+            stmt = self._inserts[name] = insert(partition)
+        return stmt
+
+
+# Global metric partitions instance
+_metric_partitions: Optional[MetricPartitions] = None
+
+
+def get_metric_partitions() -> MetricPartitions:
+    """Get the global metric partitions instance."""
+    global _metric_partitions
+    if _metric_partitions is None:
+        _metric_partitions = MetricPartitions()
+    return _metric_partitions
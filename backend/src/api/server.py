@@ -0,0 +1,39 @@
+"""
+Uvicorn launcher shared by the Sentinel AI APIs.
+
+Production runs a single worker (``API_WORKERS`` sets more) on
+uvloop and httptools, with access logging off. Set ``API_RELOAD=true`` for
+development: a single auto-reloading worker with access logging on.
+
+Every worker process has its own database pool. Set
+``DATABASE_MAX_CONNECTIONS`` to the connections this API may use in total
+and each worker's pool is sized to its share (see ``DatabaseConfig``).
+"""
+import os
+import sys
+
+
+def get_worker_count() -> int:
+    """Number of worker processes configured for this API."""
+    return int(os.getenv("API_WORKERS") or 1)
+
+
+def run(app_path: str, port: int) -> None:
+    """Run the ASGI application at ``app_path`` with uvicorn."""
+    import uvicorn
+
+    reload = os.getenv("API_RELOAD", "false").lower() == "true"
+    # uvloop is unavailable on Windows, where uvicorn falls back to asyncio
+    loop = "auto" if sys.platform == "win32" else "uvloop"
+
+    uvicorn.run(
+        app_path,
+        host="0.0.0.0",
+        port=port,
+        reload=reload,
+        workers=1 if reload else get_worker_count(),
+        loop=loop,
+        http="httptools",
+        log_level=os.getenv("LOG_LEVEL", "info").lower(),
+        access_log=reload
+    )
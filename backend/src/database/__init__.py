@@ -2,6 +2,9 @@
 Database package for Sentinel AI.
 
 This package contains database configuration, migrations, and utilities.
+Engines and sessions come only from the ``DatabaseManager`` singleton in
+``config`` (see ``get_database_manager``), so each process has one pool per
+engine.
 """
 
 from .config import (
@@ -9,8 +12,10 @@ from .config import (
     DatabaseManager,
     get_database_manager,
     get_db_session,
+    get_async_db_session,
     init_database,
     close_database,
+    close_database_async,
 )
 from .migrations import run_migrations, create_migration
 
@@ -19,8 +24,10 @@ __all__ = [
     "DatabaseManager", 
     "get_database_manager",
     "get_db_session",
+    "get_async_db_session",
     "init_database",
     "close_database",
+    "close_database_async",
     "run_migrations",
     "create_migration",
 ]
\ No newline at end of file
@@ -1,28 +1,73 @@
 """
 Database configuration and connection management for Sentinel AI.
 """
+import asyncio
 import os
-from contextlib import contextmanager
-from typing import Generator, Optional
+import time
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager, suppress
+from typing import AsyncGenerator, Dict, Generator, Optional, Tuple
 
-from sqlalchemy import create_engine, Engine
+import orjson
+from sqlalchemy import create_engine, Engine, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 
 from ..models import Base
 
 
+# Health probes within this window reuse the previous liveness result
+HEALTH_CHECK_CACHE_SECONDS = 2.0
+
+# Idle pooled connections are pinged this often instead of on every checkout
+KEEPALIVE_INTERVAL_SECONDS = 30.0
+
+
+def _json_dumps(value) -> str:
+    """Serialize JSON/JSONB column values with orjson."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class DatabaseConfig:
     """Database configuration class."""
     
     def __init__(self):
         """Initialize database configuration from environment variables."""
         self.database_url = self._build_database_url()
+        self.async_database_url = self._build_async_database_url()
         self.echo = os.getenv("DATABASE_ECHO", "false").lower() == "true"
-        self.pool_size = int(os.getenv("DATABASE_POOL_SIZE", "10"))
-        self.max_overflow = int(os.getenv("DATABASE_MAX_OVERFLOW", "20"))
+        self.pool_size, self.max_overflow = self._pool_limits()
         self.pool_timeout = int(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
         self.pool_recycle = int(os.getenv("DATABASE_POOL_RECYCLE", "3600"))
+        self.query_cache_size = int(os.getenv("DATABASE_QUERY_CACHE_SIZE", "1200"))
+        self.statement_cache_size = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "500"))
+    
+    def _pool_limits(self) -> Tuple[int, int]:
+        """
+        Pool size and max overflow per API worker process.
+        
+        Each worker has its own pool, so ``DATABASE_MAX_CONNECTIONS`` is split
+        across ``API_WORKERS`` (default: 1) and a worker's pool plus overflow
+        stay within its share; a third of the share is overflow unless
+        ``DATABASE_MAX_OVERFLOW`` is set. Without a connection budget the
+        defaults are 20 and 10. ``DATABASE_POOL_SIZE`` overrides the size.
+        """
+        pool_size = os.getenv("DATABASE_POOL_SIZE")
+        max_overflow = os.getenv("DATABASE_MAX_OVERFLOW")
+        max_connections = os.getenv("DATABASE_MAX_CONNECTIONS")
+        if not max_connections:
+            return int(pool_size or 20), int(max_overflow or 10)
+        
+        workers = int(os.getenv("API_WORKERS") or 1)
+        share = max(1, int(max_connections) // workers)
+        overflow = min(int(max_overflow), share - 1) if max_overflow else share // 3
+        return int(pool_size or share - overflow), overflow
     
     def _build_database_url(self) -> str:
         """Build database URL from environment variables."""
@@ -39,6 +84,17 @@ class DatabaseConfig:
         db_password = os.getenv("DATABASE_PASSWORD", "")
         
         return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+    
+    def _build_async_database_url(self) -> str:
+        """Build the asyncpg variant of the database URL for the async engine."""
+        async_database_url = os.getenv("ASYNC_DATABASE_URL")
+        if async_database_url:
+            return async_database_url
+        
+        scheme, separator, rest = self.database_url.partition("://")
+        if scheme.split("+")[0] in ("postgresql", "postgres"):
+            return f"postgresql+asyncpg{separator}{rest}"
+        return self.database_url
 
 
 class DatabaseManager:
@@ -49,6 +105,10 @@ class DatabaseManager:
         self.config = config or DatabaseConfig()
         self._engine: Optional[Engine] = None
         self._session_factory: Optional[sessionmaker] = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory: Optional[async_sessionmaker] = None
+        self._last_health: Optional[Tuple[float, bool]] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
     
     @property
     def engine(self) -> Engine:
@@ -62,14 +122,47 @@ class DatabaseManager:
                 max_overflow=self.config.max_overflow,
                 pool_timeout=self.config.pool_timeout,
                 pool_recycle=self.config.pool_recycle,
-                # PostgreSQL specific optimizations
+                query_cache_size=self.config.query_cache_size,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads,
+                # PostgreSQL specific optimizations; TCP keepalives let the
+                # kernel detect dead sockets instead of a ping per checkout
                 connect_args={
                     "connect_timeout": 10,
                     "application_name": "sentinel_ai_backend",
+                    "keepalives": 1,
+                    "keepalives_idle": 30,
+                    "keepalives_interval": 10,
+                    "keepalives_count": 3,
                 }
             )
         return self._engine
     
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """Get or create the asyncio database engine used by the API handlers."""
+        if self._async_engine is None:
+            self._async_engine = create_async_engine(
+                self.config.async_database_url,
+                echo=self.config.echo,
+                pool_size=self.config.pool_size,
+                max_overflow=self.config.max_overflow,
+                pool_timeout=self.config.pool_timeout,
+                pool_recycle=self.config.pool_recycle,
+                query_cache_size=self.config.query_cache_size,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads,
+                # asyncpg specific connection settings; statements are prepared
+                # and exchanged in the binary protocol, so keep enough of them
+                # cached per connection to cover every distinct API query
+                connect_args={
+                    "timeout": 10,
+                    "prepared_statement_cache_size": self.config.statement_cache_size,
+                    "server_settings": {"application_name": "sentinel_ai_backend"},
+                }
+            )
+        return self._async_engine
+    
     @property
     def session_factory(self) -> sessionmaker:
         """Get or create session factory."""
@@ -82,6 +175,17 @@ class DatabaseManager:
             )
         return self._session_factory
     
+    @property
+    def async_session_factory(self) -> async_sessionmaker:
+        """Get or create the asyncio session factory."""
+        if self._async_session_factory is None:
+            self._async_session_factory = async_sessionmaker(
+                bind=self.async_engine,
+                autoflush=False,
+                expire_on_commit=False
+            )
+        return self._async_session_factory
+    
     def create_tables(self) -> None:
         """Create all database tables."""
         Base.metadata.create_all(bind=self.engine)
@@ -103,6 +207,29 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @asynccontextmanager
+    async def get_async_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """Get an asyncio database session with automatic cleanup."""
+        async with self.async_session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+    
+    @asynccontextmanager
+    async def get_async_connection(self) -> AsyncGenerator[AsyncConnection, None]:
+        """
+        Get a pooled asyncio connection inside a transaction.
+        
+        For hot paths that only run prebuilt Core statements and so do not
+        need a session's unit of work or identity map. Commits on success
+        and rolls back on error.
+        """
+        async with self.async_engine.begin() as conn:
+            yield conn
+    
     def get_session_sync(self) -> Session:
         """Get a database session for manual management."""
         return self.session_factory()
@@ -111,17 +238,105 @@ class DatabaseManager:
         """Test database connection."""
         try:
             with self.engine.connect() as conn:
-                conn.execute("SELECT 1")
+                conn.execute(text("SELECT 1"))
             return True
         except Exception:
             return False
     
+    async def check_health(self) -> bool:
+        """
+        Test the asyncio engine's connection for health probes.
+        
+        Results are cached for HEALTH_CHECK_CACHE_SECONDS so frequent load
+        balancer probes do not each check out a pooled connection.
+        """
+        now = time.monotonic()
+        if self._last_health and now - self._last_health[0] < HEALTH_CHECK_CACHE_SECONDS:
+            return self._last_health[1]
+        
+        try:
+            async with self.async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            healthy = True
+        except Exception:
+            healthy = False
+        
+        self._last_health = (now, healthy)
+        return healthy
+    
+    async def warm_up(self) -> int:
+        """
+        Open the asyncio engine's pool connections up front.
+        
+        Connections are established concurrently and then returned to the
+        pool, so the first requests after startup do not each pay for a new
+        connection. Returns the number of connections opened.
+        """
+        async with AsyncExitStack() as stack:
+            results = await asyncio.gather(
+                *(
+                    stack.enter_async_context(self.async_engine.connect())
+                    for _ in range(self.config.pool_size)
+                ),
+                return_exceptions=True
+            )
+        return sum(1 for result in results if not isinstance(result, BaseException))
+    
+    def start_keepalive(self, interval: float = KEEPALIVE_INTERVAL_SECONDS) -> None:
+        """
+        Start pinging the asyncio engine's idle connections in the background.
+        
+        Engines do not pre-ping on checkout, so this catches connections the
+        server or network dropped while they sat in the pool: a failed ping
+        invalidates the connection before a request can check it out.
+        Connections are pinged one at a time, so the keepalive never holds
+        more than one connection that requests could be using.
+        """
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive(interval))
+    
+    async def _keepalive(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            # The pool hands out connections oldest-returned first, so one
+            # checkout per idle connection visits each of them once
+            for _ in range(self.async_engine.pool.checkedin()):
+                if not self.async_engine.pool.checkedin():
+                    break
+                # A failed ping has invalidated its connection; go on with the rest
+                with suppress(Exception):
+                    await self._ping()
+    
+    async def _ping(self) -> None:
+        async with self.async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    def pool_status(self) -> Dict[str, int]:
+        """Get connection pool usage for the asyncio engine."""
+        pool = self.async_engine.pool
+        return {
+            "pool_size": pool.size(),
+            "pool_checked_out": pool.checkedout(),
+            "pool_overflow": pool.overflow(),
+        }
+    
     def close(self) -> None:
         """Close database engine and all connections."""
         if self._engine:
             self._engine.dispose()
             self._engine = None
             self._session_factory = None
+    
+    async def close_async(self) -> None:
+        """Close both the asyncio and the synchronous engines."""
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self._async_engine:
+            await self._async_engine.dispose()
+            self._async_engine = None
+            self._async_session_factory = None
+        self.close()
 
 
 # Global database manager instance
@@ -143,6 +358,13 @@ def get_db_session() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get an asyncio database session - dependency for async API handlers."""
+    db_manager = get_database_manager()
+    async with db_manager.get_async_session() as session:
+        yield session
+
+
 def init_database() -> None:
     """Initialize database with tables."""
     db_manager = get_database_manager()
@@ -154,4 +376,12 @@ def close_database() -> None:
     global _db_manager
     if _db_manager:
         _db_manager.close()
+        _db_manager = None
+
+
+async def close_database_async() -> None:
+    """Close asyncio and synchronous database connections."""
+    global _db_manager
+    if _db_manager:
+        await _db_manager.close_async()
         _db_manager = None
\ No newline at end of file
@@ -3,15 +3,52 @@ Database migration management utilities.
 """
 
 import os
+import re
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
+
+import sqlparse
 from sqlalchemy import text
 from .config import get_database_manager
 
 
 logger = logging.getLogger(__name__)
 
+# Transaction-local settings for migration runs: commit without waiting for
+# the WAL flush and give index builds more memory
+MIGRATION_SETTINGS = {
+    "synchronous_commit": "off",
+    "maintenance_work_mem": "1GB",
+}
+
+# Statements PostgreSQL refuses to run inside a transaction block
+_AUTOCOMMIT_STATEMENT = re.compile(
+    r"\bCONCURRENTLY\b|^\s*(VACUUM|ALTER\s+SYSTEM)\b", re.IGNORECASE | re.MULTILINE
+)
+
+
+@lru_cache(maxsize=256)
+def parse_migration(path: str, mtime: float) -> Tuple[str, ...]:
+    """
+    Split a migration file into executable statements.
+    
+    sqlparse keeps semicolons inside strings and ``$$`` function bodies
+    intact; comment-only fragments are dropped. Results are cached per file
+    version (``mtime``) so repeated runs skip reading and parsing.
+    """
+    sql_content = Path(path).read_text(encoding='utf-8')
+    return tuple(
+        statement for statement in sqlparse.split(sql_content)
+        if sqlparse.format(statement, strip_comments=True).strip()
+    )
+
+
+def requires_autocommit(statement: str) -> bool:
+    """Check whether a statement must run outside a transaction block."""
+    return bool(_AUTOCOMMIT_STATEMENT.search(sqlparse.format(statement, strip_comments=True)))
+
 
 class MigrationManager:
     """Manages database migrations and schema updates."""
@@ -34,30 +71,41 @@ class MigrationManager:
     def run_migration_file(self, file_path: Path) -> bool:
         """
         Execute a single migration file.
+        
+        Statements that cannot run inside a transaction block are applied
+        in autocommit mode after the rest of the file has committed, as in
+        ``run_all_migrations``.
         Returns True if successful, False otherwise.
         """
         try:
             logger.info(f"Running migration: {file_path.name}")
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                sql_content = f.read()
-            
-            # Split by semicolon and execute each statement
-            statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
+            statements = parse_migration(str(file_path), file_path.stat().st_mtime)
+            deferred = []
             
             with self.db_manager.engine.connect() as conn:
                 trans = conn.begin()
                 try:
                     for statement in statements:
-                        if statement:
+                        if requires_autocommit(statement):
+                            deferred.append(statement)
+                        else:
                             conn.execute(text(statement))
                     trans.commit()
-                    logger.info(f"Successfully applied migration: {file_path.name}")
-                    return True
                 except Exception as e:
                     trans.rollback()
                     logger.error(f"Error applying migration {file_path.name}: {e}")
                     raise
+            
+            if deferred:
+                with self.db_manager.engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT"
+                ) as conn:
+                    for statement in deferred:
+                        conn.execute(text(statement))
+            
+            logger.info(f"Successfully applied migration: {file_path.name}")
+            return True
                     
         except Exception as e:
             logger.error(f"Failed to run migration {file_path.name}: {e}")
@@ -65,7 +113,13 @@ class MigrationManager:
     
     def run_all_migrations(self) -> bool:
         """
-        Run all migration files in order.
+        Run all migration files in order within a single transaction.
+        
+        On PostgreSQL the transaction runs with MIGRATION_SETTINGS, so the
+        whole run needs one WAL flush at commit instead of one per file.
+        Statements that cannot run inside a transaction block (such as
+        ``CREATE INDEX CONCURRENTLY``) are applied afterwards in autocommit
+        mode.
         Returns True if all migrations successful, False otherwise.
         """
         migration_files = self.get_migration_files()
@@ -76,10 +130,39 @@ class MigrationManager:
             
         logger.info(f"Found {len(migration_files)} migration files")
         
-        for migration_file in migration_files:
-            if not self.run_migration_file(migration_file):
-                logger.error(f"Migration failed at: {migration_file.name}")
-                return False
+        deferred: List[str] = []
+        migration_file = None
+        try:
+            with self.db_manager.engine.begin() as conn:
+                if conn.dialect.name == "postgresql":
+                    for name, value in MIGRATION_SETTINGS.items():
+                        conn.execute(
+                            text("SELECT set_config(:name, :value, true)"),
+                            {"name": name, "value": value}
+                        )
+                
+                for migration_file in migration_files:
+                    logger.info(f"Running migration: {migration_file.name}")
+                    for statement in parse_migration(
+                        str(migration_file), migration_file.stat().st_mtime
+                    ):
+                        if requires_autocommit(statement):
+                            deferred.append(statement)
+                        else:
+                            conn.execute(text(statement))
+            
+            migration_file = None
+            if deferred:
+                logger.info(f"Running {len(deferred)} non-transactional statements")
+                with self.db_manager.engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT"
+                ) as conn:
+                    for statement in deferred:
+                        conn.execute(text(statement))
+        except Exception as e:
+            failed_at = migration_file.name if migration_file else "non-transactional statements"
+            logger.error(f"Migration failed at: {failed_at}: {e}")
+            return False
                 
         logger.info("All migrations completed successfully")
         return True
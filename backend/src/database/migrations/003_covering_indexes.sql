@@ -0,0 +1,20 @@
+-- Covering indexes for the Data Retrieval API hot paths
+-- Version: 1.1.0
+
+-- /metrics and /export filter on agent_id and a timestamp range, then order (and
+-- keyset-paginate) by timestamp, metric_id. Including the numeric metric columns lets
+-- PostgreSQL answer them with an index-only scan. CONCURRENTLY is not available for
+-- partitioned tables, so the index is built normally and cascades to every partition.
+CREATE INDEX IF NOT EXISTS idx_metrics_agent_timestamp_covering
+    ON performance_metrics (agent_id, timestamp DESC, metric_id DESC)
+    INCLUDE (latency_ms, throughput_req_per_min, cost_per_request,
+             cpu_usage_percent, gpu_usage_percent, memory_usage_mb);
+
+-- Superseded by the covering index above (same leading columns)
+DROP INDEX IF EXISTS idx_metrics_agent_timestamp;
+
+-- /agents orders by (created_at, agent_id) DESC, optionally filtered by status
+CREATE INDEX IF NOT EXISTS idx_ai_agents_created
+    ON ai_agents (created_at DESC, agent_id DESC);
+CREATE INDEX IF NOT EXISTS idx_ai_agents_status_created
+    ON ai_agents (status, created_at DESC, agent_id DESC);
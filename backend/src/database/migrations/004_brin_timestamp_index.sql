@@ -0,0 +1,17 @@
+-- BRIN index for time-range scans on performance_metrics
+-- Version: 1.2.0
+
+-- Metrics are appended in timestamp order within each monthly partition, so a BRIN
+-- index (min/max per block range) prunes time-range scans at a tiny fraction of the
+-- B-tree's size and insert cost. Lookups by agent use the covering index from 003.
+CREATE INDEX IF NOT EXISTS idx_metrics_timestamp_brin
+    ON performance_metrics USING brin (timestamp)
+    WITH (pages_per_range = 32);
+
+-- BRIN cannot return rows in order, so the unfiltered keyset listing on /metrics
+-- (ORDER BY timestamp DESC, metric_id DESC LIMIT n) keeps a B-tree matching its
+-- sort; it supersedes the timestamp-only B-tree from the initial schema
+CREATE INDEX IF NOT EXISTS idx_metrics_timestamp_keyset
+    ON performance_metrics (timestamp DESC, metric_id DESC);
+
+DROP INDEX IF EXISTS idx_metrics_timestamp;
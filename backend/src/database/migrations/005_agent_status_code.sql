@@ -0,0 +1,58 @@
+-- Store ai_agents.status as a smallint code
+-- Version: 1.3.0
+
+-- Codes match STATUS_BY_CODE in src/models/agent.py:
+--   0 = unknown, 1 = running, 2 = stopped, 3 = error
+-- A smallint takes 2 bytes per row against the enum's 4, and new statuses
+-- no longer need ALTER TYPE. The views read the column, so they are rebuilt around
+-- the change and keep reporting the status label.
+DROP VIEW IF EXISTS agent_summary;
+DROP VIEW IF EXISTS recent_metrics;
+DROP INDEX IF EXISTS idx_ai_agents_status;
+
+ALTER TABLE ai_agents ALTER COLUMN status DROP DEFAULT;
+ALTER TABLE ai_agents ALTER COLUMN status TYPE SMALLINT USING (
+    CASE status::text
+        WHEN 'running' THEN 1
+        WHEN 'stopped' THEN 2
+        WHEN 'error' THEN 3
+        ELSE 0
+    END
+);
+ALTER TABLE ai_agents ALTER COLUMN status SET DEFAULT 0;
+ALTER TABLE ai_agents ADD CONSTRAINT ai_agents_status_code_valid CHECK (status BETWEEN 0 AND 3);
+
+DROP TYPE IF EXISTS agent_status;
+
+-- Agents that are not running
+CREATE INDEX IF NOT EXISTS idx_ai_agents_status ON ai_agents (status) WHERE status <> 1;
+
+CREATE OR REPLACE FUNCTION agent_status_label(code SMALLINT) RETURNS TEXT AS $$
+    SELECT (ARRAY['unknown', 'running', 'stopped', 'error'])[code + 1];
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE VIEW agent_summary AS
+SELECT 
+    a.agent_id,
+    a.name,
+    agent_status_label(a.status) as status,
+    a.created_at,
+    a.last_seen,
+    COUNT(m.metric_id) as total_metrics,
+    MAX(m.timestamp) as latest_metric_timestamp
+FROM ai_agents a
+LEFT JOIN performance_metrics m ON a.agent_id = m.agent_id
+GROUP BY a.agent_id, a.name, a.status, a.created_at, a.last_seen;
+
+CREATE VIEW recent_metrics AS
+SELECT 
+    m.*,
+    a.name as agent_name,
+    agent_status_label(a.status) as agent_status
+FROM performance_metrics m
+JOIN ai_agents a ON m.agent_id = a.agent_id
+WHERE m.timestamp >= CURRENT_TIMESTAMP - INTERVAL '1 hour'
+ORDER BY m.timestamp DESC;
+
+GRANT SELECT ON agent_summary TO sentinel_app;
+GRANT SELECT ON recent_metrics TO sentinel_app;
@@ -0,0 +1,99 @@
+-- Pre-aggregated metric rollups
+-- Version: 1.4.0
+
+-- Per agent and UTC minute/hour/day bucket, the counts, sums and extremes needed to
+-- derive averages and totals for that bucket or any coarser interval. Aggregation
+-- queries read whole buckets from here and only scan performance_metrics for partial
+-- buckets at the edges of the requested range and for rows not yet rolled up.
+
+CREATE TABLE IF NOT EXISTS performance_metrics_minute (
+    agent_id UUID NOT NULL REFERENCES ai_agents(agent_id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    metric_count BIGINT NOT NULL DEFAULT 0,
+    latency_count BIGINT NOT NULL DEFAULT 0,
+    latency_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_sum_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_min DOUBLE PRECISION,
+    latency_max DOUBLE PRECISION,
+    throughput_count BIGINT NOT NULL DEFAULT 0,
+    throughput_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cost_count BIGINT NOT NULL DEFAULT 0,
+    cost_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cpu_count BIGINT NOT NULL DEFAULT 0,
+    cpu_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gpu_count BIGINT NOT NULL DEFAULT 0,
+    gpu_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    memory_count BIGINT NOT NULL DEFAULT 0,
+    memory_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (agent_id, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS performance_metrics_hour (
+    agent_id UUID NOT NULL REFERENCES ai_agents(agent_id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    metric_count BIGINT NOT NULL DEFAULT 0,
+    latency_count BIGINT NOT NULL DEFAULT 0,
+    latency_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_sum_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_min DOUBLE PRECISION,
+    latency_max DOUBLE PRECISION,
+    throughput_count BIGINT NOT NULL DEFAULT 0,
+    throughput_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cost_count BIGINT NOT NULL DEFAULT 0,
+    cost_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cpu_count BIGINT NOT NULL DEFAULT 0,
+    cpu_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gpu_count BIGINT NOT NULL DEFAULT 0,
+    gpu_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    memory_count BIGINT NOT NULL DEFAULT 0,
+    memory_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (agent_id, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS performance_metrics_day (
+    agent_id UUID NOT NULL REFERENCES ai_agents(agent_id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    metric_count BIGINT NOT NULL DEFAULT 0,
+    latency_count BIGINT NOT NULL DEFAULT 0,
+    latency_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_sum_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    latency_min DOUBLE PRECISION,
+    latency_max DOUBLE PRECISION,
+    throughput_count BIGINT NOT NULL DEFAULT 0,
+    throughput_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cost_count BIGINT NOT NULL DEFAULT 0,
+    cost_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cpu_count BIGINT NOT NULL DEFAULT 0,
+    cpu_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gpu_count BIGINT NOT NULL DEFAULT 0,
+    gpu_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    memory_count BIGINT NOT NULL DEFAULT 0,
+    memory_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (agent_id, bucket_start)
+);
+
+-- Metrics created before rolled_up_to have been added to the rollups. Starting at
+-- -infinity makes the first refresh backfill every existing metric.
+CREATE TABLE IF NOT EXISTS metric_rollup_state (
+    state_id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (state_id = 1),
+    rolled_up_to TIMESTAMP WITH TIME ZONE NOT NULL
+);
+INSERT INTO metric_rollup_state (state_id, rolled_up_to) VALUES (1, '-infinity')
+    ON CONFLICT (state_id) DO NOTHING;
+
+-- The refresh watermark is compared against the time each metric was inserted, which
+-- 001 does not record. Adding the column to the partitioned parent adds it to every
+-- existing partition, and later partitions inherit it. CURRENT_TIMESTAMP is evaluated
+-- once here, so existing rows are stamped with the migration time without a rewrite
+-- and are picked up by the first refresh.
+ALTER TABLE performance_metrics
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+-- The refresh job selects newly created metrics; rows are appended in created_at order
+CREATE INDEX IF NOT EXISTS idx_metrics_created_brin
+    ON performance_metrics USING brin (created_at);
+
+GRANT SELECT, INSERT, UPDATE ON performance_metrics_minute TO sentinel_app;
+GRANT SELECT, INSERT, UPDATE ON performance_metrics_hour TO sentinel_app;
+GRANT SELECT, INSERT, UPDATE ON performance_metrics_day TO sentinel_app;
+GRANT SELECT, UPDATE ON metric_rollup_state TO sentinel_app;
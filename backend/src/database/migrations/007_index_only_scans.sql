@@ -0,0 +1,49 @@
+-- Keep the covering index usable for index-only scans
+-- Version: 1.5.0
+
+-- idx_metrics_agent_timestamp_covering (003) already holds (agent_id, timestamp,
+-- metric_id) plus every numeric metric, but PostgreSQL only skips the heap fetch for
+-- pages marked all-visible in the visibility map, and only VACUUM sets those bits.
+-- Metrics are insert-only, so by default a partition is vacuumed after 20% growth and
+-- recent pages - the ones aggregations read most - stay unmarked. Vacuum metric
+-- partitions after every 1% (at least 10000 rows) of inserts instead.
+DO $$
+DECLARE
+    partition_name TEXT;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'performance_metrics'::regclass
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %I SET (autovacuum_vacuum_insert_scale_factor = 0.01, '
+            'autovacuum_vacuum_insert_threshold = 10000)',
+            partition_name
+        );
+    END LOOP;
+END;
+$$;
+
+-- New monthly partitions get the same settings
+CREATE OR REPLACE FUNCTION create_monthly_partition(table_name TEXT, start_date DATE)
+RETURNS VOID AS $$
+DECLARE
+    partition_name TEXT;
+    end_date DATE;
+BEGIN
+    partition_name := table_name || '_' || to_char(start_date, 'YYYY_MM');
+    end_date := start_date + INTERVAL '1 month';
+
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, table_name, start_date, end_date);
+    IF table_name = 'performance_metrics' THEN
+        EXECUTE format('ALTER TABLE %I SET (autovacuum_vacuum_insert_scale_factor = 0.01, '
+                       'autovacuum_vacuum_insert_threshold = 10000)', partition_name);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Set the visibility map and planner statistics for existing rows now
+VACUUM (ANALYZE) performance_metrics;
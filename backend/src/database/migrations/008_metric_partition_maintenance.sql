@@ -0,0 +1,58 @@
+-- Rolling monthly partitions for performance_metrics
+-- Version: 1.6.0
+
+-- performance_metrics is range partitioned by month, but partitions were only created
+-- for the three months after the initial schema; later rows all land in the default
+-- partition, where time-range queries cannot be pruned. This function is called
+-- periodically by the Metrics Collection API (see partitions.py).
+
+-- Create the partitions for the current month and the next months_ahead months.
+-- A month whose rows already sit in the default partition is skipped with a notice.
+-- Batched ingest inserts into partitions directly, so the app role needs the same
+-- privileges on them as on the parent.
+CREATE OR REPLACE FUNCTION ensure_metric_partitions(months_ahead INTEGER DEFAULT 2)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE;
+    created INTEGER := 0;
+BEGIN
+    FOR month_offset IN 0..months_ahead LOOP
+        month_start := date_trunc('month', CURRENT_DATE + make_interval(months => month_offset));
+        IF to_regclass('performance_metrics_' || to_char(month_start, 'YYYY_MM')) IS NULL THEN
+            BEGIN
+                PERFORM create_monthly_partition('performance_metrics', month_start);
+                EXECUTE format('GRANT SELECT, INSERT ON %I TO sentinel_app',
+                               'performance_metrics_' || to_char(month_start, 'YYYY_MM'));
+                created := created + 1;
+            EXCEPTION WHEN check_violation THEN
+                RAISE NOTICE 'rows for % are in the default partition; not creating it', month_start;
+            END;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Partitions are never dropped automatically; raw metrics are only deleted on purpose.
+-- Remove the retention drop function installed by earlier versions of this migration.
+DROP FUNCTION IF EXISTS drop_expired_metric_partitions();
+
+GRANT EXECUTE ON FUNCTION ensure_metric_partitions(INTEGER) TO sentinel_app;
+
+-- Existing partitions, including the default one
+DO $$
+DECLARE
+    partition_name TEXT;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'performance_metrics'::regclass
+    LOOP
+        EXECUTE format('GRANT SELECT, INSERT ON %I TO sentinel_app', partition_name);
+    END LOOP;
+END;
+$$;
+
+SELECT ensure_metric_partitions();
@@ -0,0 +1,13 @@
+-- BRIN indexes for time-range scans on the metric rollup tables
+-- Version: 1.7.0
+
+-- performance_metrics already has a BRIN index on timestamp (004). The rollup tables'
+-- primary keys lead with agent_id, so aggregations across all agents had to scan a
+-- rollup table in full. Rollup rows are written in bucket order, so a BRIN index on
+-- bucket_start prunes those scans to the requested range.
+CREATE INDEX IF NOT EXISTS idx_performance_metrics_minute_bucket_brin
+    ON performance_metrics_minute USING brin (bucket_start);
+CREATE INDEX IF NOT EXISTS idx_performance_metrics_hour_bucket_brin
+    ON performance_metrics_hour USING brin (bucket_start);
+CREATE INDEX IF NOT EXISTS idx_performance_metrics_day_bucket_brin
+    ON performance_metrics_day USING brin (bucket_start);
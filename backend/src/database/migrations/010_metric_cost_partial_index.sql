@@ -0,0 +1,12 @@
+-- Partial covering index for cost queries
+-- Version: 1.8.0
+
+-- Cost analysis filters raw metrics by agent and time range and only reads rows with
+-- a cost. The covering index from 003 answers these with index-only scans but also
+-- carries every metric without a cost and five other included columns. This index
+-- holds only rows with a cost and only the cost, so cost scans read far fewer pages.
+-- As in 003, CONCURRENTLY is not available for partitioned tables.
+CREATE INDEX IF NOT EXISTS idx_metrics_agent_timestamp_cost
+    ON performance_metrics (agent_id, timestamp)
+    INCLUDE (cost_per_request)
+    WHERE cost_per_request IS NOT NULL;
@@ -9,6 +9,7 @@ from .agent import AIAgent, AgentStatus
 from .metric import PerformanceMetric
 from .session import UserSession
 from .configuration import MonitoringConfiguration
+from .rollup import MetricRollupMinute, MetricRollupHour, MetricRollupDay, MetricRollupState
 
 # Export all models for easy import
 __all__ = [
@@ -19,4 +20,8 @@ __all__ = [
     "PerformanceMetric",
     "UserSession",
     "MonitoringConfiguration",
+    "MetricRollupMinute",
+    "MetricRollupHour",
+    "MetricRollupDay",
+    "MetricRollupState",
 ]
\ No newline at end of file
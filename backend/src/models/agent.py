@@ -3,10 +3,11 @@ AI Agents SQLAlchemy model for Sentinel AI.
 """
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Enum, DateTime, CheckConstraint, JSON
+from sqlalchemy import Column, String, Text, DateTime, CheckConstraint, Index, JSON, SmallInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 
 from .base import BaseModel
 
@@ -19,6 +20,27 @@ class AgentStatus(enum.Enum):
     UNKNOWN = "unknown"
 
 
+# Stored smallint code for each status, indexed by code
+STATUS_BY_CODE = (AgentStatus.UNKNOWN, AgentStatus.RUNNING, AgentStatus.STOPPED, AgentStatus.ERROR)
+CODE_BY_STATUS = {status: code for code, status in enumerate(STATUS_BY_CODE)}
+
+
+class AgentStatusCode(TypeDecorator):
+    """Stores ``AgentStatus`` as a smallint code and loads it back as the enum member."""
+    impl = SmallInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return CODE_BY_STATUS[AgentStatus(value)]
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return STATUS_BY_CODE[value]
+
+
 class AIAgent(BaseModel):
     """AI Agent model representing monitored AI agents in the system."""
     __tablename__ = "ai_agents"
@@ -29,7 +51,7 @@ class AIAgent(BaseModel):
     # Basic information
     name = Column(String(255), nullable=False, unique=True)
     description = Column(Text)
-    status = Column(Enum(AgentStatus), nullable=False, default=AgentStatus.UNKNOWN)
+    status = Column(AgentStatusCode, nullable=False, default=AgentStatus.UNKNOWN)
     
     # Timestamps
     last_seen = Column(DateTime(timezone=True))
@@ -53,6 +75,10 @@ class AIAgent(BaseModel):
     __table_args__ = (
         CheckConstraint("length(trim(name)) > 0", name="ai_agents_name_not_empty"),
         CheckConstraint("last_seen <= CURRENT_TIMESTAMP", name="ai_agents_last_seen_not_future"),
+        CheckConstraint("status BETWEEN 0 AND 3", name="ai_agents_status_code_valid"),
+        # Indexes
+        Index("idx_ai_agents_created", "created_at", "agent_id"),
+        Index("idx_ai_agents_status_created", "status", "created_at", "agent_id"),
     )
     
     def __repr__(self):
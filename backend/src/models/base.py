@@ -1,18 +1,39 @@
 """
 Base SQLAlchemy model and database setup for Sentinel AI.
 """
+from collections import deque
 from datetime import datetime
+import os
 import uuid
 from sqlalchemy import Column, DateTime, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import func
 
 
 # SQLAlchemy base configuration
 Base = declarative_base()
 
+# UUIDs worth of random bytes read from the OS at a time
+UUID_POOL_SIZE = 1024
+
+# Pre-read 16-byte chunks for generate_uuid; cleared in forked children so
+# worker processes never hand out the same IDs
+_uuid_bytes: deque = deque()
+os.register_at_fork(after_in_child=_uuid_bytes.clear)
+
+
+def _build_to_dict(table):
+    """Generate a function returning ``{column name: value}`` for ``table``'s columns."""
+    items = ", ".join(
+        f"{column.name!r}: self.{column.name}" if column.name.isidentifier()
+        else f"{column.name!r}: getattr(self, {column.name!r})"
+        for column in table.columns
+    )
+    namespace = {}
+    exec(f"def to_dict(self):\n    return {{{items}}}\n", namespace)
+    return namespace["to_dict"]
+
 
 class BaseModel(Base):
     """Base model with common fields and utilities."""
@@ -23,15 +44,32 @@ class BaseModel(Base):
     
     @classmethod
     def generate_uuid(cls):
-        """Generate a new UUID for primary keys."""
-        return str(uuid.uuid4())
+        """
+        Generate a new UUID4 string for primary keys.
+        
+        Random bytes are read UUID_POOL_SIZE UUIDs at a time rather than with
+        one urandom call per row.
+        """
+        try:
+            raw = _uuid_bytes.popleft()
+        except IndexError:
+            random = os.urandom(16 * UUID_POOL_SIZE)
+            _uuid_bytes.extend(random[i:i + 16] for i in range(16, len(random), 16))
+            raw = random[:16]
+        return str(uuid.UUID(bytes=raw, version=4))
     
     def to_dict(self):
-        """Convert model instance to dictionary."""
-        return {
-            column.name: getattr(self, column.name)
-            for column in self.__table__.columns
-        }
+        """
+        Convert model instance to dictionary.
+        
+        Each model class gets a serializer generated on first use that reads
+        its columns as straight-line attribute loads.
+        """
+        serializer = type(self).__dict__.get("_to_dict_serializer")
+        if serializer is None:
+            serializer = _build_to_dict(self.__table__)
+            type(self)._to_dict_serializer = serializer
+        return serializer(self)
     
     def __repr__(self):
         """String representation of the model."""
@@ -2,7 +2,9 @@
 Performance Metrics SQLAlchemy model for Sentinel AI.
 """
 from datetime import datetime
-from sqlalchemy import Column, Float, CheckConstraint, ForeignKey, Index, DateTime, JSON
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import Column, Float, CheckConstraint, ForeignKey, Index, DateTime, JSON, Row, select, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -10,6 +12,20 @@ from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 
+# Numeric metric columns of ``PerformanceMetric``
+METRIC_VALUE_COLUMNS = (
+    "latency_ms",
+    "throughput_req_per_min",
+    "cost_per_request",
+    "cpu_usage_percent",
+    "gpu_usage_percent",
+    "memory_usage_mb",
+)
+
+# Rows per server-side cursor fetch when streaming metrics
+STREAM_BATCH_SIZE = 10_000
+
+
 class PerformanceMetric(BaseModel):
     """Performance metrics model for tracking AI agent performance data."""
     __tablename__ = "performance_metrics"
@@ -56,8 +72,29 @@ class PerformanceMetric(BaseModel):
             json_array_length(custom_metrics) > 0
         """, name="performance_metrics_at_least_one_metric"),
         # Indexes
-        Index("idx_metrics_agent_timestamp", "agent_id", "timestamp"),
-        Index("idx_metrics_timestamp", "timestamp"),
+        Index(
+            "idx_metrics_agent_timestamp_covering", "agent_id", "timestamp", "metric_id",
+            postgresql_include=[
+                "latency_ms", "throughput_req_per_min", "cost_per_request",
+                "cpu_usage_percent", "gpu_usage_percent", "memory_usage_mb",
+            ],
+        ),
+        # Cost analysis only reads rows with a cost
+        Index(
+            "idx_metrics_agent_timestamp_cost", "agent_id", "timestamp",
+            postgresql_include=["cost_per_request"],
+            postgresql_where=text("cost_per_request IS NOT NULL"),
+        ),
+        # Ordered scans for the unfiltered keyset listing, which BRIN cannot provide
+        Index("idx_metrics_timestamp_keyset", "timestamp", "metric_id"),
+        # Rows arrive in timestamp order, so block-range min/max is enough to prune scans
+        Index(
+            "idx_metrics_timestamp_brin", "timestamp",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        # Lets the rollup refresh find newly created rows without a full scan
+        Index("idx_metrics_created_brin", "created_at", postgresql_using="brin"),
         # Table is partitioned by timestamp in the database
         {"postgresql_partition_by": "RANGE (timestamp)"}
     )
@@ -67,12 +104,51 @@ class PerformanceMetric(BaseModel):
     
     def has_metrics(self):
         """Check if this metric instance has any actual metric data."""
-        return any([
-            self.latency_ms is not None,
-            self.throughput_req_per_min is not None,
-            self.cost_per_request is not None,
-            self.cpu_usage_percent is not None,
-            self.gpu_usage_percent is not None,
-            self.memory_usage_mb is not None,
-            self.custom_metrics and len(self.custom_metrics) > 0
-        ])
\ No newline at end of file
+        return (
+            self.latency_ms is not None
+            or self.throughput_req_per_min is not None
+            or self.cost_per_request is not None
+            or self.cpu_usage_percent is not None
+            or self.gpu_usage_percent is not None
+            or self.memory_usage_mb is not None
+            or bool(self.custom_metrics)
+        )
+    
+    @classmethod
+    def stream_metrics(
+        cls,
+        session,
+        agent_id: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        columns: Optional[Sequence] = None
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Yield metric rows in timestamp order, in batches of STREAM_BATCH_SIZE.
+        
+        Rows are read through a server-side cursor, so only one batch is held
+        in memory regardless of how many rows the range covers.
+        
+        Args:
+            session: Synchronous database session
+            agent_id: Optional agent filter
+            start_time: Optional inclusive range start
+            end_time: Optional inclusive range end
+            columns: Columns to select (default: all table columns)
+            
+        Yields:
+            Lists of up to STREAM_BATCH_SIZE rows
+        """
+        stmt = select(*(columns or cls.__table__.columns))
+        if agent_id:
+            stmt = stmt.where(cls.agent_id == agent_id)
+        if start_time:
+            stmt = stmt.where(cls.timestamp >= start_time)
+        if end_time:
+            stmt = stmt.where(cls.timestamp <= end_time)
+        
+        result = session.execute(
+            stmt.order_by(cls.timestamp),
+            execution_options={"stream_results": True, "yield_per": STREAM_BATCH_SIZE}
+        )
+        yield from result.partitions()
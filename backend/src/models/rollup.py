@@ -0,0 +1,78 @@
+"""
+Performance metric rollup SQLAlchemy models for Sentinel AI.
+
+Each rollup table holds, per agent and UTC bucket, the counts, sums and
+extremes needed to derive averages and totals for any coarser interval
+without rescanning ``performance_metrics``.
+"""
+from sqlalchemy import Column, BigInteger, Float, DateTime, ForeignKey, Index, PrimaryKeyConstraint, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import declared_attr
+
+from .base import Base
+
+
+class MetricRollupMixin:
+    """Sufficient statistics of the metrics submitted by one agent in one bucket."""
+
+    @declared_attr
+    def agent_id(cls):
+        return Column(
+            UUID(as_uuid=False),
+            ForeignKey("ai_agents.agent_id", ondelete="CASCADE"),
+            nullable=False
+        )
+
+    # Start of the UTC bucket
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+
+    # Rows in the bucket, and per metric the non-null values and their sum
+    metric_count = Column(BigInteger, nullable=False, default=0)
+    latency_count = Column(BigInteger, nullable=False, default=0)
+    latency_sum = Column(Float, nullable=False, default=0)
+    latency_sum_sq = Column(Float, nullable=False, default=0)
+    latency_min = Column(Float)
+    latency_max = Column(Float)
+    throughput_count = Column(BigInteger, nullable=False, default=0)
+    throughput_sum = Column(Float, nullable=False, default=0)
+    cost_count = Column(BigInteger, nullable=False, default=0)
+    cost_sum = Column(Float, nullable=False, default=0)
+    cpu_count = Column(BigInteger, nullable=False, default=0)
+    cpu_sum = Column(Float, nullable=False, default=0)
+    gpu_count = Column(BigInteger, nullable=False, default=0)
+    gpu_sum = Column(Float, nullable=False, default=0)
+    memory_count = Column(BigInteger, nullable=False, default=0)
+    memory_sum = Column(Float, nullable=False, default=0)
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        return (
+            # Agent first so per-agent range scans use the primary key
+            PrimaryKeyConstraint("agent_id", "bucket_start"),
+            # Buckets are written in time order, so block-range min/max prunes
+            # time-range scans across all agents
+            Index(f"idx_{cls.__tablename__}_bucket_brin", "bucket_start", postgresql_using="brin"),
+        )
+
+
+class MetricRollupMinute(MetricRollupMixin, Base):
+    """Per-minute metric rollup."""
+    __tablename__ = "performance_metrics_minute"
+
+
+class MetricRollupHour(MetricRollupMixin, Base):
+    """Per-hour metric rollup."""
+    __tablename__ = "performance_metrics_hour"
+
+
+class MetricRollupDay(MetricRollupMixin, Base):
+    """Per-day metric rollup."""
+    __tablename__ = "performance_metrics_day"
+
+
+class MetricRollupState(Base):
+    """Single-row watermark: metrics created before ``rolled_up_to`` are in the rollups."""
+    __tablename__ = "metric_rollup_state"
+
+    state_id = Column(SmallInteger, primary_key=True, default=1)
+    rolled_up_to = Column(DateTime(timezone=True), nullable=False)
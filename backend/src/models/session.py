@@ -1,7 +1,8 @@
 """
 User Sessions SQLAlchemy model for Sentinel AI.
 """
-from datetime import datetime
+import time
+from datetime import timezone
 from sqlalchemy import Column, String, DateTime, CheckConstraint, Index, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -43,11 +44,12 @@ class UserSession(BaseModel):
         if not self.last_activity:
             return False
         
-        from datetime import datetime, timezone, timedelta
-        now = datetime.now(timezone.utc)
-        timeout = timedelta(minutes=timeout_minutes)
+        # Compare epoch seconds; naive timestamps (e.g. from SQLite) are UTC
+        last_activity = self.last_activity
+        if last_activity.tzinfo is None:
+            last_activity = last_activity.replace(tzinfo=timezone.utc)
         
-        return (now - self.last_activity) <= timeout
+        return time.time() - last_activity.timestamp() <= timeout_minutes * 60.0
     
     def update_activity(self):
         """Update last activity timestamp to current time."""
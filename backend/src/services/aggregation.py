@@ -4,15 +4,34 @@ Data aggregation service for Sentinel AI.
 This service provides functionality for aggregating metrics data
 at different time intervals and computing statistical summaries.
 """
+import math
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import ClassVar, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
+import numpy as np
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy import BigInteger, Text, cast, func, and_, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.sql import Select, Subquery
 
 from ..models import PerformanceMetric, AIAgent
+from ..models.metric import METRIC_VALUE_COLUMNS
+from .result_cache import get_result_cache
+from .rollups import MetricRollupService, merged_average, merged_total
+
+
+# How long summaries and trends are reused for identical requests
+SUMMARY_CACHE_TTL_SECONDS = 300
+TREND_CACHE_TTL_SECONDS = 60
+
+# Percentiles are approximated to within this relative error
+PERCENTILE_RELATIVE_ERROR = 0.005
+PERCENTILE_BUCKET_RATIO = (1 + PERCENTILE_RELATIVE_ERROR) / (1 - PERCENTILE_RELATIVE_ERROR)
+
+# Fetch aggregate rows through a server-side cursor in batches
+AGGREGATE_STREAM_OPTIONS = {"stream_results": True, "yield_per": 500}
 
 
 class AggregationInterval(Enum):
@@ -24,9 +43,41 @@ class AggregationInterval(Enum):
     MONTH = "month"
 
 
-@dataclass
+# Length of each interval; months are approximated as 30 days
+INTERVAL_DELTAS = {
+    AggregationInterval.MINUTE: timedelta(minutes=1),
+    AggregationInterval.HOUR: timedelta(hours=1),
+    AggregationInterval.DAY: timedelta(days=1),
+    AggregationInterval.WEEK: timedelta(weeks=1),
+    AggregationInterval.MONTH: timedelta(days=30),
+}
+
+# Time-bucketed averages for one agent, one prebuilt statement per interval.
+# The unit is a literal so each variant plans like a fixed query, and the
+# statement groups by the output alias so the bucket is computed once per row
+AGGREGATE_BY_TIME_QUERIES = {
+    interval: text(f"""
+        SELECT
+            date_trunc('{interval.value}', timestamp) AS time_bucket,
+            AVG(latency_ms) AS avg_latency,
+            AVG(throughput_req_per_min) AS avg_throughput,
+            AVG(cpu_usage_percent) AS avg_cpu,
+            AVG(memory_usage_mb) AS avg_memory,
+            COUNT(*) AS metric_count
+        FROM performance_metrics
+        WHERE agent_id = :agent_id
+            AND timestamp >= :start_time
+            AND timestamp <= :end_time
+        GROUP BY time_bucket
+        ORDER BY time_bucket
+    """)
+    for interval in AggregationInterval
+}
+
+
+@dataclass(slots=True)
 class AggregatedMetric:
-    """Data class for aggregated metric results."""
+    """Data class for aggregated metric results; fields follow the aggregate query's columns."""
     agent_id: str
     interval_start: datetime
     interval_end: datetime
@@ -43,11 +94,96 @@ class AggregatedMetric:
     total_requests: Optional[float] = None
 
 
+# Fields returned by ``aggregate_metrics_columnar``, in query column order
+COLUMNAR_FIELDS = tuple(name for name in AggregatedMetric.__slots__ if name != 'interval_end')
+
+
+def _current_minute() -> datetime:
+    """Current UTC time rounded down to the minute, so cache keys repeat within a minute."""
+    return datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+
+def _approximate_percentiles(column, fraction: float, key, *filters) -> Subquery:
+    """
+    Approximate ``percentile_cont(fraction)`` of a positive ``column`` per ``key``.
+    
+    Values are counted in logarithmic buckets, each PERCENTILE_BUCKET_RATIO
+    wide, and the midpoint of the bucket holding the percentile is returned.
+    This needs a hash aggregate over a few hundred buckets per key instead of
+    a sort of every value, and is within PERCENTILE_RELATIVE_ERROR of the
+    exact value. The subquery has columns ``key`` and ``percentile``.
+    """
+    log_ratio = math.log(PERCENTILE_BUCKET_RATIO)
+    bucket = func.floor(func.ln(column) / log_ratio)
+    histogram = select(
+        key.label('key'),
+        bucket.label('bucket'),
+        func.count().label('bucket_count')
+    ).where(column.isnot(None), *filters).group_by(key, bucket).subquery('histogram')
+    
+    h = histogram.c
+    ranked = select(
+        h.key,
+        h.bucket,
+        func.sum(h.bucket_count).over(partition_by=h.key, order_by=h.bucket).label('cumulative'),
+        func.sum(h.bucket_count).over(partition_by=h.key).label('total')
+    ).subquery('ranked')
+    
+    return select(
+        ranked.c.key,
+        func.exp((func.min(ranked.c.bucket) + 0.5) * log_ratio).label('percentile')
+    ).where(
+        ranked.c.cumulative >= fraction * ranked.c.total
+    ).group_by(ranked.c.key).subquery('percentiles')
+
+
+def _fitted_change_percent(stats) -> float:
+    """
+    Percent change across a series according to its least-squares line.
+    
+    ``stats`` carries the fitted ``slope`` per hour, the series mean
+    ``avg_value`` and its ``mean_hour``, ``first_hour`` and ``last_hour``.
+    The change is relative to the fitted start value, or to the mean when
+    the line starts at zero; a series that is zero throughout has no change.
+    """
+    slope = float(stats.slope or 0.0)
+    mean_value = float(stats.avg_value)
+    first_hour = float(stats.first_hour)
+    fitted_start = mean_value + slope * (first_hour - float(stats.mean_hour))
+    
+    base = abs(fitted_start) or abs(mean_value)
+    if not base:
+        return 0.0
+    return slope * (float(stats.last_hour) - first_hour) / base * 100
+
+
+def _epoch_hour(column):
+    """Hours since the epoch of ``column``, an integer bucket cheaper than ``date_trunc``."""
+    return cast(func.floor(func.extract('epoch', column) / 3600), BigInteger)
+
+
 class DataAggregationService:
     """Service for aggregating metrics data."""
     
+    # Metric names accepted by get_trend_analysis, mapped to their columns
+    METRIC_COLUMNS: ClassVar[Dict[str, InstrumentedAttribute]] = {
+        name: getattr(PerformanceMetric, name) for name in METRIC_VALUE_COLUMNS
+    }
+    
+    # Rounded summary fields: output key -> (query column, decimals)
+    SUMMARY_FLOAT_FIELDS: ClassVar[Dict[str, Tuple[str, int]]] = {
+        'avg_latency_ms': ('avg_latency', 2),
+        'p95_latency_ms': ('p95_latency', 2),
+        'avg_throughput': ('avg_throughput', 2),
+        'total_cost': ('total_cost', 4),
+        'avg_cpu_usage': ('avg_cpu', 1),
+        'avg_gpu_usage': ('avg_gpu', 1),
+        'avg_memory_usage_mb': ('avg_memory', 1),
+    }
+    
     def __init__(self, db_session: Session):
         self.db = db_session
+        self.rollups = MetricRollupService(db_session)
     
     def aggregate_metrics(
         self,
@@ -68,73 +204,146 @@ class DataAggregationService:
         Returns:
             List of aggregated metrics
         """
-        if not end_time:
-            end_time = datetime.now(timezone.utc)
+        query = self._aggregate_query(agent_id, start_time, end_time, interval)
         
-        if not start_time:
-            start_time = end_time - timedelta(hours=24)
+        # Stream rows and convert each to an AggregatedMetric as it arrives;
+        # the query's columns after interval_start match the remaining fields
+        delta = INTERVAL_DELTAS[interval]
+        results = []
+        for row in self.db.execute(query, execution_options=AGGREGATE_STREAM_OPTIONS):
+            interval_start = row.interval_start
+            results.append(AggregatedMetric(
+                row.agent_id,
+                interval_start,
+                interval_start + delta,
+                *row[2:]
+            ))
         
-        # Build base query
-        query = self.db.query(
-            PerformanceMetric.agent_id,
-            func.date_trunc(interval.value, PerformanceMetric.timestamp).label('interval_start'),
-            func.count(PerformanceMetric.metric_id).label('count'),
-            func.avg(PerformanceMetric.latency_ms).label('avg_latency'),
-            func.min(PerformanceMetric.latency_ms).label('min_latency'),
-            func.max(PerformanceMetric.latency_ms).label('max_latency'),
-            func.avg(PerformanceMetric.throughput_req_per_min).label('avg_throughput'),
-            func.avg(PerformanceMetric.cost_per_request).label('avg_cost'),
-            func.avg(PerformanceMetric.cpu_usage_percent).label('avg_cpu'),
-            func.avg(PerformanceMetric.gpu_usage_percent).label('avg_gpu'),
-            func.avg(PerformanceMetric.memory_usage_mb).label('avg_memory'),
-            func.sum(PerformanceMetric.cost_per_request).label('total_cost'),
-            func.sum(PerformanceMetric.throughput_req_per_min).label('total_requests')
-        )
+        return results
+    
+    def aggregate_metrics_columnar(
+        self,
+        agent_id: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        interval: AggregationInterval = AggregationInterval.HOUR
+    ) -> Dict[str, np.ndarray]:
+        """
+        Aggregate metrics like ``aggregate_metrics``, as one array per field.
         
-        # Apply filters
-        filters = [
-            PerformanceMetric.timestamp >= start_time,
-            PerformanceMetric.timestamp <= end_time
-        ]
+        For chart and export consumers that read a few fields across many
+        intervals: values are transposed straight into arrays instead of
+        building an AggregatedMetric per interval.
         
-        if agent_id:
-            filters.append(PerformanceMetric.agent_id == agent_id)
+        Args:
+            agent_id: Optional agent ID to filter by
+            start_time: Start of time range (defaults to 24 hours ago)
+            end_time: End of time range (defaults to now)
+            interval: Aggregation interval
+            
+        Returns:
+            Mapping of each AggregatedMetric field except ``interval_end`` to
+            its array; ``interval_start`` holds epoch seconds, ``agent_id``
+            is an object array and missing values are NaN
+        """
+        query = self._aggregate_query(agent_id, start_time, end_time, interval)
+        rows = self.db.execute(query).all()
         
-        query = query.filter(and_(*filters))
+        if not rows:
+            columns = [()] * len(COLUMNAR_FIELDS)
+        else:
+            columns = list(zip(*rows))
         
-        # Group by agent and time interval
-        query = query.group_by(
-            PerformanceMetric.agent_id,
-            func.date_trunc(interval.value, PerformanceMetric.timestamp)
-        ).order_by(
-            PerformanceMetric.agent_id,
-            func.date_trunc(interval.value, PerformanceMetric.timestamp)
-        )
+        agent_ids, interval_starts, counts, *values = columns
+        arrays = {
+            'agent_id': np.array(agent_ids, dtype=object),
+            'interval_start': np.fromiter(
+                (value.timestamp() for value in interval_starts),
+                dtype=np.float64,
+                count=len(interval_starts)
+            ),
+            'count': np.array(counts, dtype=np.int64),
+        }
+        for name, column in zip(COLUMNAR_FIELDS[3:], values):
+            # None converts to NaN under a float dtype
+            arrays[name] = np.array(column, dtype=np.float64)
+        return arrays
+    
+    def aggregate_metrics_json(
+        self,
+        agent_id: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        interval: AggregationInterval = AggregationInterval.HOUR
+    ) -> bytes:
+        """
+        Aggregate metrics like ``aggregate_metrics``, serialized by the database.
         
-        # Execute query and convert to AggregatedMetric objects
-        results = []
-        for row in query.all():
-            interval_start = row.interval_start
-            interval_end = self._get_interval_end(interval_start, interval)
+        For endpoints that return the aggregates as-is: PostgreSQL builds the
+        JSON array, with AggregatedMetric's field names, and the bytes can be
+        sent as the response body without creating any Python objects per
+        interval.
+        
+        Args:
+            agent_id: Optional agent ID to filter by
+            start_time: Start of time range (defaults to 24 hours ago)
+            end_time: End of time range (defaults to now)
+            interval: Aggregation interval
             
-            results.append(AggregatedMetric(
-                agent_id=row.agent_id,
-                interval_start=interval_start,
-                interval_end=interval_end,
-                count=row.count,
-                avg_latency_ms=row.avg_latency,
-                min_latency_ms=row.min_latency,
-                max_latency_ms=row.max_latency,
-                avg_throughput=row.avg_throughput,
-                avg_cost_per_request=row.avg_cost,
-                avg_cpu_usage=row.avg_cpu,
-                avg_gpu_usage=row.avg_gpu,
-                avg_memory_usage=row.avg_memory,
-                total_cost=row.total_cost,
-                total_requests=row.total_requests
-            ))
+        Returns:
+            UTF-8 encoded JSON array of aggregated metrics
+        """
+        aggregates = self._aggregate_query(agent_id, start_time, end_time, interval).subquery('aggregates')
+        c = aggregates.c
+        fields = [
+            ('agent_id', c.agent_id),
+            ('interval_start', c.interval_start),
+            ('interval_end', c.interval_start + INTERVAL_DELTAS[interval]),
+            *zip(COLUMNAR_FIELDS[2:], list(c)[2:]),
+        ]
+        document = func.coalesce(
+            func.json_agg(aggregate_order_by(
+                func.json_build_object(*(part for name, column in fields for part in (name, column))),
+                c.agent_id,
+                c.interval_start
+            )),
+            text("'[]'::json")
+        )
+        return self.db.execute(select(cast(document, Text))).scalar_one().encode()
+    
+    def _aggregate_query(
+        self,
+        agent_id: Optional[str],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        interval: AggregationInterval
+    ) -> Select:
+        """Per-agent, per-interval aggregate; columns follow AggregatedMetric without ``interval_end``."""
+        if not end_time:
+            end_time = datetime.now(timezone.utc)
         
-        return results
+        if not start_time:
+            start_time = end_time - timedelta(hours=24)
+        
+        # Whole buckets come from the rollups; only the range edges and metrics
+        # not rolled up yet are read from performance_metrics
+        stats = self.rollups.statistics(interval.value, start_time, end_time, agent_id).subquery()
+        c = stats.c
+        return select(
+            c.agent_id,
+            c.bucket.label('interval_start'),
+            cast(func.sum(c.metric_count), BigInteger).label('metric_count'),
+            merged_average(c.latency_sum, c.latency_count).label('avg_latency'),
+            func.min(c.latency_min).label('min_latency'),
+            func.max(c.latency_max).label('max_latency'),
+            merged_average(c.throughput_sum, c.throughput_count).label('avg_throughput'),
+            merged_average(c.cost_sum, c.cost_count).label('avg_cost'),
+            merged_average(c.cpu_sum, c.cpu_count).label('avg_cpu'),
+            merged_average(c.gpu_sum, c.gpu_count).label('avg_gpu'),
+            merged_average(c.memory_sum, c.memory_count).label('avg_memory'),
+            merged_total(c.cost_sum, c.cost_count).label('total_cost'),
+            merged_total(c.throughput_sum, c.throughput_count).label('total_requests')
+        ).group_by(c.agent_id, c.bucket).order_by(c.agent_id, c.bucket)
     
     def aggregate_metrics_by_time(
         self,
@@ -155,26 +364,11 @@ class DataAggregationService:
         Returns:
             List of aggregated metrics as dictionaries
         """
-        # Build query for time-based aggregation
-        query = """
-            SELECT 
-                date_trunc(%s, timestamp) as time_bucket,
-                AVG(latency_ms) as avg_latency,
-                AVG(throughput_req_per_min) as avg_throughput,
-                AVG(cpu_usage_percent) as avg_cpu,
-                AVG(memory_usage_mb) as avg_memory,
-                COUNT(*) as metric_count
-            FROM performance_metrics 
-            WHERE agent_id = %s 
-                AND timestamp >= %s 
-                AND timestamp <= %s
-            GROUP BY date_trunc(%s, timestamp)
-            ORDER BY time_bucket
-        """
-        
-        result = self.db.execute(query, (
-            interval.value, agent_id, start_time, end_time, interval.value
-        ))
+        result = self.db.execute(AGGREGATE_BY_TIME_QUERIES[interval], {
+            'agent_id': agent_id,
+            'start_time': start_time,
+            'end_time': end_time
+        })
         
         # Handle both real database results and mock results
         raw_results = result.fetchall()
@@ -211,64 +405,106 @@ class DataAggregationService:
         Returns:
             Dictionary with summary statistics
         """
-        end_time = datetime.now(timezone.utc)
+        end_time = _current_minute()
+        summary = get_result_cache().get_or_load(
+            ('agent_summary', agent_id, days, end_time),
+            SUMMARY_CACHE_TTL_SECONDS,
+            lambda: self._get_agent_summaries([agent_id], days, end_time).get(agent_id)
+        )
+        if summary is None:
+            raise ValueError(f"Agent {agent_id} not found")
+        return dict(summary)
+    
+    def get_agent_summaries(
+        self,
+        agent_ids: List[str],
+        days: int = 7
+    ) -> Dict[str, Dict[str, any]]:
+        """
+        Get summary statistics for several agents in one query.
+        
+        Args:
+            agent_ids: Agent IDs to summarize
+            days: Number of days to look back
+            
+        Returns:
+            Summaries as returned by get_agent_summary, keyed by agent ID;
+            agents that do not exist are left out
+        """
+        if not agent_ids:
+            return {}
+        return self._get_agent_summaries(agent_ids, days, _current_minute())
+    
+    def _get_agent_summaries(
+        self,
+        agent_ids: List[str],
+        days: int,
+        end_time: datetime
+    ) -> Dict[str, Dict[str, any]]:
+        """Compute the summaries for the ``days`` before ``end_time``."""
         start_time = end_time - timedelta(days=days)
         
-        # Get raw statistics
-        stats = self.db.query(
+        window = (
+            PerformanceMetric.agent_id.in_(agent_ids),
+            PerformanceMetric.timestamp >= start_time,
+            PerformanceMetric.timestamp <= end_time
+        )
+        
+        metric_stats = select(
+            PerformanceMetric.agent_id,
             func.count(PerformanceMetric.metric_id).label('total_metrics'),
             func.avg(PerformanceMetric.latency_ms).label('avg_latency'),
-            func.percentile_cont(0.95).within_group(PerformanceMetric.latency_ms).label('p95_latency'),
             func.avg(PerformanceMetric.throughput_req_per_min).label('avg_throughput'),
             func.sum(PerformanceMetric.cost_per_request).label('total_cost'),
             func.avg(PerformanceMetric.cpu_usage_percent).label('avg_cpu'),
             func.avg(PerformanceMetric.gpu_usage_percent).label('avg_gpu'),
             func.avg(PerformanceMetric.memory_usage_mb).label('avg_memory'),
             func.min(PerformanceMetric.timestamp).label('first_metric'),
-            func.max(PerformanceMetric.timestamp).label('last_metric')
-        ).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time
-            )
-        ).first()
+            func.max(PerformanceMetric.timestamp).label('last_metric'),
+            func.count(func.distinct(_epoch_hour(PerformanceMetric.timestamp))).label('uptime_hours')
+        ).where(*window).group_by(PerformanceMetric.agent_id).subquery('stats')
         
-        # Get agent info
-        agent = self.db.query(AIAgent).filter(AIAgent.agent_id == agent_id).first()
+        p95_latency = _approximate_percentiles(
+            PerformanceMetric.latency_ms, 0.95, PerformanceMetric.agent_id, *window
+        )
         
-        if not agent:
-            raise ValueError(f"Agent {agent_id} not found")
+        # Statistics, uptime and agent details for every agent in one
+        # statement; agents without metrics in the window get empty statistics
+        rows = self.db.execute(
+            select(
+                AIAgent.agent_id,
+                AIAgent.name,
+                AIAgent.status,
+                *(column for column in metric_stats.c if column.name != 'agent_id'),
+                p95_latency.c.percentile.label('p95_latency')
+            ).select_from(
+                AIAgent.__table__
+                .outerjoin(metric_stats, metric_stats.c.agent_id == AIAgent.agent_id)
+                .outerjoin(p95_latency, p95_latency.c.key == AIAgent.agent_id)
+            ).where(AIAgent.agent_id.in_(agent_ids))
+        )
         
-        # Helper function to safely round values (handles Mock objects in tests)
-        def safe_round(value, decimals=2):
-            if value is None:
-                return None
-            try:
-                return round(float(value), decimals)
-            except (TypeError, ValueError):
-                # Handle Mock objects in tests
-                return value
+        summaries = {}
+        for stats in rows:
+            summary = {
+                'agent_id': stats.agent_id,
+                'name': stats.name,  # Test expects 'name', not 'agent_name'
+                'status': stats.status or 'unknown',  # Test expects 'status'
+                'period_days': days,
+                'period_start': start_time,
+                'period_end': end_time,
+                'total_metrics': stats.total_metrics or 0,
+                'first_metric': stats.first_metric,
+                'last_metric': stats.last_metric,
+                'uptime_hours': stats.uptime_hours or 0
+            }
+            # Averages of 0.0 are real values; only NULL means no data
+            for key, (column, decimals) in self.SUMMARY_FLOAT_FIELDS.items():
+                value = getattr(stats, column)
+                summary[key] = round(float(value), decimals) if value is not None else None
+            summaries[stats.agent_id] = summary
         
-        return {
-            'agent_id': agent_id,
-            'name': agent.name,  # Test expects 'name', not 'agent_name'
-            'status': getattr(agent, 'status', 'unknown'),  # Test expects 'status'
-            'period_days': days,
-            'period_start': start_time,
-            'period_end': end_time,
-            'total_metrics': stats.total_metrics or 0,
-            'avg_latency_ms': safe_round(stats.avg_latency, 2),
-            'p95_latency_ms': safe_round(stats.p95_latency, 2),
-            'avg_throughput': safe_round(stats.avg_throughput, 2),
-            'total_cost': safe_round(stats.total_cost, 4),
-            'avg_cpu_usage': safe_round(stats.avg_cpu, 1),
-            'avg_gpu_usage': safe_round(stats.avg_gpu, 1),
-            'avg_memory_usage_mb': safe_round(stats.avg_memory, 1),
-            'first_metric': stats.first_metric,
-            'last_metric': stats.last_metric,
-            'uptime_hours': self._calculate_uptime_hours(agent_id, start_time, end_time)
-        }
+        return summaries
     
     def get_trend_analysis(
         self,
@@ -287,43 +523,59 @@ class DataAggregationService:
         Returns:
             Dictionary with trend analysis
         """
-        end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(hours=hours)
-        
-        # Map metric names to database columns
-        metric_column_map = {
-            'latency_ms': PerformanceMetric.latency_ms,
-            'throughput_req_per_min': PerformanceMetric.throughput_req_per_min,
-            'cost_per_request': PerformanceMetric.cost_per_request,
-            'cpu_usage_percent': PerformanceMetric.cpu_usage_percent,
-            'gpu_usage_percent': PerformanceMetric.gpu_usage_percent,
-            'memory_usage_mb': PerformanceMetric.memory_usage_mb
-        }
+        end_time = _current_minute()
+        trend = get_result_cache().get_or_load(
+            ('trend_analysis', agent_id, metric_name, hours, end_time),
+            TREND_CACHE_TTL_SECONDS,
+            lambda: self._get_trend_analysis(agent_id, metric_name, hours, end_time)
+        )
+        return dict(trend)
+    
+    def _get_trend_analysis(
+        self,
+        agent_id: str,
+        metric_name: str,
+        hours: int,
+        end_time: datetime
+    ) -> Dict[str, any]:
+        """Compute the trend over the ``hours`` before ``end_time``."""
+        # Start on an hour boundary so the first bucket is a whole hour
+        start_time = (end_time - timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
         
-        if metric_name not in metric_column_map:
+        column = self.METRIC_COLUMNS.get(metric_name)
+        if column is None:
             raise ValueError(f"Unknown metric: {metric_name}")
         
-        column = metric_column_map[metric_name]
+        # Hourly averages; the range filter stays on the bare timestamp
+        # column so the (agent_id, timestamp) index applies
+        hour_bucket = _epoch_hour(PerformanceMetric.timestamp)
+        hourly = select(
+            hour_bucket.label('hour_bucket'),
+            func.avg(column).label('avg_value')
+        ).where(
+            PerformanceMetric.agent_id == agent_id,
+            PerformanceMetric.timestamp >= start_time,
+            PerformanceMetric.timestamp <= end_time,
+            column.isnot(None)
+        ).group_by(hour_bucket).subquery('hourly')
         
-        # Get hourly aggregates for trend analysis
-        hourly_data = self.db.query(
-            func.date_trunc('hour', PerformanceMetric.timestamp).label('hour'),
-            func.avg(column).label('avg_value'),
-            func.count(PerformanceMetric.metric_id).label('count')
-        ).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time,
-                column.isnot(None)
+        # Summarize the hourly series in SQL so a single row is returned
+        stats = self.db.execute(
+            select(
+                func.count().label('data_points'),
+                func.min(hourly.c.avg_value).label('min_value'),
+                func.max(hourly.c.avg_value).label('max_value'),
+                func.avg(hourly.c.avg_value).label('avg_value'),
+                array_agg(aggregate_order_by(hourly.c.avg_value, hourly.c.hour_bucket.desc()))[1].label('last_value'),
+                # Least-squares fit of the hourly averages over time
+                func.regr_slope(hourly.c.avg_value, hourly.c.hour_bucket).label('slope'),
+                func.avg(hourly.c.hour_bucket).label('mean_hour'),
+                func.min(hourly.c.hour_bucket).label('first_hour'),
+                func.max(hourly.c.hour_bucket).label('last_hour')
             )
-        ).group_by(
-            func.date_trunc('hour', PerformanceMetric.timestamp)
-        ).order_by(
-            func.date_trunc('hour', PerformanceMetric.timestamp)
-        ).all()
+        ).one()
         
-        if not hourly_data:
+        if not stats.data_points:
             return {
                 'metric_name': metric_name,
                 'agent_id': agent_id,
@@ -334,15 +586,11 @@ class DataAggregationService:
             }
         
         # Calculate trend
-        values = [float(row.avg_value) for row in hourly_data if row.avg_value is not None]
-        
-        if len(values) < 2:
+        if stats.data_points < 2:
             trend = 'insufficient_data'
             change_percent = 0
         else:
-            first_value = values[0]
-            last_value = values[-1]
-            change_percent = ((last_value - first_value) / first_value) * 100
+            change_percent = _fitted_change_percent(stats)
             
             if abs(change_percent) < 5:
                 trend = 'stable'
@@ -357,34 +605,27 @@ class DataAggregationService:
             'period_hours': hours,
             'trend': trend,
             'change_percent': round(change_percent, 2),
-            'data_points': len(hourly_data),
-            'current_value': round(values[-1], 2) if values else None,
-            'min_value': round(min(values), 2) if values else None,
-            'max_value': round(max(values), 2) if values else None,
-            'avg_value': round(sum(values) / len(values), 2) if values else None
+            'data_points': stats.data_points,
+            'current_value': round(float(stats.last_value), 2),
+            'min_value': round(float(stats.min_value), 2),
+            'max_value': round(float(stats.max_value), 2),
+            'avg_value': round(float(stats.avg_value), 2)
         }
     
     def _get_interval_end(self, interval_start: datetime, interval: AggregationInterval) -> datetime:
         """Calculate the end time for a given interval start."""
-        if interval == AggregationInterval.MINUTE:
-            return interval_start + timedelta(minutes=1)
-        elif interval == AggregationInterval.HOUR:
-            return interval_start + timedelta(hours=1)
-        elif interval == AggregationInterval.DAY:
-            return interval_start + timedelta(days=1)
-        elif interval == AggregationInterval.WEEK:
-            return interval_start + timedelta(weeks=1)
-        elif interval == AggregationInterval.MONTH:
-            # Approximate month as 30 days
-            return interval_start + timedelta(days=30)
-        else:
-            return interval_start + timedelta(hours=1)
+        return interval_start + INTERVAL_DELTAS.get(interval, INTERVAL_DELTAS[AggregationInterval.HOUR])
     
     def _calculate_uptime_hours(self, agent_id: str, start_time: datetime, end_time: datetime) -> float:
-        """Calculate estimated uptime hours based on metric submission frequency."""
+        """
+        Calculate estimated uptime hours based on metric submission frequency.
+        
+        ``get_agent_summary`` computes this in its own query; this standalone
+        version is for callers that only need the uptime.
+        """
         # Count hours with at least one metric submission
         hours_with_metrics = self.db.query(
-            func.count(func.distinct(func.date_trunc('hour', PerformanceMetric.timestamp)))
+            func.count(func.distinct(_epoch_hour(PerformanceMetric.timestamp)))
         ).filter(
             and_(
                 PerformanceMetric.agent_id == agent_id,
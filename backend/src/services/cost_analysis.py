@@ -4,15 +4,20 @@ Cost analysis service for Sentinel AI.
 This service provides functionality for analyzing costs, budgets,
 and cost optimization recommendations.
 """
+from bisect import bisect_left
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc, case
+from sqlalchemy.sql import Select
+from sqlalchemy import BigInteger, Float, bindparam, func, and_, or_, desc, case, cast, false, literal_column, select, true, union_all
 
 from ..models import PerformanceMetric, AIAgent
+from .result_cache import get_result_cache
+from .rollups import MetricRollupService, floor_bucket
 
 
 class CostPeriod(Enum):
@@ -22,7 +27,54 @@ class CostPeriod(Enum):
     MONTHLY = "monthly"
 
 
-@dataclass
+# date_trunc unit for each analysis period
+PERIOD_UNITS = {
+    CostPeriod.DAILY: 'day',
+    CostPeriod.WEEKLY: 'week',
+    CostPeriod.MONTHLY: 'month',
+}
+
+# Recommendation thresholds on average cost per request ($), latency (ms),
+# CPU (%), memory (MB) and throughput (requests per minute)
+HIGH_COST_PER_REQUEST = 0.01
+ELEVATED_COST_PER_REQUEST = 0.005
+HIGH_LATENCY_MS = 1000
+LOW_CPU_PERCENT = 30
+LOW_MEMORY_MB = 500
+LOW_THROUGHPUT_REQ_PER_MIN = 10
+
+# Agent names change rarely; alerts label agents from a cache this old at most
+AGENT_NAMES_CACHE_KEY = ('agent_names',)
+AGENT_NAMES_CACHE_TTL_SECONDS = 60
+
+# Fetch per-period cost rows through a server-side cursor in batches
+COST_STREAM_OPTIONS = {"stream_results": True, "yield_per": 1000}
+
+# Upper bounds on average cost per request for each efficiency rating
+# (these would be configurable in practice)
+EFFICIENCY_THRESHOLDS = (0.001, 0.005, 0.01)
+EFFICIENCY_RATINGS = ('excellent', 'good', 'fair', 'poor')
+
+# Percent cost increases above which a spike alert is raised, and the
+# severity and threshold multiplier of the previous cost for each
+COST_SPIKE_THRESHOLDS = (50, 100)
+COST_SPIKE_SEVERITIES = (('high', 1.5), ('critical', 2))
+
+# Percent increase in cost per request that raises an efficiency alert
+EFFICIENCY_DROP_PERCENT = 25
+
+# Rollup statistics summed per day for recommendations
+DAILY_STATISTICS = (
+    'metric_count',
+    'cost_sum', 'cost_count',
+    'latency_sum', 'latency_count',
+    'throughput_sum', 'throughput_count',
+    'cpu_sum', 'cpu_count',
+    'memory_sum', 'memory_count',
+)
+
+
+@dataclass(slots=True, frozen=True)
 class CostBreakdown:
     """Data class for cost breakdown analysis."""
     agent_id: str
@@ -36,7 +88,7 @@ class CostBreakdown:
     cost_efficiency: str  # 'excellent', 'good', 'fair', 'poor'
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CostAlert:
     """Data class for cost-related alerts."""
     agent_id: str
@@ -49,11 +101,76 @@ class CostAlert:
     timestamp: datetime
 
 
+def _cost_alert_query(single_agent: bool) -> Select:
+    """
+    Agents whose cost rose between the previous and the current window,
+    with the spike severity and efficiency flag of each.
+    
+    Bind parameters: ``previous_start``, ``start_time``, ``end_time`` and,
+    for a single agent, ``agent_id``.
+    """
+    start_time = bindparam('start_time')
+    current_window = PerformanceMetric.timestamp >= start_time
+    previous_window = PerformanceMetric.timestamp < start_time
+    cost = PerformanceMetric.cost_per_request
+    
+    # Current and previous window totals and averages per agent
+    filters = [
+        PerformanceMetric.timestamp >= bindparam('previous_start'),
+        PerformanceMetric.timestamp <= bindparam('end_time'),
+        cost.isnot(None)
+    ]
+    if single_agent:
+        filters.append(PerformanceMetric.agent_id == bindparam('agent_id'))
+    windows = select(
+        PerformanceMetric.agent_id,
+        cast(func.sum(cost).filter(current_window), Float).label('current_cost'),
+        cast(func.sum(cost).filter(previous_window), Float).label('previous_cost'),
+        cast(func.avg(cost).filter(current_window), Float).label('current_avg'),
+        cast(func.avg(cost).filter(previous_window), Float).label('previous_avg')
+    ).where(*filters).group_by(PerformanceMetric.agent_id).cte('windows')
+    
+    # Percent changes are NULL unless both windows have a positive value
+    w = windows.c
+    cost_increase = (w.current_cost - w.previous_cost) / func.nullif(w.previous_cost, 0) * 100
+    efficiency_drop = (w.current_avg - w.previous_avg) / func.nullif(w.previous_avg, 0) * 100
+    spike_severity = case(
+        *(
+            (cost_increase > threshold, label)
+            for threshold, (label, _) in reversed(list(zip(COST_SPIKE_THRESHOLDS, COST_SPIKE_SEVERITIES)))
+        )
+    )
+    efficiency_alert = efficiency_drop > EFFICIENCY_DROP_PERCENT
+    
+    # Only agents with at least one alert are returned
+    return select(
+        w.agent_id,
+        w.current_cost,
+        w.previous_cost,
+        w.current_avg,
+        w.previous_avg,
+        cost_increase.label('cost_increase'),
+        spike_severity.label('spike_severity'),
+        efficiency_drop.label('efficiency_drop'),
+        efficiency_alert.label('efficiency_alert')
+    ).where(
+        or_(spike_severity.isnot(None), efficiency_alert)
+    )
+
+
+# Cost alert statements for all agents (False) and for one agent (True),
+# built once so each call only binds its windows
+COST_ALERT_QUERIES = {
+    single_agent: _cost_alert_query(single_agent) for single_agent in (False, True)
+}
+
+
 class CostAnalysisService:
     """Service for analyzing costs and generating cost insights."""
     
     def __init__(self, db_session: Session):
         self.db = db_session
+        self.rollups = MetricRollupService(db_session)
     
     def analyze_costs(
         self,
@@ -75,63 +192,100 @@ class CostAnalysisService:
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(days=days)
         
-        # Determine grouping interval
-        if period == CostPeriod.DAILY:
-            date_trunc = 'day'
-        elif period == CostPeriod.WEEKLY:
-            date_trunc = 'week'
-        else:  # MONTHLY
-            date_trunc = 'month'
-        
-        # Build query
-        query = self.db.query(
-            PerformanceMetric.agent_id,
-            AIAgent.name.label('agent_name'),
-            func.date_trunc(date_trunc, PerformanceMetric.timestamp).label('period_start'),
-            func.sum(PerformanceMetric.cost_per_request).label('total_cost'),
-            func.avg(PerformanceMetric.cost_per_request).label('avg_cost_per_request'),
-            func.count(PerformanceMetric.metric_id).label('total_requests')
-        ).join(
-            AIAgent, PerformanceMetric.agent_id == AIAgent.agent_id
-        ).filter(
-            and_(
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time,
-                PerformanceMetric.cost_per_request.isnot(None)
+        date_trunc = PERIOD_UNITS[period]
+        one_period = literal_column(f"interval '1 {date_trunc}'")
+        
+        # Costs in the window, and in the period before it so the first period
+        # also has a previous period cost to compare against. Whole days come
+        # from the daily rollup instead of raw metrics.
+        in_window = self.rollups.statistics(date_trunc, start_time, end_time, agent_id).subquery()
+        before = self.rollups.statistics(
+            date_trunc, self._previous_period_start(start_time, period), start_time, agent_id
+        ).subquery()
+        buckets = union_all(
+            select(in_window.c.agent_id, in_window.c.bucket, in_window.c.cost_sum,
+                   in_window.c.cost_count, true().label('in_window')),
+            select(before.c.agent_id, before.c.bucket, before.c.cost_sum,
+                   before.c.cost_count, false().label('in_window'))
+        ).subquery()
+        
+        b = buckets.c
+        periods = select(
+            b.agent_id,
+            b.bucket.label('period_start'),
+            func.sum(b.cost_sum).filter(b.in_window).label('total_cost'),
+            cast(func.sum(b.cost_count).filter(b.in_window), BigInteger).label('total_requests'),
+            func.sum(b.cost_sum).label('period_cost')
+        ).group_by(b.agent_id, b.bucket).subquery()
+        
+        # Cost of the preceding period, if the agent had any
+        p = periods.c
+        window = {'partition_by': p.agent_id, 'order_by': p.period_start}
+        previous_cost = case(
+            (
+                func.lag(p.period_start).over(**window) == p.period_start - one_period,
+                func.lag(p.period_cost).over(**window)
             )
         )
         
-        if agent_id:
-            query = query.filter(PerformanceMetric.agent_id == agent_id)
+        trended = select(
+            p.agent_id,
+            p.period_start,
+            cast(func.coalesce(p.total_cost, 0.0), Float).label('total_cost'),
+            cast(func.coalesce(p.total_cost / func.nullif(p.total_requests, 0), 0.0), Float).label('avg_cost_per_request'),
+            p.total_requests,
+            previous_cost.label('previous_cost')
+        ).subquery()
+        
+        # Trend against the previous period; stable without a previous cost
+        t = trended.c
+        change_percent = (t.total_cost - t.previous_cost) / func.nullif(t.previous_cost, 0) * 100
+        cost_trend = case(
+            (t.total_cost == 0, 'stable'),
+            (change_percent > 10, 'increasing'),
+            (change_percent < -10, 'decreasing'),
+            else_='stable'
+        )
         
-        query = query.group_by(
-            PerformanceMetric.agent_id,
-            AIAgent.name,
-            func.date_trunc(date_trunc, PerformanceMetric.timestamp)
+        query = select(
+            t.agent_id,
+            t.period_start,
+            (t.period_start + one_period).label('period_end'),
+            t.total_cost,
+            t.avg_cost_per_request,
+            t.total_requests,
+            cost_trend.label('cost_trend')
+        ).where(
+            t.total_requests > 0  # Not just the period before the window
         ).order_by(
-            PerformanceMetric.agent_id,
-            func.date_trunc(date_trunc, PerformanceMetric.timestamp)
+            t.agent_id,
+            t.period_start
         )
         
+        # A single agent's name is looked up once instead of joined per row
+        if agent_id:
+            agent_name = self.db.execute(
+                select(AIAgent.name).where(AIAgent.agent_id == agent_id)
+            ).scalar_one_or_none()
+        else:
+            query = query.add_columns(
+                AIAgent.name.label('agent_name')
+            ).join(
+                AIAgent, t.agent_id == AIAgent.agent_id
+            )
+        
         results = []
-        for row in query.all():
-            period_start = row.period_start
-            period_end = self._get_period_end(period_start, period)
-            
-            # Calculate cost trend and efficiency
-            cost_trend = self._calculate_cost_trend(row.agent_id, period_start, period_end)
-            cost_efficiency = self._calculate_cost_efficiency(row.avg_cost_per_request)
-            
+        for row in self.db.execute(query, execution_options=COST_STREAM_OPTIONS):
             results.append(CostBreakdown(
                 agent_id=row.agent_id,
-                agent_name=row.agent_name,
-                period_start=period_start,
-                period_end=period_end,
-                total_cost=float(row.total_cost or 0),
-                avg_cost_per_request=float(row.avg_cost_per_request or 0),
+                agent_name=agent_name if agent_id else row.agent_name,
+                period_start=row.period_start,
+                period_end=row.period_end,
+                total_cost=row.total_cost,
+                avg_cost_per_request=row.avg_cost_per_request,
                 total_requests=row.total_requests,
-                cost_trend=cost_trend,
-                cost_efficiency=cost_efficiency
+                cost_trend=row.cost_trend,
+                cost_efficiency=self._calculate_cost_efficiency(row.avg_cost_per_request)
             ))
         
         return results
@@ -201,14 +355,15 @@ class CostAnalysisService:
             List of detected cost spikes
         """
         # Calculate baseline (previous period)
+        now = datetime.now(timezone.utc)
         if period == CostPeriod.DAILY:
-            current_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            current_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
             current_end = current_start + timedelta(days=1)
             baseline_start = current_start - timedelta(days=7)
             baseline_end = current_start
         else:
             # Default to hourly analysis
-            current_end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            current_end = now.replace(minute=0, second=0, microsecond=0)
             current_start = current_end - timedelta(hours=1)
             baseline_start = current_start - timedelta(hours=24)
             baseline_end = current_start
@@ -277,65 +432,42 @@ class CostAnalysisService:
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(hours=hours)
         
-        alerts = []
-        
-        # Get agents to check
-        agent_query = self.db.query(AIAgent)
+        params = {
+            'previous_start': start_time - timedelta(hours=hours),
+            'start_time': start_time,
+            'end_time': end_time
+        }
         if agent_id:
-            agent_query = agent_query.filter(AIAgent.agent_id == agent_id)
+            params['agent_id'] = agent_id
+        rows = self.db.execute(COST_ALERT_QUERIES[bool(agent_id)], params).all()
+        names = self._agent_names(row.agent_id for row in rows)
         
-        agents = agent_query.all()
-        
-        for agent in agents:
-            # Check for cost spikes (>50% increase from previous period)
-            current_cost = self._get_period_cost(agent.agent_id, start_time, end_time)
-            previous_start = start_time - timedelta(hours=hours)
-            previous_cost = self._get_period_cost(agent.agent_id, previous_start, start_time)
-            
-            if previous_cost > 0 and current_cost > 0:
-                cost_increase = ((current_cost - previous_cost) / previous_cost) * 100
-                
-                if cost_increase > 100:  # >100% increase
-                    alerts.append(CostAlert(
-                        agent_id=agent.agent_id,
-                        agent_name=agent.name,
-                        alert_type='cost_spike',
-                        severity='critical',
-                        message=f'Cost increased by {cost_increase:.1f}% in the last {hours} hours',
-                        current_value=current_cost,
-                        threshold_value=previous_cost * 2,
-                        timestamp=end_time
-                    ))
-                elif cost_increase > 50:  # >50% increase
-                    alerts.append(CostAlert(
-                        agent_id=agent.agent_id,
-                        agent_name=agent.name,
-                        alert_type='cost_spike',
-                        severity='high',
-                        message=f'Cost increased by {cost_increase:.1f}% in the last {hours} hours',
-                        current_value=current_cost,
-                        threshold_value=previous_cost * 1.5,
-                        timestamp=end_time
-                    ))
-            
-            # Check for efficiency drops (cost per request increase)
-            current_avg_cost = self._get_average_cost_per_request(agent.agent_id, start_time, end_time)
-            previous_avg_cost = self._get_average_cost_per_request(agent.agent_id, previous_start, start_time)
+        multipliers = dict(COST_SPIKE_SEVERITIES)
+        alerts = []
+        for row in rows:
+            if row.spike_severity:
+                alerts.append(CostAlert(
+                    agent_id=row.agent_id,
+                    agent_name=names.get(row.agent_id),
+                    alert_type='cost_spike',
+                    severity=row.spike_severity,
+                    message=f'Cost increased by {row.cost_increase:.1f}% in the last {hours} hours',
+                    current_value=row.current_cost,
+                    threshold_value=row.previous_cost * multipliers[row.spike_severity],
+                    timestamp=end_time
+                ))
             
-            if previous_avg_cost > 0 and current_avg_cost > 0:
-                efficiency_drop = ((current_avg_cost - previous_avg_cost) / previous_avg_cost) * 100
-                
-                if efficiency_drop > 25:  # >25% increase in cost per request
-                    alerts.append(CostAlert(
-                        agent_id=agent.agent_id,
-                        agent_name=agent.name,
-                        alert_type='efficiency_drop',
-                        severity='medium',
-                        message=f'Cost per request increased by {efficiency_drop:.1f}%',
-                        current_value=current_avg_cost,
-                        threshold_value=previous_avg_cost * 1.25,
-                        timestamp=end_time
-                    ))
+            if row.efficiency_alert:
+                alerts.append(CostAlert(
+                    agent_id=row.agent_id,
+                    agent_name=names.get(row.agent_id),
+                    alert_type='efficiency_drop',
+                    severity='medium',
+                    message=f'Cost per request increased by {row.efficiency_drop:.1f}%',
+                    current_value=row.current_avg,
+                    threshold_value=row.previous_avg * (1 + EFFICIENCY_DROP_PERCENT / 100),
+                    timestamp=end_time
+                ))
         
         return alerts
     
@@ -358,23 +490,48 @@ class CostAnalysisService:
         start_time = end_time - timedelta(days=days)
         
         # Get cost and performance metrics
-        metrics = self.db.query(
-            func.avg(PerformanceMetric.cost_per_request).label('avg_cost'),
-            func.avg(PerformanceMetric.latency_ms).label('avg_latency'),
-            func.avg(PerformanceMetric.throughput_req_per_min).label('avg_throughput'),
-            func.avg(PerformanceMetric.cpu_usage_percent).label('avg_cpu'),
-            func.avg(PerformanceMetric.memory_usage_mb).label('avg_memory'),
-            func.sum(PerformanceMetric.cost_per_request).label('total_cost'),
-            func.count(PerformanceMetric.metric_id).label('total_requests')
-        ).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time
-            )
-        ).first()
+        return self._recommend(agent_id, days, self._daily_aggs([agent_id], start_time, end_time)[agent_id])
+    
+    def bulk_report(self, agent_ids: List[str], days: int = 7) -> Dict[str, Dict[str, any]]:
+        """
+        Daily cost breakdown and optimization recommendations for several agents.
+        
+        All agents are aggregated with one query, so a dashboard showing
+        many agents does not pay a round-trip per agent and report.
+        
+        Args:
+            agent_ids: Agent IDs to report on
+            days: Number of days to analyze
+            
+        Returns:
+            Dictionary mapping each agent ID to its report
+        """
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(days=days)
+        
+        daily_aggs = self._daily_aggs(agent_ids, start_time, end_time)
         
-        if not metrics or metrics.total_requests == 0:
+        reports = {}
+        for agent_id, daily in daily_aggs.items():
+            reports[agent_id] = {
+                'agent_id': agent_id,
+                'daily_costs': [
+                    {
+                        'period_start': day['day'],
+                        'total_cost': day['cost_sum'],
+                        'avg_cost_per_request': day['cost_sum'] / day['cost_count'] if day['cost_count'] else 0.0,
+                        'total_requests': day['cost_count']
+                    }
+                    for day in daily if day['cost_count']
+                ],
+                'recommendations': self._recommend(agent_id, days, daily)
+            }
+        return reports
+    
+    def _recommend(self, agent_id: str, days: int, daily: List[Dict]) -> Dict[str, any]:
+        """Threshold-based recommendations from the rows returned by ``_daily_aggs``."""
+        metrics = self._summarize_days(daily)
+        if metrics['total_requests'] == 0:
             return {
                 'agent_id': agent_id,
                 'recommendations': ['No data available for analysis'],
@@ -387,40 +544,41 @@ class CostAnalysisService:
         confidence = 'medium'
         
         # Check for high cost per request
-        if metrics.avg_cost and metrics.avg_cost > 0.01:  # Threshold: $0.01 per request
+        if metrics['avg_cost'] and metrics['avg_cost'] > HIGH_COST_PER_REQUEST:
             recommendations.append(
-                f"High cost per request ({metrics.avg_cost:.4f}). "
+                f"High cost per request ({metrics['avg_cost']:.4f}). "
                 "Consider optimizing model parameters or using a more efficient model."
             )
-            potential_savings += metrics.total_cost * 0.2  # Assume 20% savings possible
+            potential_savings += metrics['total_cost'] * 0.2  # Assume 20% savings possible
         
         # Check for high latency with high cost
-        if metrics.avg_latency and metrics.avg_latency > 1000 and metrics.avg_cost and metrics.avg_cost > 0.005:
+        if (metrics['avg_latency'] and metrics['avg_latency'] > HIGH_LATENCY_MS
+                and metrics['avg_cost'] and metrics['avg_cost'] > ELEVATED_COST_PER_REQUEST):
             recommendations.append(
-                f"High latency ({metrics.avg_latency:.1f}ms) combined with high cost. "
+                f"High latency ({metrics['avg_latency']:.1f}ms) combined with high cost. "
                 "Consider caching strategies or model optimization."
             )
-            potential_savings += metrics.total_cost * 0.15
+            potential_savings += metrics['total_cost'] * 0.15
         
         # Check for low resource utilization
-        if metrics.avg_cpu and metrics.avg_cpu < 30:
+        if metrics['avg_cpu'] and metrics['avg_cpu'] < LOW_CPU_PERCENT:
             recommendations.append(
-                f"Low CPU utilization ({metrics.avg_cpu:.1f}%). "
+                f"Low CPU utilization ({metrics['avg_cpu']:.1f}%). "
                 "Consider consolidating workloads or using smaller instances."
             )
-            potential_savings += metrics.total_cost * 0.1
+            potential_savings += metrics['total_cost'] * 0.1
         
         # Check for memory overprovisioning
-        if metrics.avg_memory and metrics.avg_memory < 500:  # Less than 500MB average
+        if metrics['avg_memory'] and metrics['avg_memory'] < LOW_MEMORY_MB:
             recommendations.append(
                 "Low memory usage detected. Consider using instances with less memory allocation."
             )
-            potential_savings += metrics.total_cost * 0.05
+            potential_savings += metrics['total_cost'] * 0.05
         
         # Check throughput efficiency
-        if metrics.avg_throughput and metrics.avg_throughput < 10:  # Less than 10 requests per minute
+        if metrics['avg_throughput'] and metrics['avg_throughput'] < LOW_THROUGHPUT_REQ_PER_MIN:
             recommendations.append(
-                f"Low throughput ({metrics.avg_throughput:.1f} req/min). "
+                f"Low throughput ({metrics['avg_throughput']:.1f} req/min). "
                 "Consider batch processing or request optimization."
             )
         
@@ -431,94 +589,115 @@ class CostAnalysisService:
         return {
             'agent_id': agent_id,
             'analysis_period_days': days,
-            'current_total_cost': round(metrics.total_cost or 0, 4),
+            'current_total_cost': round(metrics['total_cost'] or 0, 4),
             'recommendations': recommendations,
             'potential_monthly_savings': round(potential_savings * 30 / days, 2),
             'confidence': confidence,
             'metrics_summary': {
-                'avg_cost_per_request': round(metrics.avg_cost or 0, 6),
-                'avg_latency_ms': round(metrics.avg_latency or 0, 1),
-                'avg_throughput': round(metrics.avg_throughput or 0, 1),
-                'avg_cpu_usage': round(metrics.avg_cpu or 0, 1),
-                'avg_memory_mb': round(metrics.avg_memory or 0, 1),
-                'total_requests': metrics.total_requests
-            }
+                'avg_cost_per_request': round(metrics['avg_cost'] or 0, 6),
+                'avg_latency_ms': round(metrics['avg_latency'] or 0, 1),
+                'avg_throughput': round(metrics['avg_throughput'] or 0, 1),
+                'avg_cpu_usage': round(metrics['avg_cpu'] or 0, 1),
+                'avg_memory_mb': round(metrics['avg_memory'] or 0, 1),
+                'total_requests': metrics['total_requests']
+            },
+            'days_over_threshold': self._days_over_threshold(daily)
         }
     
-    def _get_period_cost(self, agent_id: str, start_time: datetime, end_time: datetime) -> float:
-        """Get total cost for an agent in a time period."""
-        result = self.db.query(
-            func.sum(PerformanceMetric.cost_per_request)
-        ).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time,
-                PerformanceMetric.cost_per_request.isnot(None)
-            )
-        ).scalar()
-        
-        return float(result or 0)
-    
-    def _get_average_cost_per_request(self, agent_id: str, start_time: datetime, end_time: datetime) -> float:
-        """Get average cost per request for an agent in a time period."""
-        result = self.db.query(
-            func.avg(PerformanceMetric.cost_per_request)
-        ).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time,
-                PerformanceMetric.cost_per_request.isnot(None)
-            )
-        ).scalar()
+    def _daily_aggs(self, agent_ids: List[str], start_time: datetime, end_time: datetime) -> Dict[str, List[Dict]]:
+        """Per-day cost and performance sums for several agents, from the daily rollup in one query."""
+        stats = self.rollups.statistics('day', start_time, end_time, agent_ids=agent_ids).subquery()
+        c = stats.c
+        rows = self.db.execute(
+            select(
+                c.agent_id,
+                c.bucket.label('day'),
+                *(cast(func.sum(c[name]), BigInteger if name.endswith('_count') else Float).label(name)
+                  for name in DAILY_STATISTICS)
+            ).group_by(c.agent_id, c.bucket).order_by(c.agent_id, c.bucket)
+        )
         
-        return float(result or 0)
+        by_agent: Dict[str, List[Dict]] = {agent_id: [] for agent_id in agent_ids}
+        for row in rows:
+            day = dict(row._mapping)
+            by_agent[day.pop('agent_id')].append(day)
+        return by_agent
     
-    def _calculate_cost_trend(self, agent_id: str, period_start: datetime, period_end: datetime) -> str:
-        """Calculate cost trend for an agent in a period."""
-        # Get current period cost
-        current_cost = self._get_period_cost(agent_id, period_start, period_end)
-        
-        # Get previous period cost
-        period_duration = period_end - period_start
-        previous_start = period_start - period_duration
-        previous_cost = self._get_period_cost(agent_id, previous_start, period_start)
+    def _summarize_days(self, days: List[Dict]) -> Dict[str, any]:
+        """Averages and totals over the rows returned by ``_daily_aggs``."""
+        totals = {name: sum(day[name] for day in days) for name in DAILY_STATISTICS}
         
-        if previous_cost == 0 or current_cost == 0:
-            return 'stable'
+        def average(prefix: str) -> Optional[float]:
+            count = totals[f'{prefix}_count']
+            return totals[f'{prefix}_sum'] / count if count else None
         
-        change_percent = ((current_cost - previous_cost) / previous_cost) * 100
-        
-        if change_percent > 10:
-            return 'increasing'
-        elif change_percent < -10:
-            return 'decreasing'
-        else:
-            return 'stable'
+        return {
+            'avg_cost': average('cost'),
+            'avg_latency': average('latency'),
+            'avg_throughput': average('throughput'),
+            'avg_cpu': average('cpu'),
+            'avg_memory': average('memory'),
+            'total_cost': totals['cost_sum'] if totals['cost_count'] else None,
+            'total_requests': totals['metric_count']
+        }
+    
+    def _days_over_threshold(self, daily: List[Dict]) -> Dict[str, float]:
+        """
+        Fraction of days on which each recommendation threshold was crossed,
+        telling a one-day spike from a steady inefficiency.
+        """
+        def averages(prefix: str) -> np.ndarray:
+            sums = np.array([day[f'{prefix}_sum'] for day in daily], dtype=float)
+            counts = np.array([day[f'{prefix}_count'] for day in daily], dtype=float)
+            return np.divide(sums, counts, out=np.full(len(daily), np.nan), where=counts > 0)
+        
+        # Days without a value compare False against every threshold
+        cost = averages('cost')
+        latency = averages('latency')
+        masks = {
+            'high_cost': cost > HIGH_COST_PER_REQUEST,
+            'high_latency_and_cost': (latency > HIGH_LATENCY_MS) & (cost > ELEVATED_COST_PER_REQUEST),
+            'low_cpu': averages('cpu') < LOW_CPU_PERCENT,
+            'low_memory': averages('memory') < LOW_MEMORY_MB,
+            'low_throughput': averages('throughput') < LOW_THROUGHPUT_REQ_PER_MIN,
+        }
+        return {rule: round(float(mask.mean()), 2) for rule, mask in masks.items()}
     
     def _calculate_cost_efficiency(self, avg_cost_per_request: float) -> str:
         """Calculate cost efficiency rating based on cost per request."""
         if avg_cost_per_request is None or avg_cost_per_request <= 0:
             return 'unknown'
         
-        # Thresholds for cost efficiency (these would be configurable in practice)
-        if avg_cost_per_request <= 0.001:
-            return 'excellent'
-        elif avg_cost_per_request <= 0.005:
-            return 'good'
-        elif avg_cost_per_request <= 0.01:
-            return 'fair'
-        else:
-            return 'poor'
+        return EFFICIENCY_RATINGS[bisect_left(EFFICIENCY_THRESHOLDS, avg_cost_per_request)]
     
-    def _get_period_end(self, period_start: datetime, period: CostPeriod) -> datetime:
-        """Calculate the end time for a given period start."""
-        if period == CostPeriod.DAILY:
-            return period_start + timedelta(days=1)
-        elif period == CostPeriod.WEEKLY:
-            return period_start + timedelta(weeks=1)
+    def _previous_period_start(self, value: datetime, period: CostPeriod) -> datetime:
+        """Start of the UTC period before the one containing ``value``."""
+        day = floor_bucket(value, 'day')
+        if period == CostPeriod.WEEKLY:
+            return day - timedelta(days=day.weekday() + 7)
         elif period == CostPeriod.MONTHLY:
-            return period_start + timedelta(days=30)  # Approximate
+            return (day.replace(day=1) - timedelta(days=1)).replace(day=1)
         else:
-            return period_start + timedelta(days=1)
\ No newline at end of file
+            return day - timedelta(days=1)
+    
+    def _agent_names(self, agent_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Names of all agents by ID, from a short-lived process-wide cache.
+        
+        Agents are renamed rarely, but new agents register at any time, so
+        the names are reloaded when any of ``agent_ids`` is not cached yet.
+        IDs still missing after a reload are cached as None, so a deleted
+        agent does not force a reload on every call.
+        """
+        agent_ids = set(agent_ids)
+        cache = get_result_cache()
+        names = cache.get_or_load(AGENT_NAMES_CACHE_KEY, AGENT_NAMES_CACHE_TTL_SECONDS, self._load_agent_names)
+        if not names.keys() >= agent_ids:
+            names = self._load_agent_names()
+            names.update(dict.fromkeys(agent_ids - names.keys()))
+            cache.set(AGENT_NAMES_CACHE_KEY, names, AGENT_NAMES_CACHE_TTL_SECONDS)
+        return names
+    
+    def _load_agent_names(self) -> Dict[str, str]:
+        """Names of all agents by ID."""
+        return dict(self.db.execute(select(AIAgent.agent_id, AIAgent.name)).all())
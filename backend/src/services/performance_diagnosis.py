@@ -6,13 +6,33 @@ identifying bottlenecks, and providing optimization recommendations.
 """
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc, case
+from sqlalchemy import Row, func, and_, select
 
 from ..models import PerformanceMetric, AIAgent
+from .result_cache import get_result_cache
+
+
+# How long a diagnosis is reused for identical requests
+DIAGNOSIS_CACHE_TTL_SECONDS = 60
+
+# Issue thresholds, also evaluated in SQL by _fetch_aggregates
+HIGH_LATENCY_MS = 2000
+CRITICAL_P95_LATENCY_MS = 5000
+LOW_THROUGHPUT_REQ_PER_MIN = 5
+HIGH_CPU_PERCENT = 85
+
+# Score tiers: an average up to LATENCY_SCORE_BOUNDS[i] ms scores
+# LATENCY_SCORES[i]; one of at least THROUGHPUT_SCORE_BOUNDS[i - 1] req/min
+# scores THROUGHPUT_SCORES[i]
+LATENCY_SCORE_BOUNDS = np.array([100, 500, 1000, 2000, 5000])
+LATENCY_SCORES = np.array([100, 85, 70, 50, 25, 0])
+THROUGHPUT_SCORE_BOUNDS = np.array([1, 5, 15, 30, 60])
+THROUGHPUT_SCORES = np.array([0, 25, 50, 70, 85, 100])
 
 
 class PerformanceIssueType(Enum):
@@ -65,6 +85,36 @@ class PerformanceSummary:
     recommendations_count: int
 
 
+@dataclass
+class MetricAggregates:
+    """Data class for the statistics of an agent's metrics over a window."""
+    metric_count: int
+    first_seen: Optional[datetime]
+    last_seen: Optional[datetime]
+    avg_latency: Optional[float]
+    p95_latency: Optional[float]
+    high_latency_count: int
+    high_latency_first_seen: Optional[datetime]
+    high_latency_last_seen: Optional[datetime]
+    critical_latency_count: int
+    avg_throughput: Optional[float]
+    low_throughput_count: int
+    avg_cpu: Optional[float]
+    high_cpu_count: int
+    high_cpu_first_seen: Optional[datetime]
+    high_cpu_last_seen: Optional[datetime]
+    first_half_count: int
+    second_half_count: int
+    first_half_avg_latency: Optional[float]
+    second_half_avg_latency: Optional[float]
+    # Derived from the individual points by _add_sample_statistics
+    memory_count: int = 0
+    memory_first: Optional[float] = None
+    memory_last: Optional[float] = None
+    memory_trend: float = 0
+    max_gap_seconds: float = 0
+
+
 class PerformanceDiagnosisService:
     """Service for diagnosing performance issues and providing recommendations."""
     
@@ -86,24 +136,35 @@ class PerformanceDiagnosisService:
         Returns:
             Tuple of (performance summary, list of issues)
         """
-        end_time = datetime.now(timezone.utc)
+        # Rounded to the minute so dashboard refreshes share a cached diagnosis
+        end_time = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        summary, issues = get_result_cache().get_or_load(
+            ('performance_diagnosis', agent_id, hours, end_time),
+            DIAGNOSIS_CACHE_TTL_SECONDS,
+            lambda: self._diagnose_agent_performance(agent_id, hours, end_time)
+        )
+        return summary, list(issues)
+    
+    def _diagnose_agent_performance(
+        self,
+        agent_id: str,
+        hours: int,
+        end_time: datetime
+    ) -> Tuple[PerformanceSummary, List[PerformanceIssue]]:
+        """Diagnose the ``hours`` before ``end_time``."""
         start_time = end_time - timedelta(hours=hours)
         
-        # Get agent info
-        agent = self.db.query(AIAgent).filter(AIAgent.agent_id == agent_id).first()
+        # Get agent info; the detectors only read its ID and name
+        agent = self.db.execute(
+            select(AIAgent.agent_id, AIAgent.name).where(AIAgent.agent_id == agent_id)
+        ).first()
         if not agent:
             raise ValueError(f"Agent {agent_id} not found")
         
-        # Get performance metrics for the period
-        metrics = self.db.query(PerformanceMetric).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time
-            )
-        ).all()
+        # Get performance statistics for the period
+        aggregates = self._fetch_aggregates(agent_id, start_time, end_time)
         
-        if not metrics:
+        if not aggregates.metric_count:
             return PerformanceSummary(
                 agent_id=agent_id,
                 agent_name=agent.name,
@@ -116,19 +177,29 @@ class PerformanceDiagnosisService:
                 recommendations_count=0
             ), []
         
-        # Detect issues
+        # Gap and memory trend detection need the individual points
+        aggregates = self._add_sample_statistics(aggregates, agent_id, start_time, end_time)
+        
+        # Detect issues, counting those with a recommendation as they are added
         issues = []
-        issues.extend(self._detect_latency_issues(agent, metrics))
-        issues.extend(self._detect_throughput_issues(agent, metrics))
-        issues.extend(self._detect_resource_issues(agent, metrics))
-        issues.extend(self._detect_reliability_issues(agent, metrics))
-        issues.extend(self._detect_performance_degradation(agent, metrics, start_time, end_time))
+        recommendations_count = 0
+        for detected in (
+            self._detect_latency_issues(agent, aggregates),
+            self._detect_throughput_issues(agent, aggregates),
+            self._detect_resource_issues(agent, aggregates),
+            self._detect_reliability_issues(agent, aggregates),
+            self._detect_performance_degradation(agent, aggregates, start_time, end_time)
+        ):
+            for issue in detected:
+                issues.append(issue)
+                if issue.recommendation:
+                    recommendations_count += 1
         
         # Calculate scores
-        latency_score = self._calculate_latency_score(metrics)
-        throughput_score = self._calculate_throughput_score(metrics)
-        resource_score = self._calculate_resource_efficiency_score(metrics)
-        reliability_score = self._calculate_reliability_score(metrics)
+        latency_score = self._calculate_latency_score(aggregates)
+        throughput_score = self._calculate_throughput_score(aggregates)
+        resource_score = self._calculate_resource_efficiency_score(aggregates)
+        reliability_score = self._calculate_reliability_score(aggregates)
         
         # Determine overall health
         overall_score = (latency_score + throughput_score + resource_score + reliability_score) / 4
@@ -143,7 +214,7 @@ class PerformanceDiagnosisService:
             resource_efficiency_score=resource_score,
             reliability_score=reliability_score,
             issues_count=len(issues),
-            recommendations_count=len([i for i in issues if i.recommendation])
+            recommendations_count=recommendations_count
         )
         
         return summary, issues
@@ -193,15 +264,9 @@ class PerformanceDiagnosisService:
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(hours=hours)
         
-        metrics = self.db.query(PerformanceMetric).filter(
-            and_(
-                PerformanceMetric.agent_id == agent_id,
-                PerformanceMetric.timestamp >= start_time,
-                PerformanceMetric.timestamp <= end_time
-            )
-        ).all()
+        aggregates = self._fetch_aggregates(agent_id, start_time, end_time)
         
-        if not metrics:
+        if not aggregates.metric_count:
             return {
                 'score': 0,
                 'health_rating': 'unknown',
@@ -214,10 +279,11 @@ class PerformanceDiagnosisService:
             }
         
         # Calculate individual component scores
-        latency_score = self._calculate_latency_score(metrics)
-        throughput_score = self._calculate_throughput_score(metrics)
-        resource_score = self._calculate_resource_efficiency_score(metrics)
-        reliability_score = self._calculate_reliability_score(metrics)
+        aggregates = self._add_sample_statistics(aggregates, agent_id, start_time, end_time)
+        latency_score = self._calculate_latency_score(aggregates)
+        throughput_score = self._calculate_throughput_score(aggregates)
+        resource_score = self._calculate_resource_efficiency_score(aggregates)
+        reliability_score = self._calculate_reliability_score(aggregates)
         
         # Calculate weighted overall score
         overall_score = (
@@ -331,19 +397,110 @@ class PerformanceDiagnosisService:
         
         return recommendations
     
-    def _detect_latency_issues(self, agent: AIAgent, metrics: List[PerformanceMetric]) -> List[PerformanceIssue]:
+    def _fetch_aggregates(self, agent_id: str, start_time: datetime, end_time: datetime) -> MetricAggregates:
+        """
+        Compute every statistic the detectors and scores need in one query.
+        
+        Only the single aggregate row leaves the database, however many
+        metrics the window holds.
+        """
+        m = PerformanceMetric
+        mid_time = start_time + (end_time - start_time) / 2
+        high_latency = m.latency_ms > HIGH_LATENCY_MS
+        high_cpu = m.cpu_usage_percent > HIGH_CPU_PERCENT
+        
+        row = self.db.execute(
+            select(
+                func.count().label('metric_count'),
+                func.min(m.timestamp).label('first_seen'),
+                func.max(m.timestamp).label('last_seen'),
+                func.avg(m.latency_ms).label('avg_latency'),
+                func.percentile_cont(0.95).within_group(m.latency_ms.asc()).label('p95_latency'),
+                func.count().filter(high_latency).label('high_latency_count'),
+                func.min(m.timestamp).filter(high_latency).label('high_latency_first_seen'),
+                func.max(m.timestamp).filter(high_latency).label('high_latency_last_seen'),
+                func.count().filter(m.latency_ms > CRITICAL_P95_LATENCY_MS).label('critical_latency_count'),
+                func.avg(m.throughput_req_per_min).label('avg_throughput'),
+                func.count().filter(m.throughput_req_per_min < LOW_THROUGHPUT_REQ_PER_MIN).label('low_throughput_count'),
+                func.avg(m.cpu_usage_percent).label('avg_cpu'),
+                func.count().filter(high_cpu).label('high_cpu_count'),
+                func.min(m.timestamp).filter(high_cpu).label('high_cpu_first_seen'),
+                func.max(m.timestamp).filter(high_cpu).label('high_cpu_last_seen'),
+                func.count().filter(m.timestamp <= mid_time).label('first_half_count'),
+                func.count().filter(m.timestamp > mid_time).label('second_half_count'),
+                func.avg(m.latency_ms).filter(m.timestamp <= mid_time).label('first_half_avg_latency'),
+                func.avg(m.latency_ms).filter(m.timestamp > mid_time).label('second_half_avg_latency'),
+            ).where(
+                and_(
+                    m.agent_id == agent_id,
+                    m.timestamp >= start_time,
+                    m.timestamp <= end_time
+                )
+            )
+        ).one()
+        return MetricAggregates(**row._mapping)
+    
+    def _add_sample_statistics(
+        self,
+        aggregates: MetricAggregates,
+        agent_id: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> MetricAggregates:
+        """
+        ``aggregates`` completed with the memory trend and largest gap of the
+        individual metrics in the window.
+        
+        Timestamp and memory usage are streamed oldest first, an index-only
+        scan of idx_metrics_agent_timestamp_covering, so only one batch of
+        rows is held at a time; memory values are kept as float64 arrays.
+        """
+        m = PerformanceMetric
+        memory_batches = []
+        max_gap_seconds = 0.0
+        # Last timestamp of the previous batch, so gaps across batches count
+        previous = np.empty(0, dtype=np.float64)
+        
+        for batch in m.stream_metrics(
+            self.db, agent_id, start_time, end_time,
+            columns=[m.timestamp, m.memory_usage_mb]
+        ):
+            timestamps, memory = zip(*batch)
+            timestamps = np.concatenate((previous, np.fromiter(
+                (timestamp.timestamp() for timestamp in timestamps),
+                dtype=np.float64,
+                count=len(timestamps)
+            )))
+            if timestamps.size > 1:
+                max_gap_seconds = max(max_gap_seconds, float(np.diff(timestamps).max()))
+            previous = timestamps[-1:]
+            
+            # None converts to NaN under a float dtype
+            memory = np.array(memory, dtype=np.float64)
+            memory_batches.append(memory[~np.isnan(memory)])
+        
+        memory = np.concatenate(memory_batches) if memory_batches else np.empty(0, dtype=np.float64)
+        return replace(
+            aggregates,
+            memory_count=memory.size,
+            memory_first=float(memory[0]) if memory.size else None,
+            memory_last=float(memory[-1]) if memory.size else None,
+            memory_trend=self._calculate_trend(memory),
+            max_gap_seconds=max_gap_seconds
+        )
+    
+    def _detect_latency_issues(self, agent: Row, aggregates: MetricAggregates) -> List[PerformanceIssue]:
         """Detect latency-related performance issues."""
         issues = []
         
-        latency_values = [m.latency_ms for m in metrics if m.latency_ms is not None]
-        if not latency_values:
+        if aggregates.avg_latency is None:
             return issues
         
-        avg_latency = sum(latency_values) / len(latency_values)
-        p95_latency = sorted(latency_values)[int(len(latency_values) * 0.95)]
+        avg_latency = aggregates.avg_latency
+        p95_latency = aggregates.p95_latency
         
         # High average latency
-        if avg_latency > 2000:  # 2 seconds
+        if avg_latency > HIGH_LATENCY_MS:  # 2 seconds
             issues.append(PerformanceIssue(
                 agent_id=agent.agent_id,
                 agent_name=agent.name,
@@ -352,16 +509,16 @@ class PerformanceDiagnosisService:
                 title="High Average Latency",
                 description=f"Average latency ({avg_latency:.1f}ms) exceeds recommended threshold",
                 current_value=avg_latency,
-                threshold_value=2000,
+                threshold_value=HIGH_LATENCY_MS,
                 recommendation="Optimize model parameters, implement caching, or upgrade hardware",
                 detected_at=datetime.now(timezone.utc),
-                first_seen=min(m.timestamp for m in metrics if m.latency_ms and m.latency_ms > 2000),
-                last_seen=max(m.timestamp for m in metrics if m.latency_ms and m.latency_ms > 2000),
-                occurrence_count=len([l for l in latency_values if l > 2000])
+                first_seen=aggregates.high_latency_first_seen,
+                last_seen=aggregates.high_latency_last_seen,
+                occurrence_count=aggregates.high_latency_count
             ))
         
         # High P95 latency
-        if p95_latency > 5000:  # 5 seconds
+        if p95_latency > CRITICAL_P95_LATENCY_MS:  # 5 seconds
             issues.append(PerformanceIssue(
                 agent_id=agent.agent_id,
                 agent_name=agent.name,
@@ -370,28 +527,27 @@ class PerformanceDiagnosisService:
                 title="High P95 Latency",
                 description=f"95th percentile latency ({p95_latency:.1f}ms) is critically high",
                 current_value=p95_latency,
-                threshold_value=5000,
+                threshold_value=CRITICAL_P95_LATENCY_MS,
                 recommendation="Investigate and fix performance bottlenecks causing latency spikes",
                 detected_at=datetime.now(timezone.utc),
-                first_seen=min(m.timestamp for m in metrics),
-                last_seen=max(m.timestamp for m in metrics),
-                occurrence_count=len([l for l in latency_values if l > 5000])
+                first_seen=aggregates.first_seen,
+                last_seen=aggregates.last_seen,
+                occurrence_count=aggregates.critical_latency_count
             ))
         
         return issues
     
-    def _detect_throughput_issues(self, agent: AIAgent, metrics: List[PerformanceMetric]) -> List[PerformanceIssue]:
+    def _detect_throughput_issues(self, agent: Row, aggregates: MetricAggregates) -> List[PerformanceIssue]:
         """Detect throughput-related performance issues."""
         issues = []
         
-        throughput_values = [m.throughput_req_per_min for m in metrics if m.throughput_req_per_min is not None]
-        if not throughput_values:
+        if aggregates.avg_throughput is None:
             return issues
         
-        avg_throughput = sum(throughput_values) / len(throughput_values)
+        avg_throughput = aggregates.avg_throughput
         
         # Low throughput
-        if avg_throughput < 5:  # Less than 5 requests per minute
+        if avg_throughput < LOW_THROUGHPUT_REQ_PER_MIN:  # Less than 5 requests per minute
             issues.append(PerformanceIssue(
                 agent_id=agent.agent_id,
                 agent_name=agent.name,
@@ -400,27 +556,29 @@ class PerformanceDiagnosisService:
                 title="Low Request Throughput",
                 description=f"Average throughput ({avg_throughput:.1f} req/min) is below optimal levels",
                 current_value=avg_throughput,
-                threshold_value=5,
+                threshold_value=LOW_THROUGHPUT_REQ_PER_MIN,
                 recommendation="Implement request batching, optimize processing pipeline, or scale resources",
                 detected_at=datetime.now(timezone.utc),
-                first_seen=min(m.timestamp for m in metrics),
-                last_seen=max(m.timestamp for m in metrics),
-                occurrence_count=len([t for t in throughput_values if t < 5])
+                first_seen=aggregates.first_seen,
+                last_seen=aggregates.last_seen,
+                occurrence_count=aggregates.low_throughput_count
             ))
         
         return issues
     
-    def _detect_resource_issues(self, agent: AIAgent, metrics: List[PerformanceMetric]) -> List[PerformanceIssue]:
+    def _detect_resource_issues(
+        self,
+        agent: Row,
+        aggregates: MetricAggregates
+    ) -> List[PerformanceIssue]:
         """Detect resource utilization issues."""
         issues = []
         
         # CPU usage issues
-        cpu_values = [m.cpu_usage_percent for m in metrics if m.cpu_usage_percent is not None]
-        if cpu_values:
-            avg_cpu = sum(cpu_values) / len(cpu_values)
-            max_cpu = max(cpu_values)
+        if aggregates.avg_cpu is not None:
+            avg_cpu = aggregates.avg_cpu
             
-            if avg_cpu > 85:
+            if avg_cpu > HIGH_CPU_PERCENT:
                 issues.append(PerformanceIssue(
                     agent_id=agent.agent_id,
                     agent_name=agent.name,
@@ -429,18 +587,17 @@ class PerformanceDiagnosisService:
                     title="High CPU Usage",
                     description=f"Average CPU usage ({avg_cpu:.1f}%) is critically high",
                     current_value=avg_cpu,
-                    threshold_value=85,
+                    threshold_value=HIGH_CPU_PERCENT,
                     recommendation="Scale CPU resources or optimize computational workload",
                     detected_at=datetime.now(timezone.utc),
-                    first_seen=min(m.timestamp for m in metrics if m.cpu_usage_percent and m.cpu_usage_percent > 85),
-                    last_seen=max(m.timestamp for m in metrics if m.cpu_usage_percent and m.cpu_usage_percent > 85),
-                    occurrence_count=len([c for c in cpu_values if c > 85])
+                    first_seen=aggregates.high_cpu_first_seen,
+                    last_seen=aggregates.high_cpu_last_seen,
+                    occurrence_count=aggregates.high_cpu_count
                 ))
         
         # Memory usage issues
-        memory_values = [m.memory_usage_mb for m in metrics if m.memory_usage_mb is not None]
-        if memory_values:
-            memory_trend = self._calculate_trend(memory_values)
+        if aggregates.memory_count:
+            memory_trend = aggregates.memory_trend
             if memory_trend > 20:  # 20% increase over time period
                 issues.append(PerformanceIssue(
                     agent_id=agent.agent_id,
@@ -449,47 +606,44 @@ class PerformanceDiagnosisService:
                     severity=IssueSeverity.HIGH,
                     title="Potential Memory Leak",
                     description=f"Memory usage shows increasing trend ({memory_trend:.1f}% growth)",
-                    current_value=memory_values[-1],
-                    threshold_value=memory_values[0] * 1.2,
+                    current_value=aggregates.memory_last,
+                    threshold_value=aggregates.memory_first * 1.2,
                     recommendation="Investigate memory allocation patterns and fix potential memory leaks",
                     detected_at=datetime.now(timezone.utc),
-                    first_seen=min(m.timestamp for m in metrics),
-                    last_seen=max(m.timestamp for m in metrics),
+                    first_seen=aggregates.first_seen,
+                    last_seen=aggregates.last_seen,
                     occurrence_count=1
                 ))
         
         return issues
     
-    def _detect_reliability_issues(self, agent: AIAgent, metrics: List[PerformanceMetric]) -> List[PerformanceIssue]:
+    def _detect_reliability_issues(
+        self,
+        agent: Row,
+        aggregates: MetricAggregates
+    ) -> List[PerformanceIssue]:
         """Detect reliability-related issues."""
         issues = []
         
         # Check for data gaps (potential downtime)
-        if len(metrics) < 2:
+        if aggregates.metric_count < 2:
             return issues
         
-        sorted_metrics = sorted(metrics, key=lambda m: m.timestamp)
-        max_gap = timedelta(0)
-        
-        for i in range(1, len(sorted_metrics)):
-            gap = sorted_metrics[i].timestamp - sorted_metrics[i-1].timestamp
-            if gap > max_gap:
-                max_gap = gap
-        
-        if max_gap > timedelta(hours=1):  # Gap larger than 1 hour
+        max_gap_hours = aggregates.max_gap_seconds / 3600
+        if max_gap_hours > 1:  # Gap larger than 1 hour
             issues.append(PerformanceIssue(
                 agent_id=agent.agent_id,
                 agent_name=agent.name,
                 issue_type=PerformanceIssueType.INTERMITTENT_ISSUES,
                 severity=IssueSeverity.MEDIUM,
                 title="Data Collection Gaps",
-                description=f"Detected data gap of {max_gap.total_seconds()/3600:.1f} hours",
-                current_value=max_gap.total_seconds()/3600,
+                description=f"Detected data gap of {max_gap_hours:.1f} hours",
+                current_value=max_gap_hours,
                 threshold_value=1,
                 recommendation="Investigate agent connectivity and monitoring system reliability",
                 detected_at=datetime.now(timezone.utc),
-                first_seen=min(m.timestamp for m in metrics),
-                last_seen=max(m.timestamp for m in metrics),
+                first_seen=aggregates.first_seen,
+                last_seen=aggregates.last_seen,
                 occurrence_count=1
             ))
         
@@ -497,31 +651,26 @@ class PerformanceDiagnosisService:
     
     def _detect_performance_degradation(
         self, 
-        agent: AIAgent, 
-        metrics: List[PerformanceMetric], 
+        agent: Row, 
+        aggregates: MetricAggregates, 
         start_time: datetime, 
         end_time: datetime
     ) -> List[PerformanceIssue]:
         """Detect performance degradation over time."""
         issues = []
         
-        # Split metrics into first half and second half of the time period
+        # Metrics are split into the first and second half of the time period
+        # by _fetch_aggregates
         mid_time = start_time + (end_time - start_time) / 2
         
-        first_half = [m for m in metrics if m.timestamp <= mid_time]
-        second_half = [m for m in metrics if m.timestamp > mid_time]
-        
-        if len(first_half) < 2 or len(second_half) < 2:
+        if aggregates.first_half_count < 2 or aggregates.second_half_count < 2:
             return issues
         
         # Compare latency between periods
-        first_half_latency = [m.latency_ms for m in first_half if m.latency_ms is not None]
-        second_half_latency = [m.latency_ms for m in second_half if m.latency_ms is not None]
+        first_avg = aggregates.first_half_avg_latency
+        second_avg = aggregates.second_half_avg_latency
         
-        if first_half_latency and second_half_latency:
-            first_avg = sum(first_half_latency) / len(first_half_latency)
-            second_avg = sum(second_half_latency) / len(second_half_latency)
-            
+        if first_avg is not None and second_avg is not None:
             if first_avg > 0:
                 degradation = ((second_avg - first_avg) / first_avg) * 100
                 
@@ -544,60 +693,29 @@ class PerformanceDiagnosisService:
         
         return issues
     
-    def _calculate_latency_score(self, metrics: List[PerformanceMetric]) -> int:
+    def _calculate_latency_score(self, aggregates: MetricAggregates) -> int:
         """Calculate latency performance score (0-100)."""
-        latency_values = [m.latency_ms for m in metrics if m.latency_ms is not None]
-        if not latency_values:
+        if aggregates.avg_latency is None:
             return 50  # Neutral score if no data
         
-        avg_latency = sum(latency_values) / len(latency_values)
-        
         # Score based on latency thresholds
-        if avg_latency <= 100:
-            return 100
-        elif avg_latency <= 500:
-            return 85
-        elif avg_latency <= 1000:
-            return 70
-        elif avg_latency <= 2000:
-            return 50
-        elif avg_latency <= 5000:
-            return 25
-        else:
-            return 0
+        return int(LATENCY_SCORES[np.searchsorted(LATENCY_SCORE_BOUNDS, aggregates.avg_latency)])
     
-    def _calculate_throughput_score(self, metrics: List[PerformanceMetric]) -> int:
+    def _calculate_throughput_score(self, aggregates: MetricAggregates) -> int:
         """Calculate throughput performance score (0-100)."""
-        throughput_values = [m.throughput_req_per_min for m in metrics if m.throughput_req_per_min is not None]
-        if not throughput_values:
+        if aggregates.avg_throughput is None:
             return 50
         
-        avg_throughput = sum(throughput_values) / len(throughput_values)
-        
         # Score based on throughput thresholds
-        if avg_throughput >= 60:
-            return 100
-        elif avg_throughput >= 30:
-            return 85
-        elif avg_throughput >= 15:
-            return 70
-        elif avg_throughput >= 5:
-            return 50
-        elif avg_throughput >= 1:
-            return 25
-        else:
-            return 0
+        return int(THROUGHPUT_SCORES[np.searchsorted(THROUGHPUT_SCORE_BOUNDS, aggregates.avg_throughput, side='right')])
     
-    def _calculate_resource_efficiency_score(self, metrics: List[PerformanceMetric]) -> int:
+    def _calculate_resource_efficiency_score(self, aggregates: MetricAggregates) -> int:
         """Calculate resource efficiency score (0-100)."""
-        cpu_values = [m.cpu_usage_percent for m in metrics if m.cpu_usage_percent is not None]
-        memory_values = [m.memory_usage_mb for m in metrics if m.memory_usage_mb is not None]
-        
         scores = []
         
         # CPU efficiency score
-        if cpu_values:
-            avg_cpu = sum(cpu_values) / len(cpu_values)
+        if aggregates.avg_cpu is not None:
+            avg_cpu = aggregates.avg_cpu
             if 50 <= avg_cpu <= 80:  # Optimal range
                 scores.append(100)
             elif 30 <= avg_cpu < 50 or 80 < avg_cpu <= 90:
@@ -606,8 +724,8 @@ class PerformanceDiagnosisService:
                 scores.append(30)
         
         # Memory trend score (penalize increasing trends)
-        if memory_values and len(memory_values) > 1:
-            trend = self._calculate_trend(memory_values)
+        if aggregates.memory_count > 1:
+            trend = aggregates.memory_trend
             if trend <= 0:  # Stable or decreasing
                 scores.append(100)
             elif trend <= 10:
@@ -619,31 +737,30 @@ class PerformanceDiagnosisService:
         
         return int(sum(scores) / len(scores)) if scores else 50
     
-    def _calculate_reliability_score(self, metrics: List[PerformanceMetric]) -> int:
+    def _calculate_reliability_score(self, aggregates: MetricAggregates) -> int:
         """Calculate reliability score based on data consistency (0-100)."""
-        if len(metrics) < 2:
+        if aggregates.metric_count < 2:
             return 50
         
         # Calculate expected vs actual data points
-        sorted_metrics = sorted(metrics, key=lambda m: m.timestamp)
-        total_time = sorted_metrics[-1].timestamp - sorted_metrics[0].timestamp
+        total_time = aggregates.last_seen - aggregates.first_seen
         expected_points = max(1, total_time.total_seconds() / 300)  # Every 5 minutes
-        actual_points = len(metrics)
+        actual_points = aggregates.metric_count
         
         reliability_ratio = min(1.0, actual_points / expected_points)
         
         return int(reliability_ratio * 100)
     
-    def _calculate_trend(self, values: List[float]) -> float:
-        """Calculate trend percentage over the values list."""
+    def _calculate_trend(self, values: np.ndarray) -> float:
+        """Calculate trend percentage over the values array."""
         if len(values) < 2:
             return 0
         
-        first_third = values[:len(values)//3] if len(values) >= 3 else [values[0]]
-        last_third = values[-len(values)//3:] if len(values) >= 3 else [values[-1]]
+        first_third = values[:len(values)//3] if len(values) >= 3 else values[:1]
+        last_third = values[-len(values)//3:] if len(values) >= 3 else values[-1:]
         
-        first_avg = sum(first_third) / len(first_third)
-        last_avg = sum(last_third) / len(last_third)
+        first_avg = float(first_third.mean())
+        last_avg = float(last_third.mean())
         
         if first_avg == 0:
             return 0
@@ -0,0 +1,82 @@
+"""
+In-process TTL cache for service results.
+
+Dashboards request the same agent summaries and trends on every page load.
+Callers key results on a time window rounded down to the minute, so repeated
+requests within the TTL share one database query per process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+# Upper bound on cached results; least recently used are evicted first
+RESULT_CACHE_MAX_SIZE = 1024
+
+# Returned by ResultCache.get for absent or expired keys, since None is a valid result
+MISSING = object()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache whose entries expire after a per-entry TTL.
+
+    Services run in worker threads, so access is guarded by a lock. The lock
+    is not held while loading, so concurrent misses may load the same key
+    more than once; the last result wins.
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_MAX_SIZE):
+        """Initialize an empty cache holding at most ``max_size`` results."""
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """Return the unexpired result for ``key``, or ``MISSING``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        """Cache ``value`` for ``ttl_seconds``, evicting the least recently used when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, ttl_seconds: float, loader: Callable[[], Any]) -> Any:
+        """Return the cached result for ``key`` or load and cache it, even if it is None."""
+        value = self.get(key)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value, ttl_seconds)
+        return value
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global result cache instance
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the global result cache instance."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
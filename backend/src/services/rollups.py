@@ -0,0 +1,295 @@
+"""
+Metric rollup service for Sentinel AI.
+
+This service keeps the minute/hour/day rollup tables up to date and builds
+queries that combine them with raw metrics, so aggregations over long time
+ranges read a few pre-aggregated rows per bucket instead of every metric.
+Buckets are aligned to UTC.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, and_, case, column, func, literal, literal_column, select, text, union_all, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from ..database import get_database_manager
+from ..models import (
+    PerformanceMetric, MetricRollupMinute, MetricRollupHour, MetricRollupDay, MetricRollupState
+)
+
+
+# Rollup model and bucket width per granularity
+ROLLUP_MODELS = {
+    "minute": MetricRollupMinute,
+    "hour": MetricRollupHour,
+    "day": MetricRollupDay,
+}
+BUCKET_WIDTHS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Coarsest rollup whose buckets tile each aggregation interval
+ROLLUP_GRANULARITY = {
+    "minute": "minute",
+    "hour": "hour",
+    "day": "day",
+    "week": "day",
+    "month": "day",
+}
+
+# Metrics created within this lag are left for the next refresh, so rows from
+# transactions still in flight when a refresh runs are not skipped
+ROLLUP_LAG = timedelta(minutes=1)
+
+# Start of the oldest other transaction open in this database. created_at is
+# the inserting transaction's start time, so rows committed later by such a
+# transaction can still appear with an earlier created_at
+OLDEST_TRANSACTION_START = text("""
+    SELECT min(xact_start) AS xact_start
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+""").columns(column("xact_start", DateTime(timezone=True))).scalar_subquery()
+
+# Queries group by the bucket's output name so date_trunc is written once;
+# none of the source tables has a column of this name
+BUCKET_ALIAS = literal_column("bucket")
+
+# Statistics merged with MIN/MAX across buckets; all others are summed
+MIN_STATISTICS = frozenset({"latency_min"})
+MAX_STATISTICS = frozenset({"latency_max"})
+
+
+def raw_statistics() -> List[Tuple[str, object]]:
+    """(rollup column, aggregate over performance_metrics) for every statistic."""
+    m = PerformanceMetric
+    statistics = [
+        ("metric_count", func.count()),
+        ("latency_count", func.count(m.latency_ms)),
+        ("latency_sum", func.coalesce(func.sum(m.latency_ms), 0.0)),
+        ("latency_sum_sq", func.coalesce(func.sum(m.latency_ms * m.latency_ms), 0.0)),
+        ("latency_min", func.min(m.latency_ms)),
+        ("latency_max", func.max(m.latency_ms)),
+    ]
+    for prefix, column in (
+        ("throughput", m.throughput_req_per_min),
+        ("cost", m.cost_per_request),
+        ("cpu", m.cpu_usage_percent),
+        ("gpu", m.gpu_usage_percent),
+        ("memory", m.memory_usage_mb),
+    ):
+        statistics.append((f"{prefix}_count", func.count(column)))
+        statistics.append((f"{prefix}_sum", func.coalesce(func.sum(column), 0.0)))
+    return statistics
+
+
+STATISTIC_NAMES = tuple(name for name, _ in raw_statistics())
+
+
+def utc_bucket(unit: str, column):
+    """``date_trunc`` of ``column`` to ``unit`` in UTC; ``unit`` comes from a fixed set."""
+    return func.date_trunc(literal_column(f"'{unit}'"), column, literal_column("'UTC'"))
+
+
+def merged_average(total, count):
+    """Average from summed statistics; NULL when no values were present."""
+    return func.sum(total) / func.nullif(func.sum(count), 0)
+
+
+def merged_total(total, count):
+    """Sum from summed statistics; NULL when no values were present, like SUM()."""
+    return case((func.sum(count) > 0, func.sum(total)))
+
+
+def as_utc(value: datetime) -> datetime:
+    """``value`` as an aware UTC datetime; naive values are taken to be UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def floor_bucket(value: datetime, granularity: str) -> datetime:
+    """Start of the UTC bucket containing ``value``."""
+    value = as_utc(value)
+    if granularity == "minute":
+        return value.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(value: datetime, granularity: str) -> datetime:
+    """Start of the first UTC bucket beginning at or after ``value``."""
+    floor = floor_bucket(value, granularity)
+    if floor == as_utc(value):
+        return floor
+    return floor + BUCKET_WIDTHS[granularity]
+
+
+class MetricRollupService:
+    """Service for maintaining and querying metric rollups."""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def refresh(self) -> int:
+        """
+        Add metrics created since the last refresh to every rollup table.
+
+        The new watermark is capped at the start of the oldest open
+        transaction, so rows it commits later are picked up next time.
+
+        Runs in the caller's transaction; the caller commits. Concurrent
+        refreshes skip instead of waiting, so any number of workers may run
+        this on a schedule. Returns the number of rollup rows written.
+        """
+        # Lock the watermark; another refresh holding it already covers this run
+        since = self.db.execute(
+            select(MetricRollupState.rolled_up_to)
+            .where(MetricRollupState.state_id == 1)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if since is None:
+            return 0
+
+        # Stop short of transactions still in flight, whether they started within
+        # ROLLUP_LAG or long before; never move the watermark backwards. The
+        # bound is read once so every statement sees the same value
+        until = self.db.execute(select(func.greatest(
+            literal(since),
+            func.least(func.now() - literal(ROLLUP_LAG), OLDEST_TRANSACTION_START)
+        ))).scalar_one()
+
+        written = 0
+        for granularity, model in ROLLUP_MODELS.items():
+            result = self.db.execute(self._refresh_statement(granularity, model, since, until))
+            written += result.rowcount
+
+        self.db.execute(
+            update(MetricRollupState)
+            .where(MetricRollupState.state_id == 1)
+            .values(rolled_up_to=until)
+        )
+        return written
+
+    def statistics(
+        self,
+        interval: str,
+        start_time: datetime,
+        end_time: datetime,
+        agent_id: Optional[str] = None,
+        agent_ids: Optional[Sequence[str]] = None
+    ) -> Select:
+        """
+        Sufficient statistics per agent and ``interval`` bucket for metrics
+        with ``start_time <= timestamp <= end_time``, optionally restricted to
+        one agent or to several.
+
+        Whole rollup buckets inside the range come from the rollup table;
+        partial buckets at either edge and metrics not yet rolled up come
+        from performance_metrics. The same bucket may appear in several
+        branches, so callers must aggregate again per ``(agent_id, bucket)``.
+        """
+        m = PerformanceMetric
+        agent_filter = self._agent_filter(m, agent_id, agent_ids)
+
+        granularity = ROLLUP_GRANULARITY[interval]
+        full_start = ceil_bucket(start_time, granularity)
+        full_end = floor_bucket(end_time, granularity)
+
+        if full_start >= full_end:
+            # No whole rollup bucket in range
+            return self._raw_branch(interval, m.timestamp >= start_time, m.timestamp <= end_time, *agent_filter)
+
+        model = ROLLUP_MODELS[granularity]
+        rollup_bucket = utc_bucket(interval, model.bucket_start).label("bucket")
+        rollup_filters = [
+            model.bucket_start >= full_start,
+            model.bucket_start < full_end,
+            *self._agent_filter(model, agent_id, agent_ids)
+        ]
+        rollup_branch = select(
+            model.agent_id,
+            rollup_bucket,
+            *(self._merge(name, getattr(model, name)).label(name) for name in STATISTIC_NAMES)
+        ).where(*rollup_filters).group_by(model.agent_id, BUCKET_ALIAS)
+
+        rolled_up_to = select(MetricRollupState.rolled_up_to).scalar_subquery()
+        return union_all(
+            rollup_branch,
+            # Partial buckets at the edges
+            self._raw_branch(interval, m.timestamp >= start_time, m.timestamp < full_start, *agent_filter),
+            self._raw_branch(interval, m.timestamp >= full_end, m.timestamp <= end_time, *agent_filter),
+            # Metrics in whole buckets that the rollup does not include yet
+            self._raw_branch(
+                interval,
+                m.timestamp >= full_start,
+                m.timestamp < full_end,
+                m.created_at >= rolled_up_to,
+                *agent_filter
+            ),
+        )
+
+    def _raw_branch(self, interval: str, *filters) -> Select:
+        """Statistics per agent and bucket computed from performance_metrics."""
+        return select(
+            PerformanceMetric.agent_id,
+            utc_bucket(interval, PerformanceMetric.timestamp).label("bucket"),
+            *(aggregate.label(name) for name, aggregate in raw_statistics())
+        ).where(and_(*filters)).group_by(PerformanceMetric.agent_id, BUCKET_ALIAS)
+
+    def _refresh_statement(self, granularity: str, model, since: datetime, until):
+        """Upsert the statistics of metrics created in ``[since, until)`` into ``model``."""
+        m = PerformanceMetric
+        source = select(
+            m.agent_id,
+            utc_bucket(granularity, m.timestamp).label("bucket"),
+            *(aggregate for _, aggregate in raw_statistics())
+        ).where(
+            m.created_at >= since,
+            m.created_at < until
+        ).group_by(m.agent_id, BUCKET_ALIAS)
+
+        stmt = postgresql_insert(model).from_select(
+            ["agent_id", "bucket_start", *STATISTIC_NAMES], source
+        )
+        table = model.__table__
+        set_: Dict[str, object] = {}
+        for name in STATISTIC_NAMES:
+            if name in MIN_STATISTICS:
+                set_[name] = func.least(table.c[name], stmt.excluded[name])
+            elif name in MAX_STATISTICS:
+                set_[name] = func.greatest(table.c[name], stmt.excluded[name])
+            else:
+                set_[name] = table.c[name] + stmt.excluded[name]
+        return stmt.on_conflict_do_update(index_elements=["agent_id", "bucket_start"], set_=set_)
+
+    @staticmethod
+    def _agent_filter(model, agent_id: Optional[str], agent_ids: Optional[Sequence[str]]) -> List:
+        """Conditions restricting ``model`` rows to the requested agents."""
+        filters = []
+        if agent_id:
+            filters.append(model.agent_id == agent_id)
+        if agent_ids is not None:
+            filters.append(model.agent_id.in_(agent_ids))
+        return filters
+
+    @staticmethod
+    def _merge(name: str, column):
+        """Aggregate combining a statistic across buckets."""
+        if name in MIN_STATISTICS:
+            return func.min(column)
+        if name in MAX_STATISTICS:
+            return func.max(column)
+        return func.sum(column)
+
+
+def refresh_metric_rollups() -> int:
+    """Refresh the rollups in a session of their own - convenience function for jobs."""
+    with get_database_manager().get_session() as session:
+        return MetricRollupService(session).refresh()
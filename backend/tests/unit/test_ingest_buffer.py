@@ -0,0 +1,66 @@
+"""
+Unit tests for the Metrics Collection API ingest buffer.
+"""
+import asyncio
+import pytest
+
+from src.api.metrics_collection.ingest_buffer import IngestBuffer
+
+
+class TestIngestBuffer:
+    """Test coalescing of single submissions into batched writes."""
+
+    @pytest.mark.asyncio
+    async def test_submissions_within_window_share_one_write(self):
+        """Test concurrent submissions are written together in order."""
+        batches = []
+
+        async def writer(submissions):
+            batches.append(list(submissions))
+            return [f"id-{submission}" for submission in submissions]
+
+        buffer = IngestBuffer(writer, window_seconds=0.01, max_batch_size=100)
+
+        metric_ids = await asyncio.gather(*(buffer.submit(n) for n in range(3)))
+
+        assert metric_ids == ["id-0", "id-1", "id-2"]
+        assert batches == [[0, 1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_flushes_without_waiting(self):
+        """Test reaching max_batch_size flushes before the window ends."""
+        batches = []
+
+        async def writer(submissions):
+            batches.append(list(submissions))
+            return list(submissions)
+
+        buffer = IngestBuffer(writer, window_seconds=60, max_batch_size=2)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(buffer.submit("a"), buffer.submit("b")), timeout=1
+        )
+
+        assert results == ["a", "b"]
+        assert batches == [["a", "b"]]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_fails_every_submission(self):
+        """Test a write error is raised to all callers in the batch."""
+        async def writer(submissions):
+            raise RuntimeError("database unavailable")
+
+        buffer = IngestBuffer(writer, window_seconds=0.01, max_batch_size=100)
+
+        results = await asyncio.gather(
+            buffer.submit("a"), buffer.submit("b"), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    def test_zero_window_disables_buffer(self):
+        """Test batching is off unless a window is configured."""
+        async def writer(submissions):
+            return []
+
+        assert not IngestBuffer(writer, window_seconds=0, max_batch_size=100).enabled
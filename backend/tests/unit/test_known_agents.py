@@ -0,0 +1,42 @@
+"""
+Unit tests for the Metrics Collection API known agents memo.
+"""
+from src.api.metrics_collection.known_agents import KnownAgents
+
+
+class TestKnownAgents:
+    """Test the bounded LRU set of known agent IDs."""
+
+    def test_add_and_contains(self):
+        """Test remembered agents are reported as known."""
+        known_agents = KnownAgents()
+
+        known_agents.update(["agent-1", "agent-2"])
+
+        assert "agent-1" in known_agents
+        assert "agent-2" in known_agents
+        assert "agent-3" not in known_agents
+
+    def test_evicts_least_recently_seen(self):
+        """Test the oldest untouched agent is evicted when full."""
+        known_agents = KnownAgents(max_size=2)
+        known_agents.update(["agent-1", "agent-2"])
+
+        # Touching agent-1 makes agent-2 the eviction candidate
+        assert "agent-1" in known_agents
+        known_agents.add("agent-3")
+
+        assert len(known_agents) == 2
+        assert "agent-1" in known_agents
+        assert "agent-2" not in known_agents
+        assert "agent-3" in known_agents
+
+    def test_discard(self):
+        """Test discarded agents are forgotten."""
+        known_agents = KnownAgents()
+        known_agents.add("agent-1")
+
+        known_agents.discard("agent-1")
+        known_agents.discard("missing")
+
+        assert "agent-1" not in known_agents
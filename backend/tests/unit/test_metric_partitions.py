@@ -0,0 +1,57 @@
+"""
+Unit tests for the Metrics Collection API partition routing.
+"""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.api.metrics_collection.partitions import MetricPartitions, partition_name
+
+
+class TestMetricPartitions:
+    """Test routing of metric inserts to monthly partitions."""
+
+    def test_routes_to_existing_month_partition(self):
+        """Test rows mid-month go straight to their month's partition."""
+        partitions = MetricPartitions()
+        partitions.update(["performance_metrics_2025_09", "performance_metrics_default"])
+
+        stmt = partitions.insert_for(datetime(2025, 9, 15, 12, 0, tzinfo=timezone.utc))
+
+        assert stmt is not None
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert sql.startswith("INSERT INTO performance_metrics_2025_09 ")
+        assert partitions.insert_for(datetime(2025, 9, 20)) is stmt
+
+    def test_falls_back_to_parent_table(self):
+        """Test boundary rows, unknown months and no partitions use the parent."""
+        partitions = MetricPartitions()
+        assert partitions.insert_for(datetime(2025, 9, 15, tzinfo=timezone.utc)) is None
+
+        partitions.update(["performance_metrics_2025_09"])
+
+        # Within a day of either month boundary
+        assert partitions.insert_for(datetime(2025, 9, 1, 6, 0, tzinfo=timezone.utc)) is None
+        assert partitions.insert_for(datetime(2025, 9, 30, 18, 0, tzinfo=timezone.utc)) is None
+        # No partition for the month
+        assert partitions.insert_for(datetime(2025, 10, 15, tzinfo=timezone.utc)) is None
+
+    def test_partition_name_matches_create_monthly_partition(self):
+        """Test names follow the initial schema's <table>_YYYY_MM pattern."""
+        assert partition_name(datetime(2025, 1, 5)) == "performance_metrics_2025_01"
+
+    @pytest.mark.asyncio
+    async def test_maintain_forces_partition_refresh(self):
+        """Test maintenance reports its work and invalidates the partition list."""
+        partitions = MetricPartitions()
+        db = Mock()
+        db.execute = AsyncMock(return_value=Mock(scalar_one=Mock(return_value=1)))
+        db.execute.return_value.scalars.return_value = ["performance_metrics_2025_09"]
+
+        await partitions.refresh_if_stale(db)
+        assert await partitions.maintain(db) == 1
+        await partitions.refresh_if_stale(db)
+
+        assert db.execute.await_count == 3
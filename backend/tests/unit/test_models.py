@@ -155,4 +155,39 @@ class TestModels:
         
         # Verify metrics are ordered by timestamp descending
         latencies = [metric.latency_ms for metric in retrieved_agent.performance_metrics]
-        assert latencies == [120.0, 110.0, 100.0]  # Should be in descending order
\ No newline at end of file
+        assert latencies == [120.0, 110.0, 100.0]  # Should be in descending order
+    
+    def test_generate_uuid_returns_unique_uuid4_strings(self):
+        """Test pooled UUID generation yields distinct version 4 UUIDs."""
+        from uuid import UUID
+        from src.models.base import UUID_POOL_SIZE
+        
+        # Span more than one pool refill
+        generated = [AIAgent.generate_uuid() for _ in range(UUID_POOL_SIZE * 2 + 1)]
+        
+        assert len(set(generated)) == len(generated)
+        assert all(UUID(value).version == 4 for value in generated)
+        assert all(str(UUID(value)) == value for value in generated)
+    
+    def test_to_dict_matches_table_columns(self, session):
+        """Test the generated to_dict returns every column value."""
+        agent = AIAgent(
+            agent_id=str(uuid4()),
+            name="Test Agent",
+            status=AgentStatus.RUNNING,
+            agent_metadata={"team": "ml"}
+        )
+        session.add(agent)
+        session.commit()
+        
+        agent_dict = agent.to_dict()
+        
+        assert list(agent_dict) == [column.name for column in AIAgent.__table__.columns]
+        assert agent_dict["agent_id"] == agent.agent_id
+        assert agent_dict["status"] == "running"
+        assert agent_dict["agent_metadata"] == {"team": "ml"}
+        
+        # Each model class gets its own serializer
+        metric_dict = PerformanceMetric(agent_id=agent.agent_id, latency_ms=10.0).to_dict()
+        assert list(metric_dict) == [column.name for column in PerformanceMetric.__table__.columns]
+        assert metric_dict["latency_ms"] == 10.0
@@ -0,0 +1,32 @@
+"""
+Unit tests for Data Retrieval API pagination cursors.
+"""
+import pytest
+from datetime import datetime, timezone
+
+from src.api.data_retrieval.pagination import encode_cursor, decode_cursor
+
+
+class TestPaginationCursor:
+    """Test keyset pagination cursor encoding."""
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the position it was built from."""
+        position = datetime(2024, 1, 1, 10, 30, 0, tzinfo=timezone.utc)
+        row_id = "550e8400-e29b-41d4-a716-446655440000"
+
+        cursor = encode_cursor(position, row_id)
+
+        assert decode_cursor(cursor) == (position, row_id)
+
+    def test_cursor_is_url_safe(self):
+        """Test cursors can be passed as query parameters unescaped."""
+        cursor = encode_cursor(datetime(2024, 1, 1, tzinfo=timezone.utc), "a?b&c/d")
+
+        assert not set(cursor) & set("+/?&")
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10=", "WyJ4IiwgMV0="])
+    def test_invalid_cursor_raises_value_error(self, cursor):
+        """Test malformed cursors are rejected with ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
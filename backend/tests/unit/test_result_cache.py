@@ -0,0 +1,45 @@
+"""
+Unit tests for the in-process service result cache.
+"""
+from unittest.mock import Mock, patch
+
+from src.services.result_cache import MISSING, ResultCache
+
+
+class TestResultCache:
+    """Test TTL expiry and LRU eviction of cached results."""
+
+    def test_get_or_load_reuses_result_until_expiry(self):
+        """Test results are loaded once per TTL."""
+        cache = ResultCache()
+        loader = Mock(return_value={"value": 1})
+
+        with patch("src.services.result_cache.time.monotonic", return_value=100.0):
+            assert cache.get_or_load("key", 60, loader) == {"value": 1}
+            assert cache.get_or_load("key", 60, loader) == {"value": 1}
+        assert loader.call_count == 1
+
+        with patch("src.services.result_cache.time.monotonic", return_value=160.0):
+            cache.get_or_load("key", 60, loader)
+        assert loader.call_count == 2
+
+    def test_evicts_least_recently_used(self):
+        """Test the cache stays within its size bound."""
+        cache = ResultCache(max_size=2)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+        cache.get("a")
+        cache.set("c", 3, 60)
+
+        assert len(cache) == 2
+        assert cache.get("a") == 1
+        assert cache.get("b") is MISSING
+
+    def test_caches_none_results(self):
+        """Test a None result is cached rather than reloaded on every call."""
+        cache = ResultCache()
+        loader = Mock(return_value=None)
+
+        assert cache.get_or_load("key", 60, loader) is None
+        assert cache.get_or_load("key", 60, loader) is None
+        assert loader.call_count == 1
@@ -0,0 +1,52 @@
+"""
+Unit tests for the metric rollup service.
+"""
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from sqlalchemy.dialects import postgresql
+
+from src.services.rollups import MetricRollupService, ceil_bucket, floor_bucket
+
+
+class TestMetricRollups:
+    """Test rollup bucket alignment and query construction."""
+
+    def test_bucket_alignment(self):
+        """Test buckets are aligned to UTC and whole buckets are kept."""
+        value = datetime(2025, 9, 15, 12, 34, 56, tzinfo=timezone.utc)
+
+        assert floor_bucket(value, "minute") == datetime(2025, 9, 15, 12, 34, tzinfo=timezone.utc)
+        assert floor_bucket(value, "hour") == datetime(2025, 9, 15, 12, tzinfo=timezone.utc)
+        assert ceil_bucket(value, "day") == datetime(2025, 9, 16, tzinfo=timezone.utc)
+        assert ceil_bucket(datetime(2025, 9, 15, 12), "hour") == datetime(2025, 9, 15, 12, tzinfo=timezone.utc)
+
+    def test_statistics_reads_whole_buckets_from_rollup(self):
+        """Test whole hours come from the hourly rollup and the edges from raw metrics."""
+        service = MetricRollupService(Mock())
+
+        query = service.statistics(
+            "hour",
+            datetime(2025, 9, 15, 10, 30, tzinfo=timezone.utc),
+            datetime(2025, 9, 15, 14, 15, tzinfo=timezone.utc),
+            agent_id="550e8400-e29b-41d4-a716-446655440000"
+        )
+
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert sql.count("FROM performance_metrics_hour") == 1
+        assert sql.count("FROM performance_metrics ") == 3
+        assert "UNION ALL" in sql
+
+    def test_statistics_without_whole_bucket_reads_raw_metrics(self):
+        """Test ranges shorter than one bucket skip the rollup tables."""
+        service = MetricRollupService(Mock())
+
+        query = service.statistics(
+            "day",
+            datetime(2025, 9, 15, 10, 30, tzinfo=timezone.utc),
+            datetime(2025, 9, 15, 14, 15, tzinfo=timezone.utc)
+        )
+
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "performance_metrics_day" not in sql
+        assert "UNION ALL" not in sql
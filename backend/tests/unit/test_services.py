@@ -1,6 +1,7 @@
 """
 Unit tests for data processing services.
 """
+import numpy as np
 import pytest
 from datetime import datetime, timezone, timedelta
 from unittest.mock import Mock, patch
@@ -8,6 +9,7 @@ from decimal import Decimal
 
 from src.services import DataAggregationService, CostAnalysisService, PerformanceDiagnosisService
 from src.services.aggregation import AggregationInterval
+from src.services.result_cache import get_result_cache
 from src.services.cost_analysis import CostPeriod
 from src.services.performance_diagnosis import PerformanceIssueType
 
@@ -23,6 +25,7 @@ class TestDataAggregationService:
     @pytest.fixture
     def service(self, mock_session):
         """Create a data aggregation service instance."""
+        get_result_cache().clear()
         return DataAggregationService(mock_session)
     
     def test_aggregate_metrics_by_hour(self, service, mock_session):
@@ -53,21 +56,41 @@ class TestDataAggregationService:
         assert result[0]['avg_latency'] == 150.5
         assert result[0]['metric_count'] == 100
     
-    def test_get_agent_summary(self, service, mock_session):
-        """Test getting agent summary."""
-        # Mock the agent query
-        mock_agent = Mock()
-        mock_agent.agent_id = "test-agent"
-        mock_agent.name = "Test Agent"
-        mock_agent.status = "running"
-        mock_agent.created_at = datetime(2024, 1, 1)
-        mock_agent.last_seen = datetime(2024, 1, 1, 12, 0, 0)
+    def test_aggregate_metrics_columnar(self, service, mock_session):
+        """Test columnar aggregation returns one array per field."""
+        mock_session.execute.return_value.all.return_value = [
+            ("test-agent", datetime(2024, 1, 1, 10, tzinfo=timezone.utc), 100,
+             150.5, 90.0, 300.0, 60.2, None, 45.1, None, 512.0, None, 6020.0),
+            ("test-agent", datetime(2024, 1, 1, 11, tzinfo=timezone.utc), 80,
+             140.0, 85.0, 250.0, 58.0, None, 44.0, None, 500.0, None, 4640.0),
+        ]
         
-        mock_session.query.return_value.filter.return_value.first.return_value = mock_agent
+        result = service.aggregate_metrics_columnar(agent_id="test-agent")
         
-        # Mock the metrics aggregation query
-        mock_metrics_result = [(50, 150.5, 60.2, 0.001, 45.1, 512.0)]
-        mock_session.execute.return_value.fetchone.return_value = mock_metrics_result[0]
+        assert list(result['count']) == [100, 80]
+        assert result['interval_start'][1] - result['interval_start'][0] == 3600
+        assert result['avg_latency_ms'][0] == 150.5
+        assert np.isnan(result['avg_cost_per_request']).all()
+    
+    def test_get_agent_summary(self, service, mock_session):
+        """Test getting agent summary."""
+        # Mock the combined agent and metrics aggregation query
+        mock_row = Mock()
+        mock_row.agent_id = "test-agent"
+        mock_row.name = "Test Agent"
+        mock_row.status = "running"
+        mock_row.total_metrics = 50
+        mock_row.avg_latency = 150.5
+        mock_row.p95_latency = 240.0
+        mock_row.avg_throughput = 60.2
+        mock_row.total_cost = 0.001
+        mock_row.avg_cpu = 45.1
+        mock_row.avg_gpu = None
+        mock_row.avg_memory = 512.0
+        mock_row.first_metric = datetime(2024, 1, 1)
+        mock_row.last_metric = datetime(2024, 1, 1, 12, 0, 0)
+        mock_row.uptime_hours = 12
+        mock_session.execute.return_value = [mock_row]
         
         # Test getting summary
         result = service.get_agent_summary("test-agent")
@@ -77,6 +100,74 @@ class TestDataAggregationService:
         assert result['status'] == "running"
         assert result['total_metrics'] == 50
         assert result['avg_latency_ms'] == 150.5
+    
+    def test_get_agent_summaries(self, service, mock_session):
+        """Test summarizing several agents with one query."""
+        rows = []
+        for agent_id in ("agent-1", "agent-2"):
+            row = Mock()
+            row.agent_id = agent_id
+            row.name = agent_id.title()
+            row.total_metrics = None
+            row.uptime_hours = None
+            for column in ('avg_latency', 'p95_latency', 'avg_throughput', 'total_cost',
+                           'avg_cpu', 'avg_gpu', 'avg_memory'):
+                setattr(row, column, None)
+            rows.append(row)
+        mock_session.execute.return_value = rows
+        
+        result = service.get_agent_summaries(["agent-1", "agent-2", "missing"])
+        
+        assert mock_session.execute.call_count == 1
+        assert set(result) == {"agent-1", "agent-2"}
+        assert result["agent-2"]['name'] == "Agent-2"
+        assert result["agent-2"]['total_metrics'] == 0
+        assert result["agent-2"]['avg_latency_ms'] is None
+    
+    def test_get_trend_analysis(self, service, mock_session):
+        """Test trend analysis from the summarized hourly series."""
+        mock_row = Mock()
+        mock_row.data_points = 11
+        mock_row.last_value = 120.0
+        mock_row.min_value = 95.0
+        mock_row.max_value = 125.0
+        mock_row.avg_value = 110.0
+        # Fitted line rises from 100 to 120 over ten hours
+        mock_row.slope = 2.0
+        mock_row.mean_hour = 1005
+        mock_row.first_hour = 1000
+        mock_row.last_hour = 1010
+        mock_session.execute.return_value.one.return_value = mock_row
+        
+        result = service.get_trend_analysis("test-agent", "latency_ms")
+        
+        assert result['trend'] == 'increasing'
+        assert result['change_percent'] == 20.0
+        assert result['data_points'] == 11
+        assert result['current_value'] == 120.0
+        
+        # Identical requests within the TTL are served from the cache
+        service.get_trend_analysis("test-agent", "latency_ms")
+        assert mock_session.execute.call_count == 1
+    
+    def test_get_trend_analysis_all_zero_series(self, service, mock_session):
+        """Test a series of zeros is stable instead of dividing by zero."""
+        mock_row = Mock()
+        mock_row.data_points = 3
+        mock_row.last_value = 0.0
+        mock_row.min_value = 0.0
+        mock_row.max_value = 0.0
+        mock_row.avg_value = 0.0
+        mock_row.slope = 0.0
+        mock_row.mean_hour = 1001
+        mock_row.first_hour = 1000
+        mock_row.last_hour = 1002
+        mock_session.execute.return_value.one.return_value = mock_row
+        
+        result = service.get_trend_analysis("test-agent", "cost_per_request")
+        
+        assert result['trend'] == 'stable'
+        assert result['change_percent'] == 0
 
 
 class TestCostAnalysisService:
@@ -90,8 +181,30 @@ class TestCostAnalysisService:
     @pytest.fixture
     def service(self, mock_session):
         """Create a cost analysis service instance."""
+        get_result_cache().clear()
         return CostAnalysisService(mock_session)
     
+    def test_analyze_costs_for_one_agent(self, service, mock_session):
+        """Test a single agent's breakdown looks up only that agent's name."""
+        mock_row = Mock()
+        mock_row.agent_id = "test-agent"
+        mock_row.period_start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        mock_row.period_end = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        mock_row.total_cost = 5.0
+        mock_row.avg_cost_per_request = 0.005
+        mock_row.total_requests = 1000
+        mock_row.cost_trend = 'increasing'
+        name = Mock()
+        name.scalar_one_or_none.return_value = "Test Agent"
+        mock_session.execute.side_effect = [name, [mock_row]]
+        
+        result = service.analyze_costs(agent_id="test-agent", period=CostPeriod.DAILY)
+        
+        assert len(result) == 1
+        assert result[0].agent_name == "Test Agent"
+        assert result[0].cost_trend == 'increasing'
+        assert result[0].cost_efficiency == 'good'
+    
     def test_analyze_costs_by_agent(self, service, mock_session):
         """Test cost analysis by agent."""
         # Mock query result
@@ -138,6 +251,105 @@ class TestCostAnalysisService:
         assert result[0]['cost'] == Decimal("15.00")
         assert result[0]['baseline_cost'] == Decimal("5.00")
         assert result[0]['spike_ratio'] == 3.0
+    
+    def test_get_cost_alerts(self, service, mock_session):
+        """Test cost alerts for all agents come from one set-based query."""
+        mock_row = Mock()
+        mock_row.agent_id = "agent-1"
+        mock_row.current_cost = 3.0
+        mock_row.previous_cost = 1.0
+        mock_row.current_avg = 0.003
+        mock_row.previous_avg = 0.002
+        mock_row.cost_increase = 200.0
+        mock_row.spike_severity = 'critical'
+        mock_row.efficiency_drop = 50.0
+        mock_row.efficiency_alert = True
+        deleted_row = Mock(agent_id="agent-deleted", current_cost=3.0, previous_cost=1.0,
+                           cost_increase=200.0, spike_severity='critical', efficiency_alert=False)
+        mock_session.execute.return_value.all.side_effect = [
+            [mock_row], [("agent-1", "Agent 1")], [mock_row],
+            [deleted_row], [("agent-1", "Agent 1")], [deleted_row]
+        ]
+        
+        result = service.get_cost_alerts()
+        
+        # Alert query plus the agent names, which are then cached
+        assert mock_session.execute.call_count == 2
+        assert result[0].agent_name == "Agent 1"
+        assert [(alert.alert_type, alert.severity) for alert in result] == [
+            ('cost_spike', 'critical'), ('efficiency_drop', 'medium')
+        ]
+        assert result[0].current_value == 3.0
+        assert result[0].threshold_value == 2.0
+        
+        # Names come from the cache on the next call
+        service.get_cost_alerts()
+        assert mock_session.execute.call_count == 3
+        
+        # An unknown agent reloads the names once, then is cached as missing
+        assert service.get_cost_alerts()[0].agent_name is None
+        service.get_cost_alerts()
+        assert mock_session.execute.call_count == 6
+    
+    def test_get_cost_optimization_recommendations(self, service, mock_session):
+        """Test recommendations are derived from the daily rollup."""
+        days = []
+        for cost in (30.0, 40.0):
+            day = Mock()
+            day._mapping = {
+                'agent_id': "test-agent",
+                'day': datetime(2024, 1, len(days) + 1, tzinfo=timezone.utc),
+                'metric_count': 1750, 'cost_sum': cost, 'cost_count': 1750,
+                'latency_sum': 350000.0, 'latency_count': 1750,
+                'throughput_sum': 87500.0, 'throughput_count': 1750,
+                'cpu_sum': 105000.0, 'cpu_count': 1750,
+                'memory_sum': 1792000.0, 'memory_count': 1750
+            }
+            days.append(day)
+        mock_session.execute.return_value = days
+        
+        result = service.get_cost_optimization_recommendations("test-agent", days=7)
+        
+        assert mock_session.execute.call_count == 1
+        assert len(result['recommendations']) == 1
+        assert result['potential_monthly_savings'] == 60.0
+        assert result['metrics_summary']['total_requests'] == 3500
+        assert result['metrics_summary']['avg_cost_per_request'] == 0.02
+        assert result['days_over_threshold']['high_cost'] == 1.0
+        assert result['days_over_threshold']['low_cpu'] == 0.0
+        
+        # Each call reads the window ending at its own current time
+        service.get_cost_optimization_recommendations("test-agent", days=7)
+        assert mock_session.execute.call_count == 2
+    
+    def test_bulk_report(self, service, mock_session):
+        """Test reports for several agents come from one query."""
+        day = Mock()
+        day._mapping = {
+            'agent_id': "agent-1",
+            'day': datetime(2024, 1, 1, tzinfo=timezone.utc),
+            'metric_count': 100, 'cost_sum': 0.5, 'cost_count': 100,
+            'latency_sum': 20000.0, 'latency_count': 100,
+            'throughput_sum': 5000.0, 'throughput_count': 100,
+            'cpu_sum': 2000.0, 'cpu_count': 100,
+            'memory_sum': 102400.0, 'memory_count': 100
+        }
+        mock_session.execute.return_value = [day]
+        
+        result = service.bulk_report(["agent-1", "agent-2"], days=7)
+        
+        assert mock_session.execute.call_count == 1
+        assert result["agent-1"]['daily_costs'][0]['avg_cost_per_request'] == 0.005
+        assert result["agent-1"]['recommendations']['metrics_summary']['total_requests'] == 100
+        assert result["agent-2"]['daily_costs'] == []
+        assert result["agent-2"]['recommendations']['confidence'] == 'low'
+    
+    def test_calculate_cost_efficiency(self, service):
+        """Test efficiency ratings at and around the thresholds."""
+        ratings = [service._calculate_cost_efficiency(cost)
+                   for cost in (None, 0, 0.001, 0.0011, 0.005, 0.01, 0.02)]
+        
+        assert ratings == ['unknown', 'unknown', 'excellent', 'good', 'good', 'fair', 'poor']
 
 
 class TestPerformanceDiagnosisService:
@@ -151,6 +363,7 @@ class TestPerformanceDiagnosisService:
     @pytest.fixture
     def service(self, mock_session):
         """Create a performance diagnosis service instance."""
+        get_result_cache().clear()
         return PerformanceDiagnosisService(mock_session)
     
     def test_diagnose_performance_issues(self, service, mock_session):
@@ -216,4 +429,69 @@ class TestPerformanceDiagnosisService:
             assert 'title' in rec
             assert 'description' in rec
             assert 'priority' in rec
-            assert 'estimated_impact' in rec
\ No newline at end of file
+            assert 'estimated_impact' in rec
+    
+    def test_diagnose_agent_performance(self, service, mock_session):
+        """Test issues and scores are derived from one aggregate row."""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        agent = Mock()
+        agent.first.return_value = Mock(agent_id="test-agent")
+        agent.first.return_value.name = "Test Agent"
+        aggregates = Mock()
+        aggregates.one.return_value._mapping = {
+            'metric_count': 3, 'first_seen': start, 'last_seen': start + timedelta(hours=2),
+            'avg_latency': 2500.0, 'p95_latency': 6000.0,
+            'high_latency_count': 2, 'high_latency_first_seen': start,
+            'high_latency_last_seen': start + timedelta(minutes=5), 'critical_latency_count': 1,
+            'avg_throughput': 20.0, 'low_throughput_count': 0,
+            'avg_cpu': 60.0, 'high_cpu_count': 0, 'high_cpu_first_seen': None, 'high_cpu_last_seen': None,
+            'first_half_count': 1, 'second_half_count': 2,
+            'first_half_avg_latency': 1000.0, 'second_half_avg_latency': 3250.0
+        }
+        samples = Mock()
+        samples.partitions.return_value = [
+            [(start, 500.0), (start + timedelta(minutes=5), None)],
+            [(start + timedelta(hours=2), 650.0)]
+        ]
+        mock_session.execute.side_effect = [agent, aggregates, samples]
+        
+        summary, issues = service.diagnose_agent_performance("test-agent")
+        
+        assert [(i.title, i.occurrence_count) for i in issues] == [
+            ("High Average Latency", 2),
+            ("High P95 Latency", 1),
+            ("Potential Memory Leak", 1),
+            ("Data Collection Gaps", 1)
+        ]
+        assert issues[0].last_seen == start + timedelta(minutes=5)
+        assert issues[2].current_value == 650.0
+        assert issues[3].current_value == pytest.approx(115 / 60)
+        assert summary.latency_score == 25
+        assert summary.throughput_score == 70
+        assert summary.resource_efficiency_score == 55
+        assert summary.reliability_score == 12
+        assert summary.recommendations_count == 4
+        
+        # Repeated requests within the minute reuse the diagnosis
+        service.get_performance_recommendations("test-agent", days=1)
+        assert mock_session.execute.call_count == 3
+    
+    def test_calculate_trend(self, service):
+        """Test the trend compares the mean of the first and last thirds."""
+        assert service._calculate_trend(np.array([100.0])) == 0
+        assert service._calculate_trend(np.array([100.0, 150.0])) == 50.0
+        assert service._calculate_trend(np.array([100.0, 100.0, 100.0, 140.0])) == 20.0
+        assert service._calculate_trend(np.array([0.0, 100.0, 200.0])) == 0
+    
+    def test_score_tiers(self, service):
+        """Test latency and throughput scores at and around the tier bounds."""
+        def aggregates(**values):
+            return Mock(avg_latency=values.get('latency'), avg_throughput=values.get('throughput'))
+        
+        latency_scores = [service._calculate_latency_score(aggregates(latency=latency))
+                          for latency in (None, 100, 100.1, 2000, 5000, 5001)]
+        throughput_scores = [service._calculate_throughput_score(aggregates(throughput=throughput))
+                             for throughput in (None, 0.5, 1, 59.9, 60, 120)]
+        
+        assert latency_scores == [50, 100, 85, 50, 25, 0]
+        assert throughput_scores == [50, 0, 25, 85, 100, 100]